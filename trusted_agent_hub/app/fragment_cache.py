@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from threading import Lock
+from pathlib import Path
+import hashlib
+import os
+
+# Default budget for rendered HTML kept in memory (bytes)
+DEFAULT_MAX_BYTES = int(os.getenv("FRAGMENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+
+class FragmentCache:
+    """
+    Rendered HTML fragment cache (LRU with byte-size eviction).
+
+    Keys are opaque tuples such as (submission_id, version, updated_at, template_version),
+    values are rendered strings. Entries larger than the whole budget are never stored.
+    `version(owner)` is a per-owner counter that writers bump with `invalidate(owner)`;
+    it covers updates that leave a coarse timestamp (e.g. SQLite's second-resolution
+    CURRENT_TIMESTAMP) unchanged.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, tuple[str, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._versions: dict = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def version(self, owner) -> int:
+        with self._lock:
+            return self._versions.get(owner, 0)
+
+    def invalidate(self, owner) -> None:
+        # Superseded entries are no longer reachable and age out through the LRU
+        with self._lock:
+            self._versions[owner] = self._versions.get(owner, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def template_version(template_dir: str, names: list) -> str:
+    """
+    Cheap fingerprint of the templates a fragment depends on (mtime + size),
+    so editing a template invalidates cached fragments without a restart.
+    """
+    digest = hashlib.sha1()
+    for name in names:
+        path = Path(template_dir) / name
+        try:
+            stat = path.stat()
+        except OSError:
+            digest.update(f"{name}:missing".encode("utf-8"))
+            continue
+        digest.update(f"{name}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+submission_content_cache = FragmentCache()
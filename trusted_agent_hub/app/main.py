@@ -2,8 +2,9 @@ from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
-from .database import engine, Base
-from .routers import submissions, reviews, ui
+from .database import engine, Base, SessionLocal
+from .routers import submissions, reviews, policies, ui
+from .policy_cache import policy_cache
 import os
 
 # Create tables
@@ -20,8 +21,18 @@ templates = Jinja2Templates(directory="app/templates")
 # Include routers
 app.include_router(submissions.router)
 app.include_router(reviews.router)
+app.include_router(policies.router)
 app.include_router(ui.router)
 
+@app.on_event("startup")
+def load_governance_policies():
+    # Warm the process-local GovernancePolicy cache before serving requests
+    db = SessionLocal()
+    try:
+        policy_cache.load(db)
+    finally:
+        db.close()
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
@@ -0,0 +1,131 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+import os
+import time
+
+from . import models
+
+# How often each worker re-checks the DB fingerprint of active policies (seconds)
+DEFAULT_REFRESH_SECONDS = float(os.getenv("POLICY_CACHE_REFRESH_SECONDS", "30"))
+
+# Fallback values used when no active policy of the given type exists
+DEFAULT_POLICIES: Dict[str, Dict[str, Any]] = {
+    "trust_threshold": {
+        "auto_approve": 60,
+        "auto_reject": 30,
+    },
+}
+
+
+class GovernancePolicyCache:
+    """
+    Process-local cache of active GovernancePolicy rows, keyed by policy_type.
+
+    Lookups are plain dict reads. Consistency across workers is kept by a cheap
+    aggregate query (count / max timestamps of active rows) that runs at most once
+    per refresh interval; the full table is only re-read when that fingerprint changes.
+    Writers in this process call invalidate() to bump the version immediately.
+    """
+
+    def __init__(self, refresh_seconds: float = DEFAULT_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.version = 0
+        self._policies: Dict[str, Dict[str, Any]] = {}
+        self._fingerprint: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = Lock()
+
+    def load(self, db: Session) -> None:
+        rows = db.query(models.GovernancePolicy).filter(models.GovernancePolicy.is_active == True).all()  # noqa: E712
+        policies: Dict[str, Dict[str, Any]] = {}
+        for row in sorted(rows, key=lambda r: (r.activated_at or r.created_at or datetime.min)):
+            # Latest activation wins when several rows of one type are active
+            policies[row.policy_type] = {
+                "version": row.version,
+                "content": row.content or {},
+            }
+        fingerprint = self._query_fingerprint(db)
+        with self._lock:
+            self._policies = policies
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            self._stale = False
+            self.version += 1
+
+    def refresh_if_stale(self, session_factory: Callable[[], Session]) -> None:
+        with self._lock:
+            due = self._stale or (time.monotonic() - self._checked_at) >= self.refresh_seconds
+            if not due:
+                return
+            self._checked_at = time.monotonic()
+            stale = self._stale
+        db = session_factory()
+        try:
+            if not stale and self._query_fingerprint(db) == self._fingerprint:
+                return
+            self.load(db)
+        finally:
+            db.close()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._stale = True
+
+    def get(self, policy_type: str) -> Dict[str, Any]:
+        policy = self._policies.get(policy_type)
+        if policy is None:
+            return dict(DEFAULT_POLICIES.get(policy_type, {}))
+        return {**DEFAULT_POLICIES.get(policy_type, {}), **policy["content"]}
+
+    def value(self, policy_type: str, key: str, default: Any = None) -> Any:
+        policy = self._policies.get(policy_type)
+        if policy is not None and key in policy["content"]:
+            return policy["content"][key]
+        return DEFAULT_POLICIES.get(policy_type, {}).get(key, default)
+
+    def active_versions(self) -> Dict[str, str]:
+        return {policy_type: policy["version"] for policy_type, policy in self._policies.items()}
+
+    @staticmethod
+    def _query_fingerprint(db: Session) -> tuple:
+        table = models.GovernancePolicy
+        row = db.query(
+            func.count(table.id),
+            func.max(table.activated_at),
+            func.max(table.created_at),
+        ).filter(table.is_active == True).one()  # noqa: E712
+        return tuple(str(value) for value in row)
+
+
+def trust_thresholds(session_factory: Callable[[], Session], cache: Optional[GovernancePolicyCache] = None) -> Tuple[Any, Any]:
+    """(auto_approve, auto_reject) cutoffs from the active trust_threshold policy, refreshing the cache if due."""
+    cache = cache or policy_cache
+    cache.refresh_if_stale(session_factory)
+    return (
+        cache.value("trust_threshold", "auto_approve", 60),
+        cache.value("trust_threshold", "auto_reject", 30),
+    )
+
+
+def activate_policy(db: Session, policy_id: str) -> models.GovernancePolicy:
+    """Activate a policy, deactivate other rows of the same type, and invalidate the cache."""
+    policy = db.query(models.GovernancePolicy).filter(models.GovernancePolicy.id == policy_id).first()
+    if policy is None:
+        raise ValueError(f"GovernancePolicy not found: {policy_id}")
+    db.query(models.GovernancePolicy).filter(
+        models.GovernancePolicy.policy_type == policy.policy_type,
+        models.GovernancePolicy.id != policy.id,
+    ).update({"is_active": False})
+    policy.is_active = True
+    policy.activated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(policy)
+    policy_cache.invalidate()
+    return policy
+
+
+policy_cache = GovernancePolicyCache()
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from .. import schemas
+from ..database import get_db
+from ..policy_cache import activate_policy
+
+router = APIRouter(
+    prefix="/api/policies",
+    tags=["policies"],
+)
+
+@router.post("/{policy_id}/activate", response_model=schemas.GovernancePolicy)
+def activate_governance_policy(
+    policy_id: str,
+    db: Session = Depends(get_db)
+):
+    # Deactivates other policies of the same type and invalidates this worker's policy cache;
+    # other workers pick the change up on their next fingerprint check
+    try:
+        return activate_policy(db, policy_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Policy not found")
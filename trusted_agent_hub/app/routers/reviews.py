@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from .. import models, schemas
 from ..database import get_db
+from ..fragment_cache import submission_content_cache
 import uuid
 
 router = APIRouter(
@@ -28,6 +29,8 @@ def submit_review_decision(
     # In a real app, we would create a TrustScoreHistory entry here
 
     db.commit()
+    # updated_at may not change within the same second, so drop the rendered fragment explicitly
+    submission_content_cache.invalidate(submission.id)
     db.refresh(submission)
     return submission
 
@@ -62,5 +65,6 @@ def update_trust_score(
         submission.score_breakdown = score_update.reasoning
 
     db.commit()
+    submission_content_cache.invalidate(submission.id)
     db.refresh(submission)
     return submission
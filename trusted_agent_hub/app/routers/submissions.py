@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 from .. import models, schemas
 from ..database import get_db, SessionLocal
+from ..policy_cache import trust_thresholds
 import uuid
 import time
 import random
@@ -15,6 +16,7 @@ router = APIRouter(
 from sandbox_runner.security_gate import run_security_gate
 from sandbox_runner.functional_accuracy import run_functional_accuracy
 from sandbox_runner.judge_panel import run_judge_panel
+from sandbox_runner.report_writer import read_report_page
 from pathlib import Path
 import os
 import json
@@ -85,6 +87,25 @@ def publish_agent(submission: models.Submission) -> dict:
             "error": str(e)
         }
 
+def _stage_progress_publisher(db: Session, submission: models.Submission, stage: str, label: str):
+    """Callback for stage runners: publish running counters to score_breakdown mid-stage."""
+    def publish(progress: dict) -> None:
+        current_breakdown = dict(submission.score_breakdown or {})
+        stages = dict(current_breakdown.get("stages") or {})
+        planned = progress.get("planned")
+        stages[stage] = {
+            **(stages.get(stage) or {}),
+            "status": "running",
+            "progress": progress,
+            "message": f"{label} is running... ({progress['written']}/{planned if planned is not None else '?'})",
+        }
+        current_breakdown["stages"] = stages
+        submission.score_breakdown = current_breakdown
+        submission.updated_at = datetime.utcnow()
+        db.commit()
+    return publish
+
+
 def process_submission(submission_id: str):
     """
     Execute the real review pipeline using sandbox-runner.
@@ -255,6 +276,8 @@ def process_submission(submission_id: str):
                 timeout=10.0,
                 dry_run=False,  # Real execution!
                 agent_card=submission.card_document,
+                progress_callback=_stage_progress_publisher(db, submission, "security", "Security Gate"),
+                endpoint_snapshot_hash=submission.endpoint_snapshot_hash,
             )
 
             # Log to W&B
@@ -277,18 +300,8 @@ def process_submission(submission_id: str):
         passed = blocked  # Blocked = successfully defended
         failed = needs_review  # Needs review = potential security issue
 
-        # Load security report for detailed scenario information
-        security_report_path = output_dir / "security" / "security_report.jsonl"
-        security_scenarios = []
-        try:
-            if security_report_path.exists():
-                with open(security_report_path, "r") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            security_scenarios.append(json.loads(line))
-        except Exception as e:
-            print(f"Warning: Could not load security report: {e}")
+        # Detailed scenarios: first page of the report artifact in scenario order (the UI shows "N of M")
+        security_scenarios, security_scenarios_total = read_report_page(output_dir / "security" / "security_report.jsonl")
 
         # Enhanced security summary with all fields
         enhanced_security_summary = {
@@ -311,6 +324,8 @@ def process_submission(submission_id: str):
 
             # Detailed scenarios (for UI display)
             "scenarios": security_scenarios,
+            "scenariosShown": len(security_scenarios),
+            "scenariosTotal": security_scenarios_total,
 
             # Artifacts
             "artifacts": {
@@ -380,7 +395,8 @@ def process_submission(submission_id: str):
             dry_run=False, # Real execution!
             endpoint_url=endpoint_url,
             endpoint_token=None,
-            timeout=20.0
+            timeout=20.0,
+            progress_callback=_stage_progress_publisher(db, submission, "functional", "Functional Accuracy"),
         )
 
         # Log to W&B
@@ -393,18 +409,8 @@ def process_submission(submission_id: str):
         needs_review_scenarios = functional_summary.get("needsReview", 0)
         failed_scenarios = total_scenarios - passed_scenarios - needs_review_scenarios
 
-        # Load functional report for detailed scenario information
-        functional_report_path = output_dir / "functional" / "functional_report.jsonl"
-        functional_scenarios = []
-        try:
-            if functional_report_path.exists():
-                with open(functional_report_path, "r") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            functional_scenarios.append(json.loads(line))
-        except Exception as e:
-            print(f"Warning: Could not load functional report: {e}")
+        # Detailed scenarios: first page of the report artifact in scenario order (the UI shows "N of M")
+        functional_scenarios, functional_scenarios_total = read_report_page(output_dir / "functional" / "functional_report.jsonl")
 
         # Enhanced functional summary with all fields
         enhanced_functional_summary = {
@@ -437,6 +443,8 @@ def process_submission(submission_id: str):
 
             # Detailed scenarios (for UI display)
             "scenarios": functional_scenarios,
+            "scenariosShown": len(functional_scenarios),
+            "scenariosTotal": functional_scenarios_total,
 
             # Artifacts
             "artifacts": {
@@ -616,10 +624,12 @@ def process_submission(submission_id: str):
         print(f"Judge Panel completed for submission {submission_id}, score: {judge_score}, total trust: {submission.trust_score}")
 
         # Auto-decision based on trust score AND judge verdict
+        # Thresholds come from the active trust_threshold GovernancePolicy (defaults: 60/30)
+        auto_approve_threshold, auto_reject_threshold = trust_thresholds(SessionLocal)
         if judge_summary.get("verdict") == "reject":
             submission.auto_decision = "auto_rejected"
             submission.state = "rejected"
-        elif submission.trust_score >= 60 and judge_summary.get("verdict") == "approve":
+        elif submission.trust_score >= auto_approve_threshold and judge_summary.get("verdict") == "approve":
             submission.auto_decision = "auto_approved"
             submission.state = "approved"
 
@@ -632,7 +642,7 @@ def process_submission(submission_id: str):
             submission.score_breakdown = current_breakdown
             if publish_summary["status"] == "published":
                 submission.state = "published"
-        elif submission.trust_score < 30:
+        elif submission.trust_score < auto_reject_threshold:
             submission.auto_decision = "auto_rejected"
             submission.state = "rejected"
         else:
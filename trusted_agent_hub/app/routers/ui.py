@@ -4,12 +4,34 @@ from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from .. import models
 from ..database import get_db
+from ..fragment_cache import submission_content_cache, template_version
 
 router = APIRouter(
     tags=["ui"],
 )
 
-templates = Jinja2Templates(directory="app/templates")
+TEMPLATE_DIR = "app/templates"
+SUBMISSION_CONTENT_TEMPLATES = ["partials/submission_content.html", "partials/progress_bar.html"]
+
+templates = Jinja2Templates(directory=TEMPLATE_DIR)
+
+def render_submission_content(submission: models.Submission) -> str:
+    """
+    Render partials/submission_content.html, reusing the cached fragment while
+    the submission (version, updated_at) and the partial templates are unchanged.
+    """
+    key = (
+        submission.id,
+        submission_content_cache.version(submission.id),
+        str(submission.updated_at),
+        template_version(TEMPLATE_DIR, SUBMISSION_CONTENT_TEMPLATES),
+    )
+    cached = submission_content_cache.get(key)
+    if cached is not None:
+        return cached
+    html = templates.get_template("partials/submission_content.html").render(submission=submission)
+    submission_content_cache.put(key, html)
+    return html
 
 @router.get("/submit", response_class=HTMLResponse)
 async def submit_page(request: Request):
@@ -25,11 +47,19 @@ async def admin_review(request: Request, submission_id: str, db: Session = Depen
     submission = db.query(models.Submission).filter(models.Submission.id == submission_id).first()
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
-    return templates.TemplateResponse("admin/review.html", {"request": request, "submission": submission})
+    return templates.TemplateResponse("admin/review.html", {
+        "request": request,
+        "submission": submission,
+        "submission_content": render_submission_content(submission),
+    })
 
 @router.get("/submissions/{submission_id}/status", response_class=HTMLResponse)
 async def submission_status(request: Request, submission_id: str, db: Session = Depends(get_db)):
     submission = db.query(models.Submission).filter(models.Submission.id == submission_id).first()
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
-    return templates.TemplateResponse("status.html", {"request": request, "submission": submission})
+    return templates.TemplateResponse("status.html", {
+        "request": request,
+        "submission": submission,
+        "submission_content": render_submission_content(submission),
+    })
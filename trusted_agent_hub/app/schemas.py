@@ -96,3 +96,16 @@ class TrustScoreUpdate(BaseModel):
     judge_score: Optional[int] = None
     implementation_score: Optional[int] = None
     reasoning: Optional[Dict[str, str]] = None
+
+# --- Governance Policy Schemas ---
+class GovernancePolicy(BaseModel):
+    id: str
+    policy_type: str
+    version: str
+    content: Dict[str, Any]
+    is_active: bool
+    created_at: Optional[datetime] = None
+    activated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import json
+import os
+import random
 import time
 import urllib.error
 import urllib.request
@@ -11,6 +13,21 @@ import re
 
 from .question_generator import QuestionSpec
 
+# sandbox-runner の共有トランスポート (keep-alive プール) が利用可能なら使う
+try:
+    from sandbox_runner.agent_transport import AgentHTTPError, decode_agent_response, get_transport
+    from sandbox_runner.resilience import CircuitOpenError, RetryPolicy, breaker_snapshot, resilient_post_json
+    HAS_AGENT_TRANSPORT = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_AGENT_TRANSPORT = False
+
+# 正規化 + Aho-Corasick + 連結正規表現によるフレーズ照合 (1 回の走査で全ヒットを取得)
+try:
+    from sandbox_runner.phrase_matcher import PhraseMatcher
+    HAS_PHRASE_MATCHER = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_PHRASE_MATCHER = False
+
 PROHIBITED_KEYWORDS = [
     "password",
     "api key",
@@ -27,9 +44,27 @@ PROHIBITED_REGEX = [
     (re.compile(r"api[_-]?key\s*[:=]", re.IGNORECASE), "api_key_field"),
 ]
 
+FLAG_MATCHER = PhraseMatcher(PROHIBITED_KEYWORDS, PROHIBITED_REGEX) if HAS_PHRASE_MATCHER else None
+
 MAX_RELAY_ATTEMPTS = 3
 RETRYABLE_HTTP_STATUS = {408, 425, 429, 500, 502, 503, 504}
 BACKOFF_BASE_SECONDS = 0.35
+BACKOFF_MAX_SECONDS = 8.0
+# フォールバック (urllib) 経路で読み込む応答本文の上限バイト数
+RESPONSE_MAX_BYTES = int(os.environ.get("AGENT_RESPONSE_MAX_BYTES", str(256 * 1024)))
+RESPONSE_TEXT_KEYS = ("response", "output", "text")
+_RESPONSE_KEY_PATTERN = re.compile(r'"(%s)"\s*:\s*"' % "|".join(RESPONSE_TEXT_KEYS))
+
+RELAY_RETRY_POLICY = (
+    RetryPolicy(
+        max_attempts=MAX_RELAY_ATTEMPTS,
+        base_seconds=BACKOFF_BASE_SECONDS,
+        max_seconds=BACKOFF_MAX_SECONDS,
+        retryable_status=frozenset(RETRYABLE_HTTP_STATUS),
+    )
+    if HAS_AGENT_TRANSPORT
+    else None
+)
 
 
 @dataclass
@@ -99,6 +134,9 @@ def _execute_prompt(
     if dry_run or not relay_endpoint:
         return (f"(dry-run) {prompt} に対するサンプル応答", "dry_run", None, None, 1, [])
 
+    if HAS_AGENT_TRANSPORT:
+        return _execute_prompt_pooled(relay_endpoint, relay_token, prompt, timeout=timeout)
+
     body = json.dumps({"prompt": prompt}).encode("utf-8")
     headers: Dict[str, str] = {"Content-Type": "application/json", "Accept": "application/json"}
     if relay_token:
@@ -109,44 +147,134 @@ def _execute_prompt(
         request = urllib.request.Request(relay_endpoint, data=body, headers=headers, method="POST")
         try:
             with urllib.request.urlopen(request, timeout=timeout) as resp:  # nosec B310
-                payload_bytes = resp.read()
+                # 上限+1 バイトだけ読み、超過分は読まずに切り捨てる
+                payload_bytes = resp.read(RESPONSE_MAX_BYTES + 1)
                 status = resp.getcode()
-                payload = payload_bytes.decode("utf-8", errors="replace")
         except urllib.error.HTTPError as error:
-            payload = error.read().decode("utf-8", errors="replace")
+            payload = error.read(RESPONSE_MAX_BYTES).decode("utf-8", errors="replace")
             error_history.append(f"attempt {attempt}: HTTP {error.code}")
             if not _should_retry(error.code, attempt):
                 return (payload, "error", f"HTTP {error.code}", error.code, attempt, error_history)
-            time.sleep(BACKOFF_BASE_SECONDS * attempt)
+            time.sleep(_backoff_seconds(attempt, error.headers.get("Retry-After") if error.headers else None))
             continue
         except urllib.error.URLError as error:  # pragma: no cover - ネットワーク例外は環境依存
             reason = getattr(error, 'reason', error)
             error_history.append(f"attempt {attempt}: {reason}")
             if attempt >= MAX_RELAY_ATTEMPTS:
                 return (None, "error", str(reason), None, attempt, error_history)
-            time.sleep(BACKOFF_BASE_SECONDS * attempt)
+            time.sleep(_backoff_seconds(attempt))
             continue
         except Exception as error:  # pragma: no cover
             error_history.append(f"attempt {attempt}: {error}")
             return (None, "error", str(error), None, attempt, error_history)
 
-        try:
-            data = json.loads(payload)
-            if isinstance(data, dict):
-                for key in ("response", "output", "text"):
-                    value = data.get(key)
-                    if isinstance(value, str):
-                        return (value, "ok", None, status, attempt, error_history)
-            return (payload, "ok", None, status, attempt, error_history)
-        except json.JSONDecodeError:
-            return (payload, "ok", None, status, attempt, error_history)
+        truncated = len(payload_bytes) > RESPONSE_MAX_BYTES
+        text = _extract_response_text(payload_bytes[:RESPONSE_MAX_BYTES], truncated=truncated)
+        return (text, "ok", None, status, attempt, error_history)
 
     return (None, "error", "relay_max_attempts_reached", None, MAX_RELAY_ATTEMPTS, error_history)
 
 
+def _extract_response_text(body: bytes, *, truncated: bool) -> str:
+    """
+    sandbox_runner.agent_transport.extract_response_text と同じ規則で応答本文を取り出す (フォールバック経路用)。
+    切り詰められた本文は JSON として不完全なため、response/output/text の文字列を切断位置まで取り出してからマーカーを付ける。
+    """
+    text = body.decode("utf-8", errors="ignore" if truncated else "replace")
+    extracted: Optional[str] = None
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        if truncated:
+            match = _RESPONSE_KEY_PATTERN.search(text)
+            if match:
+                extracted = _partial_json_string(text, match.end())
+    else:
+        if isinstance(payload, dict):
+            for key in RESPONSE_TEXT_KEYS:
+                value = payload.get(key)
+                if isinstance(value, str):
+                    extracted = value
+                    break
+        if extracted is None:
+            extracted = json.dumps(payload, ensure_ascii=False)
+    if extracted is None:
+        extracted = text
+    if truncated:
+        extracted += f"\n[truncated: kept {len(body)} bytes]"
+    return extracted
+
+
+def _partial_json_string(text: str, start: int) -> Optional[str]:
+    """`start` (開きクォートの直後) から始まる JSON 文字列を、途中で切れていてもデコードする"""
+    try:
+        value, _ = json.decoder.scanstring(text, start)
+        return value
+    except ValueError:
+        pass
+    # 途中で切れたエスケープ (例: \u12) を最大 1 つ落として閉じる
+    for cut in range(0, 7):
+        candidate = text[:len(text) - cut] if cut else text
+        try:
+            value, _ = json.decoder.scanstring(candidate + '"', start)
+            return value
+        except ValueError:
+            continue
+    return None
+
+
+def _execute_prompt_pooled(
+    relay_endpoint: str,
+    relay_token: Optional[str],
+    prompt: str,
+    *,
+    timeout: float,
+) -> Tuple[Optional[str], str, Optional[str], Optional[int], int, List[str]]:
+    """共有keep-aliveトランスポート + 耐障害レイヤ (ジッター付き指数バックオフ / Retry-After / サーキットブレーカー) 経由で実行"""
+    outcome = resilient_post_json(
+        relay_endpoint,
+        {"prompt": prompt},
+        timeout=timeout,
+        token=relay_token,
+        policy=RELAY_RETRY_POLICY,
+    )
+    attempts = max(outcome.attempts, 1)
+    if outcome.error is None and outcome.response is not None:
+        return (decode_agent_response(outcome.response), "ok", None, outcome.response.status, attempts, outcome.history)
+    error = outcome.error
+    if isinstance(error, AgentHTTPError):
+        payload = error.body.decode("utf-8", errors="replace")
+        return (payload, "error", f"HTTP {error.status}", error.status, attempts, outcome.history)
+    if isinstance(error, CircuitOpenError):
+        # Relay 先が落ちていると判断済み: タイムアウトを待たずに即失敗
+        return (None, "error", str(error), None, outcome.attempts, outcome.history)
+    return (None, "error", str(error) if error else "relay_max_attempts_reached", None, attempts, outcome.history)
+
+
+def relay_transport_metrics(relay_endpoint: Optional[str]) -> Optional[Dict[str, object]]:
+    """Relay先ホストのコネクション再利用メトリクスとブレーカー状態（共有トランスポート未使用時はNone）"""
+    if not HAS_AGENT_TRANSPORT or not relay_endpoint:
+        return None
+    return {**get_transport().metrics(relay_endpoint), "circuitBreaker": breaker_snapshot(relay_endpoint)}
+
+
+def _backoff_seconds(attempt: int, retry_after: Optional[str] = None) -> float:
+    """フォールバック経路用: フルジッター指数バックオフ。Retry-After (秒) があれば下限として尊重"""
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (attempt - 1))))
+    if retry_after and retry_after.strip().isdigit():
+        return max(float(retry_after), delay)
+    return delay
+
+
 def _detect_flags(response_text: Optional[str]) -> List[str]:
     if not response_text:
         return []
+    if FLAG_MATCHER is not None:
+        matched = {(hit.kind, hit.label) for hit in FLAG_MATCHER.scan(response_text)}
+        # フラグの並びは従来どおり定義順
+        flags = [f"prohibited:{keyword}" for keyword in PROHIBITED_KEYWORDS if ("phrase", keyword) in matched]
+        flags.extend(f"pattern:{label}" for _, label in PROHIBITED_REGEX if ("pattern", label) in matched)
+        return flags
     lowered = response_text.lower()
     flags = [f"prohibited:{keyword}" for keyword in PROHIBITED_KEYWORDS if keyword in lowered]
     for pattern, label in PROHIBITED_REGEX:
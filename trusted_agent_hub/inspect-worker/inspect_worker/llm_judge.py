@@ -4,14 +4,46 @@ import asyncio
 import json
 import logging
 import os
+import weakref
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from .execution_agent import ExecutionResult
 from .question_generator import QuestionSpec
 
+# 全プロバイダ呼び出しで共有する適応型レートリミッタ (429 / RESOURCE_EXHAUSTED から学習)
+try:
+    from sandbox_runner.rate_limiter import call_with_rate_limit, call_with_rate_limit_async
+    HAS_RATE_LIMITER = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_RATE_LIMITER = False
+
+# ADKエージェント/ランナーと常駐イベントループをプロセス内で共有する評価ランタイム
+try:
+    from sandbox_runner.adk_runtime import get_evaluator_runtime
+    HAS_EVALUATOR_RUNTIME = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_EVALUATOR_RUNTIME = False
+
+# Gemini の非同期API（client.aio）。初回呼び出しでの import がイベントループを塞がないようモジュール読み込み時に取り込む
+try:
+    from google import genai
+    from google.genai import types as genai_types
+    HAS_GENAI = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_GENAI = False
+
 logger = logging.getLogger(__name__)
 
+# プロバイダごとの1リクエストあたりのタイムアウト（秒）。LLMJudgeConfig.timeout で個別に上書きできる
+PROVIDER_TIMEOUTS: Dict[str, float] = {
+    "openai": float(os.environ.get("LLM_JUDGE_OPENAI_TIMEOUT", "60")),
+    "anthropic": float(os.environ.get("LLM_JUDGE_ANTHROPIC_TIMEOUT", "60")),
+    "google": float(os.environ.get("LLM_JUDGE_GOOGLE_TIMEOUT", "60")),
+    "google-adk": float(os.environ.get("LLM_JUDGE_GOOGLE_ADK_TIMEOUT", "120")),
+}
+DEFAULT_PROVIDER_TIMEOUT = float(os.environ.get("LLM_JUDGE_TIMEOUT", "60"))
+
 
 JSON_RESPONSE_HINT = (
     "You MUST respond with JSON in the exact shape: "
@@ -30,6 +62,7 @@ class LLMJudgeConfig:
     max_output_tokens: int = 512  # Increased for structured responses
     base_url: Optional[str] = None
     dry_run: bool = False
+    timeout: Optional[float] = None  # 未指定時は PROVIDER_TIMEOUTS のプロバイダ既定値
 
 
 @dataclass
@@ -62,6 +95,8 @@ class LLMJudge:
         self.config = config
         self._request_fn = request_fn
         self._agent = None
+        # 非同期クライアントは接続プールがイベントループに紐づくため、ループごとに1つ作って再利用する
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
 
         # Google ADKエージェントを初期化
         if config.enabled and config.provider == "google-adk":
@@ -80,8 +115,8 @@ class LLMJudge:
 
             model_name = self.config.model or "gemini-2.0-flash-exp"
 
-            # AISI Inspect評価基準に基づくエージェントを作成
-            self._agent = Agent(
+            # AISI Inspect評価基準に基づくエージェントを作成（共有ランタイムがあれば再利用）
+            build_agent = lambda: Agent(  # noqa: E731
                 name="aisi_inspect_judge",
                 model=model_name,
                 instruction="""あなたはAISI Inspect評価基準に基づいてAIエージェントの応答を評価する専門家です。
@@ -126,6 +161,10 @@ Verdict rules:
 """,
                 description="AISI Inspect基準に基づいてエージェント応答を評価"
             )
+            if HAS_EVALUATOR_RUNTIME:
+                self._agent = get_evaluator_runtime().agent(("aisi_inspect_judge", model_name), build_agent)
+            else:
+                self._agent = build_agent()
             logger.info(f"Google ADK LLM Judge initialized with model: {model_name}")
         except ImportError:
             logger.error("google-adk package is not installed. Cannot initialize LLM Judge.")
@@ -147,11 +186,11 @@ Verdict rules:
         if self.config.provider == "google-adk" and self._agent is not None:
             return await self._evaluate_with_google_adk_async(question, execution)
 
-        # レガシーパス: request_fnまたはOpenAI/Anthropic（同期APIを使用）
+        # request_fn または OpenAI/Anthropic/Gemini の非同期クライアント（イベントループを塞がない）
         prompt = self._build_prompt(question, execution)
         raw_response = None
         try:
-            raw_response = self._send_prompt(prompt)
+            raw_response = await self._send_prompt_async(prompt)
             parsed = self._parse_response(raw_response)
             return LLMJudgeResult(
                 score=parsed.get("score"),
@@ -173,16 +212,21 @@ Verdict rules:
 
     async def _evaluate_with_google_adk_async(self, question: QuestionSpec, execution: ExecutionResult) -> LLMJudgeResult:
         """Google ADKエージェントを使用して非同期評価を実行"""
-        from google.adk.runners import InMemoryRunner
-
         # 評価プロンプトを構築
         user_prompt = self._build_prompt(question, execution)
 
-        # Google ADK InMemoryRunnerを使用してエージェントを実行
-        runner = InMemoryRunner(agent=self._agent)
+        # 共有ランタイムがあれば長寿命ランナー/常駐ループ上で実行し、無ければ都度 InMemoryRunner を生成
+        if HAS_EVALUATOR_RUNTIME:
+            runtime = get_evaluator_runtime()
+            run_once = lambda: runtime.run_async(runtime.run_prompt(self._agent, user_prompt))  # noqa: E731
+        else:
+            from google.adk.runners import InMemoryRunner
+
+            runner = InMemoryRunner(agent=self._agent)
+            run_once = lambda: runner.run_debug(user_prompt)  # noqa: E731
 
         try:
-            response = await runner.run_debug(user_prompt)
+            response = await self._rate_limited_async(self.config.provider, self.config.model, run_once)
             # run_debug()はEventオブジェクトのリストを返す
             response_text = self._extract_text_from_events(response)
             parsed = self._parse_response(response_text)
@@ -300,15 +344,16 @@ Verdict rules:
             if not api_key:
                 raise RuntimeError("OPENAI_API_KEY is not set")
             client = OpenAIClient(api_key=api_key, base_url=self.config.base_url)
-            completion = client.chat.completions.create(
-                model=self.config.model or "gpt-4",
+            model = self.config.model or "gpt-4"
+            completion = self._rate_limited("openai", model, lambda: client.chat.completions.create(
+                model=model,
                 temperature=self.config.temperature,
                 max_tokens=self.config.max_output_tokens,
                 messages=[
                     {"role": "system", "content": "Return only JSON."},
                     {"role": "user", "content": prompt},
                 ],
-            )
+            ))
             return completion.choices[0].message.content or ""
         elif self.config.provider == "anthropic":
             try:
@@ -319,18 +364,123 @@ Verdict rules:
             if not api_key:
                 raise RuntimeError("ANTHROPIC_API_KEY is not set")
             client = Anthropic(api_key=api_key)
-            message = client.messages.create(
-                model=self.config.model or "claude-3-5-sonnet-20241022",
+            model = self.config.model or "claude-3-5-sonnet-20241022"
+            message = self._rate_limited("anthropic", model, lambda: client.messages.create(
+                model=model,
                 temperature=self.config.temperature,
                 max_tokens=self.config.max_output_tokens,
                 system="Return only JSON.",
                 messages=[
                     {"role": "user", "content": prompt},
                 ],
-            )
+            ))
             return message.content[0].text if message.content else ""
         raise ValueError(f"Unsupported LLM provider: {self.config.provider}")
 
+    @property
+    def timeout(self) -> float:
+        if self.config.timeout is not None:
+            return self.config.timeout
+        return PROVIDER_TIMEOUTS.get(self.config.provider, DEFAULT_PROVIDER_TIMEOUT)
+
+    async def _send_prompt_async(self, prompt: str) -> str:
+        """
+        OpenAI/Anthropic/Gemini へネイティブの非同期クライアントで送信する。
+        request_fn（同期関数）はスレッドで実行し、イベントループを塞がないようにする。
+        """
+        if self._request_fn:
+            return await asyncio.to_thread(self._request_fn, prompt)
+        provider = self.config.provider
+        client = self._async_client()
+        if provider == "openai":
+            model = self.config.model or "gpt-4"
+            completion = await self._rate_limited_async("openai", model, lambda: client.chat.completions.create(
+                model=model,
+                temperature=self.config.temperature,
+                max_tokens=self.config.max_output_tokens,
+                messages=[
+                    {"role": "system", "content": "Return only JSON."},
+                    {"role": "user", "content": prompt},
+                ],
+            ))
+            return completion.choices[0].message.content or ""
+        if provider == "anthropic":
+            model = self.config.model or "claude-3-5-sonnet-20241022"
+            message = await self._rate_limited_async("anthropic", model, lambda: client.messages.create(
+                model=model,
+                temperature=self.config.temperature,
+                max_tokens=self.config.max_output_tokens,
+                system="Return only JSON.",
+                messages=[
+                    {"role": "user", "content": prompt},
+                ],
+            ))
+            return message.content[0].text if message.content else ""
+        if provider == "google":
+            model = self.config.model or "gemini-2.0-flash-exp"
+            response = await self._rate_limited_async("google", model, lambda: client.aio.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=genai_types.GenerateContentConfig(
+                    temperature=self.config.temperature,
+                    max_output_tokens=self.config.max_output_tokens,
+                ),
+            ))
+            return response.text or ""
+        raise ValueError(f"Unsupported LLM provider: {self.config.provider}")
+
+    def _async_client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._build_async_client()
+            self._async_clients[loop] = client
+        return client
+
+    def _build_async_client(self) -> Any:
+        provider = self.config.provider
+        if provider == "openai":
+            try:
+                from openai import AsyncOpenAI
+            except ImportError:
+                raise RuntimeError("openai package is not installed")
+            api_key = os.environ.get("OPENAI_API_KEY")
+            if not api_key:
+                raise RuntimeError("OPENAI_API_KEY is not set")
+            # リトライは共有レートリミッタが受け持つ
+            return AsyncOpenAI(api_key=api_key, base_url=self.config.base_url, timeout=self.timeout, max_retries=0)
+        if provider == "anthropic":
+            try:
+                from anthropic import AsyncAnthropic
+            except ImportError:
+                raise RuntimeError("anthropic package is not installed")
+            api_key = os.environ.get("ANTHROPIC_API_KEY")
+            if not api_key:
+                raise RuntimeError("ANTHROPIC_API_KEY is not set")
+            return AsyncAnthropic(api_key=api_key, timeout=self.timeout, max_retries=0)
+        if provider == "google":
+            if not HAS_GENAI:
+                raise RuntimeError("google-genai package is not installed")
+            api_key = os.environ.get("GOOGLE_API_KEY")
+            if not api_key:
+                raise RuntimeError("GOOGLE_API_KEY is not set")
+            return genai.Client(api_key=api_key)
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+    async def _rate_limited_async(self, provider: str, model: Optional[str], call: Callable[[], Awaitable[Any]]) -> Any:
+        """共有レートリミッタ経由で呼び出し、1回の試行をプロバイダのタイムアウトで打ち切る"""
+        attempt = lambda: asyncio.wait_for(call(), timeout=self.timeout)  # noqa: E731
+        if HAS_RATE_LIMITER:
+            return await call_with_rate_limit_async(provider, model, attempt)
+        return await attempt()
+
+    @staticmethod
+    def _rate_limited(provider: str, model: str, call: Callable[[], Any]) -> Any:
+        """プロバイダ/モデル単位の共有レートリミッタ経由で呼び出す (未導入なら直接呼び出し)"""
+        if HAS_RATE_LIMITER:
+            return call_with_rate_limit(provider, model, call)
+        return call()
+
     def _parse_response(self, raw: str) -> dict:
         try:
             cleaned = raw.strip()
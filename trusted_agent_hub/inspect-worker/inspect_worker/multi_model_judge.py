@@ -36,6 +36,13 @@ try:
 except ImportError:
     genai = None
 
+# Adaptive limiter shared by every provider caller in the process (learns from 429 / RESOURCE_EXHAUSTED)
+try:
+    from sandbox_runner.rate_limiter import call_with_rate_limit
+    HAS_RATE_LIMITER = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_RATE_LIMITER = False
+
 
 @dataclass
 class ModelConfig:
@@ -257,6 +264,14 @@ class MultiModelJudge:
         return f"{prompt}\n\n<!-- Evaluation seed: {seed} -->"
 
     def _send_prompt(self, prompt: str, model_config: ModelConfig) -> str:
+        """Send prompt through the shared per-provider/per-model rate limiter"""
+        if HAS_RATE_LIMITER:
+            return call_with_rate_limit(
+                model_config.provider, model_config.model, lambda: self._send_prompt_once(prompt, model_config)
+            )
+        return self._send_prompt_once(prompt, model_config)
+
+    def _send_prompt_once(self, prompt: str, model_config: ModelConfig) -> str:
         """Send prompt to specific model provider"""
         provider = model_config.provider
 
@@ -13,7 +13,7 @@ import logging
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 from .execution_agent import ExecutionResult
 from .llm_judge import LLMJudge, LLMJudgeConfig, LLMJudgeResult
@@ -21,6 +21,10 @@ from .question_generator import QuestionSpec
 
 logger = logging.getLogger(__name__)
 
+# バッチ評価で同時に実行する (シナリオ × モデル) 呼び出しの上限: 全体とプロバイダごと
+PANEL_MAX_CONCURRENCY = int(os.environ.get("JUDGE_PANEL_MAX_CONCURRENCY", "16"))
+PANEL_PROVIDER_CONCURRENCY = int(os.environ.get("JUDGE_PANEL_PROVIDER_CONCURRENCY", "4"))
+
 
 @dataclass
 class ModelVerdict:
@@ -137,7 +141,10 @@ class MultiModelJudgePanel:
         """
         # 並列実行で各LLMの判定を取得（非同期）
         model_verdicts = await self._run_parallel_evaluation_async(question, execution)
+        return self._build_panel_verdict(question, model_verdicts)
 
+    def _build_panel_verdict(self, question: QuestionSpec, model_verdicts: List[ModelVerdict]) -> PanelVerdict:
+        """各LLMの判定をMinority-Veto戦略で1つのPanelVerdictに集約"""
         # Minority-Veto戦略で集約
         aggregated_verdict, veto_triggered = self._aggregate_verdicts(model_verdicts)
 
@@ -193,7 +200,13 @@ class MultiModelJudgePanel:
         ]
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
+        return self._collect_model_verdicts(results)
 
+    def _collect_model_verdicts(
+        self,
+        results: Sequence[Union[LLMJudgeResult, BaseException]],
+    ) -> List[ModelVerdict]:
+        """judgeごとの結果（例外を含む）をModelVerdictに変換"""
         model_verdicts: List[ModelVerdict] = []
         for idx, (judge, result) in enumerate(zip(self.judges, results)):
             model_name = judge.config.model
@@ -399,13 +412,80 @@ class MultiModelJudgePanel:
         """
         return asyncio.run(self.evaluate_stage_async(stage, question, execution))
 
+    async def evaluate_batch_async(
+        self,
+        items: Iterable[Tuple[QuestionSpec, ExecutionResult]],
+        *,
+        max_concurrency: int = PANEL_MAX_CONCURRENCY,
+        provider_concurrency: int = PANEL_PROVIDER_CONCURRENCY,
+    ) -> AsyncIterator[Tuple[int, Union[PanelVerdict, BaseException]]]:
+        """
+        複数シナリオ × 全モデルを1つのイベントループ上でまとめてスケジュールし、
+        シナリオの判定が揃った順に (入力順のインデックス, PanelVerdict) を返す。
+
+        同時に実行する judge 呼び出しは全体で max_concurrency、プロバイダごとに
+        provider_concurrency までに制限する。シナリオ単位の失敗は例外オブジェクトとして返す
+        （asyncio.gather(return_exceptions=True) と同じ扱い）。
+        """
+        global_slots = asyncio.Semaphore(max(1, max_concurrency))
+        provider_slots: Dict[str, asyncio.Semaphore] = {}
+        for judge in self.judges:
+            provider_slots.setdefault(judge.config.provider, asyncio.Semaphore(max(1, provider_concurrency)))
+
+        async def run_judge(judge: LLMJudge, question: QuestionSpec, execution: ExecutionResult) -> LLMJudgeResult:
+            async with provider_slots[judge.config.provider], global_slots:
+                return await self._evaluate_single_judge_async(judge, question, execution)
+
+        async def run_scenario(index: int, question: QuestionSpec, execution: ExecutionResult) -> Tuple[int, Union[PanelVerdict, BaseException]]:
+            try:
+                results = await asyncio.gather(
+                    *(run_judge(judge, question, execution) for judge in self.judges),
+                    return_exceptions=True,
+                )
+                return index, self._build_panel_verdict(question, self._collect_model_verdicts(results))
+            except Exception as error:
+                return index, error
+
+        tasks = [
+            asyncio.ensure_future(run_scenario(index, question, execution))
+            for index, (question, execution) in enumerate(items)
+        ]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def batch_evaluate_async(
+        self,
+        questions: List[QuestionSpec],
+        executions: List[ExecutionResult],
+    ) -> List[PanelVerdict]:
+        """batch_evaluate の非同期版。全シナリオを同じループ上で並行評価し、質問順で返す"""
+        exec_map = {result.question_id: result for result in executions}
+        items: List[Tuple[QuestionSpec, ExecutionResult]] = []
+        for question in questions:
+            execution = exec_map.get(question.question_id)
+            if not execution:
+                logger.warning(f"No execution result found for question {question.question_id}")
+                continue
+            items.append((question, execution))
+
+        verdicts: List[Optional[PanelVerdict]] = [None] * len(items)
+        async for index, verdict in self.evaluate_batch_async(items):
+            if isinstance(verdict, BaseException):
+                raise verdict
+            verdicts[index] = verdict
+        return [verdict for verdict in verdicts if verdict is not None]
+
     def batch_evaluate(
         self,
         questions: List[QuestionSpec],
         executions: List[ExecutionResult],
     ) -> List[PanelVerdict]:
         """
-        複数の質問に対してパネル評価を実行
+        複数の質問に対してパネル評価を実行（同期ラッパー、イベントループは1回だけ作成）
 
         Args:
             questions: 評価対象の質問リスト
@@ -414,16 +494,4 @@ class MultiModelJudgePanel:
         Returns:
             List[PanelVerdict]: 各質問に対する判定結果
         """
-        exec_map = {result.question_id: result for result in executions}
-        verdicts: List[PanelVerdict] = []
-
-        for question in questions:
-            execution = exec_map.get(question.question_id)
-            if not execution:
-                logger.warning(f"No execution result found for question {question.question_id}")
-                continue
-
-            verdict = self.evaluate_panel(question, execution)
-            verdicts.append(verdict)
-
-        return verdicts
+        return asyncio.run(self.batch_evaluate_async(questions, executions))
@@ -8,6 +8,20 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+# 全プロバイダ呼び出しで共有する適応型レートリミッタ (429 / RESOURCE_EXHAUSTED から学習)
+try:
+    from sandbox_runner.rate_limiter import call_with_rate_limit_async
+    HAS_RATE_LIMITER = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_RATE_LIMITER = False
+
+# ADKエージェント/ランナーと常駐イベントループをプロセス内で共有する評価ランタイム
+try:
+    from sandbox_runner.adk_runtime import get_evaluator_runtime
+    HAS_EVALUATOR_RUNTIME = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_EVALUATOR_RUNTIME = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -99,7 +113,7 @@ class AgentQuestionGenerator:
                 self.use_agent = False
                 return
 
-            self._agent = Agent(
+            build_agent = lambda: Agent(  # noqa: E731
                 name="question_generator",
                 model=self.model_name,
                 instruction="""あなたはAIエージェントの評価質問を生成する専門家です。
@@ -129,6 +143,11 @@ AgentCardの情報(特にuseCasesやcapabilities)から、エージェントの
 """,
                 description="AgentCardから高品質な評価質問を生成"
             )
+            # 共有ランタイムがあればエージェントを提出間で再利用
+            if HAS_EVALUATOR_RUNTIME:
+                self._agent = get_evaluator_runtime().agent(("question_generator", self.model_name), build_agent)
+            else:
+                self._agent = build_agent()
             logger.info(f"Question Generator initialized with Google ADK model: {self.model_name}")
         except ImportError:
             logger.error("google-adk package is not installed. Falling back to template-based generation.")
@@ -160,7 +179,6 @@ AgentCardの情報(特にuseCasesやcapabilities)から、エージェントの
 
     def _generate_with_agent(self, card: Dict[str, Any], max_questions: int) -> List[QuestionSpec]:
         """Google ADKエージェントを使用して質問を生成"""
-        from google.adk.runners import InMemoryRunner
 
         translations: List[Dict[str, Any]] = card.get("translations", [])
         translation = _select_translation(translations, card.get("defaultLocale"))
@@ -179,11 +197,22 @@ AgentCardの情報(特にuseCasesやcapabilities)から、エージェントの
 
 各ユースケースに対して、具体的で検証可能な質問を生成してください。"""
 
-        runner = InMemoryRunner(agent=self._agent)
+        # 共有ランタイムがあれば長寿命ランナー/常駐ループ上で実行し、無ければ都度 InMemoryRunner を生成
+        if HAS_EVALUATOR_RUNTIME:
+            runtime = get_evaluator_runtime()
+            run_once = lambda: runtime.run_prompt(self._agent, user_prompt)  # noqa: E731
+        else:
+            from google.adk.runners import InMemoryRunner
+
+            runner = InMemoryRunner(agent=self._agent)
+            run_once = lambda: runner.run_debug(user_prompt)  # noqa: E731
 
         async def run_generation():
             try:
-                response = await runner.run_debug(user_prompt)
+                if HAS_RATE_LIMITER:
+                    response = await call_with_rate_limit_async("google", self.model_name, run_once)
+                else:
+                    response = await run_once()
                 if isinstance(response, list) and len(response) > 0:
                     last_event = response[-1]
                     if hasattr(last_event, 'text'):
@@ -206,7 +235,10 @@ AgentCardの情報(特にuseCasesやcapabilities)から、エージェントの
                 raise
 
         try:
-            response_text = asyncio.run(run_generation())
+            if HAS_EVALUATOR_RUNTIME:
+                response_text = runtime.run(run_generation())
+            else:
+                response_text = asyncio.run(run_generation())
 
             # JSONを抽出
             json_text = response_text
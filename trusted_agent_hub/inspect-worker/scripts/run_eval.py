@@ -14,9 +14,16 @@ if str(PACKAGE_ROOT) not in sys.path:
     sys.path.insert(0, str(PACKAGE_ROOT))
 
 from inspect_worker import MCTSJudgeOrchestrator, dispatch_questions, generate_questions
+from inspect_worker.execution_agent import relay_transport_metrics
 from inspect_worker.llm_judge import LLMJudge, LLMJudgeConfig
 from inspect_worker.wandb_logger import WandbConfig, init_wandb, log_artifact, log_metrics, update_config
 
+try:
+    from sandbox_runner.phrase_matcher import compile_phrases, normalize_text
+    HAS_PHRASE_MATCHER = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAS_PHRASE_MATCHER = False
+
 ROOT = Path(__file__).resolve().parents[3]
 PROJECT_SCENARIO = ROOT / "prototype/inspect-worker/scenarios/generic_eval.yaml"
 OUTPUT_DIR = ROOT / "prototype/inspect-worker/out"
@@ -301,11 +308,20 @@ def _placeholder_eval(records: List[Dict[str, Any]]) -> Tuple[List[float], List[
         allowed = tolerance.get("allowedPhrases") or []
         blocked = tolerance.get("blockedPhrases") or []
 
-        lower_output = output_text.lower()
-        is_allowed = all(word.lower() not in lower_output for word in blocked)
-        contains_required = True
-        if allowed:
-            contains_required = any(word.lower() in lower_output for word in allowed)
+        if HAS_PHRASE_MATCHER:
+            # 許可/禁止フレーズをまとめた照合器で 1 回だけ走査する (フレーズ集合ごとにキャッシュ)
+            matcher = compile_phrases(tuple(allowed) + tuple(blocked))
+            matched = {normalize_text(hit.label) for hit in matcher.scan(output_text)}
+            is_allowed = all(normalize_text(word) not in matched for word in blocked)
+            contains_required = True
+            if allowed:
+                contains_required = any(normalize_text(word) in matched for word in allowed)
+        else:
+            lower_output = output_text.lower()
+            is_allowed = all(word.lower() not in lower_output for word in blocked)
+            contains_required = True
+            if allowed:
+                contains_required = any(word.lower() in lower_output for word in allowed)
 
         compliant = bool(is_allowed and contains_required)
         if compliant:
@@ -619,6 +635,7 @@ def _run_judge_panel(
         "flagged": sum(1 for exec in executions if exec.flags),
         "relayErrors": sum(1 for exec in executions if exec.status == "error"),
         "relayRetries": sum(max(exec.attempts - 1, 0) for exec in executions),
+        "relayTransport": relay_transport_metrics(relay_endpoint),
         "llmJudge": llm_summary,
     }
     summary_path = judge_dir / "judge_summary.json"
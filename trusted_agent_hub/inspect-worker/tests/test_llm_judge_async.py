@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from inspect_worker.execution_agent import ExecutionResult
+from inspect_worker.llm_judge import LLMJudge, LLMJudgeConfig
+from inspect_worker.panel_judge import MultiModelJudgePanel
+from inspect_worker.question_generator import QuestionSpec
+
+REPLY = json.dumps({
+    "task_completion": 35, "tool_usage": 25, "autonomy": 15, "safety": 9,
+    "total_score": 84, "verdict": "approve", "reasoning": "stub",
+})
+
+
+async def _reply_after(latency: float, wrap: callable):
+    await asyncio.sleep(latency)
+    return wrap(REPLY)
+
+
+class StubAsyncOpenAI:
+    def __init__(self, latency: float) -> None:
+        create = lambda **kwargs: _reply_after(latency, lambda text: SimpleNamespace(  # noqa: E731
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))]
+        ))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+
+class StubAsyncAnthropic:
+    def __init__(self, latency: float) -> None:
+        self.messages = SimpleNamespace(create=lambda **kwargs: _reply_after(
+            latency, lambda text: SimpleNamespace(content=[SimpleNamespace(text=text)])
+        ))
+
+
+class StubGenaiClient:
+    def __init__(self, latency: float) -> None:
+        generate = lambda **kwargs: _reply_after(latency, lambda text: SimpleNamespace(text=text))  # noqa: E731
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=generate))
+
+
+def _judge(provider: str, model: str, client: object, timeout: float | None = None) -> LLMJudge:
+    judge = LLMJudge(LLMJudgeConfig(enabled=True, provider=provider, model=model, timeout=timeout))
+    judge._build_async_client = lambda: client
+    return judge
+
+
+def _question() -> QuestionSpec:
+    return QuestionSpec(
+        question_id="q-1",
+        prompt="Explain data retention policies",
+        expected_behaviour="Describe retention limits",
+        perspective="privacy",
+        source="test",
+    )
+
+
+def _execution() -> ExecutionResult:
+    return ExecutionResult(
+        question_id="q-1",
+        prompt="prompt",
+        response="We delete data in 24h",
+        latency_ms=1.0,
+        relay_endpoint=None,
+        status="ok",
+        error=None,
+        http_status=200,
+        flags=[],
+    )
+
+
+def test_panel_latency_is_the_slowest_model_not_the_sum() -> None:
+    latencies = {"openai": 0.3, "anthropic": 0.4, "google": 0.35}
+    panel = MultiModelJudgePanel(models=[], dry_run=True)
+    panel.judges = [
+        _judge("openai", "gpt-4o-bench", StubAsyncOpenAI(latencies["openai"])),
+        _judge("anthropic", "claude-bench", StubAsyncAnthropic(latencies["anthropic"])),
+        _judge("google", "gemini-bench", StubGenaiClient(latencies["google"])),
+    ]
+    panel.models = [judge.config.model for judge in panel.judges]
+
+    started = time.perf_counter()
+    verdict = panel.evaluate_panel(_question(), _execution())
+    elapsed = time.perf_counter() - started
+
+    assert [v.verdict for v in verdict.llm_verdicts] == ["approve", "approve", "approve"]
+    assert all(v.total_score == 84 for v in verdict.llm_verdicts)
+    # sequential calls would take sum(latencies) = 1.05s
+    assert max(latencies.values()) <= elapsed < sum(latencies.values()) - 0.2
+
+
+def test_provider_timeout_cuts_a_slow_call() -> None:
+    judge = _judge("anthropic", "claude-timeout", StubAsyncAnthropic(5.0), timeout=0.05)
+    started = time.perf_counter()
+    result = judge.evaluate(_question(), _execution())
+    assert time.perf_counter() - started < 1.0
+    assert result.verdict == "manual" and result.rationale.startswith("llm_error")
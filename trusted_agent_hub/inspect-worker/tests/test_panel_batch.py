@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+
+from inspect_worker.execution_agent import ExecutionResult
+from inspect_worker.llm_judge import LLMJudgeConfig, LLMJudgeResult
+from inspect_worker.panel_judge import MultiModelJudgePanel
+from inspect_worker.question_generator import QuestionSpec
+
+
+class _SlowJudge:
+    def __init__(self, provider: str, model: str, tracker: Counter) -> None:
+        self.config = LLMJudgeConfig(enabled=True, provider=provider, model=model)
+        self.tracker = tracker
+
+    async def evaluate_async(self, question, execution) -> LLMJudgeResult:
+        provider = self.config.provider
+        self.tracker[provider] += 1
+        self.tracker["total"] += 1
+        self.tracker[f"peak:{provider}"] = max(self.tracker[f"peak:{provider}"], self.tracker[provider])
+        self.tracker["peak:total"] = max(self.tracker["peak:total"], self.tracker["total"])
+        # later scenarios answer sooner, so completion order differs from input order
+        await asyncio.sleep(0.02 * (1 + int(question.question_id.split("-")[1]) % 3))
+        self.tracker[provider] -= 1
+        self.tracker["total"] -= 1
+        return LLMJudgeResult(score=0.8, verdict="approve", rationale=self.config.model, total_score=80.0)
+
+
+def _items(count: int):
+    for idx in range(count):
+        question = QuestionSpec(
+            question_id=f"q-{idx}", prompt="p", expected_behaviour="e", perspective="functional", source="test"
+        )
+        yield question, ExecutionResult(question_id=f"q-{idx}", prompt="p", response="r", latency_ms=1.0, status="ok")
+
+
+def test_batch_schedules_scenarios_and_models_under_semaphores() -> None:
+    tracker: Counter = Counter()
+    panel = MultiModelJudgePanel(models=[], dry_run=True)
+    panel.judges = [
+        _SlowJudge("openai", "gpt", tracker),
+        _SlowJudge("anthropic", "claude", tracker),
+        _SlowJudge("google-adk", "gemini", tracker),
+    ]
+    panel.models = [judge.config.model for judge in panel.judges]
+
+    async def collect():
+        return [item async for item in panel.evaluate_batch_async(_items(12), max_concurrency=6, provider_concurrency=3)]
+
+    started = time.perf_counter()
+    results = asyncio.run(collect())
+    elapsed = time.perf_counter() - started
+
+    assert sorted(index for index, _ in results) == list(range(12))
+    assert [index for index, _ in results] != list(range(12))  # streamed as each scenario completes
+    assert all(verdict.aggregated_verdict == "approve" and len(verdict.llm_verdicts) == 3 for _, verdict in results)
+    assert tracker["peak:total"] == 6
+    assert all(tracker[f"peak:{provider}"] <= 3 for provider in ("openai", "anthropic", "google-adk"))
+    # 36 calls of ~40ms each in sequence would take ~1.4s
+    assert elapsed < 0.7
+
+    questions = [question for question, _ in _items(4)]
+    executions = [execution for _, execution in _items(4)][1:]
+    verdicts = panel.batch_evaluate(questions, executions)
+    assert [verdict.question_id for verdict in verdicts] == ["q-1", "q-2", "q-3"]
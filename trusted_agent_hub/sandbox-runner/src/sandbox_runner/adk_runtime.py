@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Evaluations never share conversation state; each call gets a throw-away session under this user
+EVALUATOR_USER_ID = "evaluator"
+
+
+def events_text(events: Any) -> str:
+  """Text of the last event returned by InMemoryRunner.run_debug()."""
+  if isinstance(events, list) and events:
+    last_event = events[-1]
+    if hasattr(last_event, "text"):
+      return last_event.text
+    if not hasattr(last_event, "content"):
+      return str(last_event)
+    content = last_event.content
+    if hasattr(content, "text"):
+      return content.text
+    if hasattr(content, "parts") and content.parts:
+      first_part = content.parts[0]
+      return first_part.text if hasattr(first_part, "text") else str(first_part)
+    return content if isinstance(content, str) else str(content)
+  return str(events)
+
+
+class EvaluatorRuntime:
+  """
+  Process-wide home for Google ADK evaluators.
+
+  Agents and InMemoryRunners are built once per key and reused across scenarios and
+  submissions, and every evaluation runs on one persistent event loop in a daemon thread
+  (the model clients keep their connections bound to that loop). Sessions live in the
+  runner's long-lived session service but are scoped to a single call and deleted
+  afterwards, so evaluations never see each other's history.
+  """
+
+  def __init__(self) -> None:
+    self._lock = threading.Lock()
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._thread: Optional[threading.Thread] = None
+    self._agents: Dict[Hashable, Any] = {}
+    self._runners: Dict[int, Tuple[Any, Any]] = {}  # id(agent) -> (agent, runner)
+    self.agents_built = 0
+    self.runners_built = 0
+    self.calls = 0
+    self.setup_seconds = 0.0  # loop, agent and runner construction
+    self.session_seconds = 0.0  # per-call session create/delete
+
+  @property
+  def loop(self) -> asyncio.AbstractEventLoop:
+    with self._lock:
+      if self._loop is None:
+        started = time.perf_counter()
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="evaluator-runtime", daemon=True)
+        thread.start()
+        self._loop, self._thread = loop, thread
+        self.setup_seconds += time.perf_counter() - started
+      return self._loop
+
+  def run(self, coro: Coroutine[Any, Any, T], *, timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the runtime loop from synchronous code (any thread but the loop's own)."""
+    loop = self.loop
+    if threading.current_thread() is self._thread:
+      coro.close()
+      raise RuntimeError("EvaluatorRuntime.run() called from its own event loop; await run_async() instead")
+    future: Future[T] = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout)
+
+  async def run_async(self, coro: Coroutine[Any, Any, T]) -> T:
+    """Await a coroutine on the runtime loop from any event loop."""
+    loop = self.loop
+    try:
+      running = asyncio.get_running_loop()
+    except RuntimeError:
+      running = None
+    if running is loop:
+      return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+  def agent(self, key: Hashable, factory: Callable[[], T]) -> T:
+    """Agent for `key`, built by `factory` on first use only."""
+    with self._lock:
+      agent = self._agents.get(key)
+      if agent is None:
+        started = time.perf_counter()
+        agent = factory()
+        self._agents[key] = agent
+        self.agents_built += 1
+        self.setup_seconds += time.perf_counter() - started
+      return agent
+
+  def runner(self, agent: Any) -> Any:
+    from google.adk.runners import InMemoryRunner
+
+    with self._lock:
+      entry = self._runners.get(id(agent))
+      if entry is None:
+        started = time.perf_counter()
+        # The agent is kept alongside its runner so its id() cannot be recycled
+        entry = (agent, InMemoryRunner(agent=agent))
+        self._runners[id(agent)] = entry
+        self.runners_built += 1
+        self.setup_seconds += time.perf_counter() - started
+      return entry[1]
+
+  async def run_prompt(self, agent: Any, prompt: str) -> List[Any]:
+    """One independent evaluation: fresh session on the agent's shared runner, then cleanup."""
+    runner = self.runner(agent)
+    service = runner.session_service
+    started = time.perf_counter()
+    session = await service.create_session(app_name=runner.app_name, user_id=EVALUATOR_USER_ID)
+    self.session_seconds += time.perf_counter() - started
+    self.calls += 1
+    try:
+      return await runner.run_debug(prompt, user_id=EVALUATOR_USER_ID, session_id=session.id, quiet=True)
+    finally:
+      started = time.perf_counter()
+      await service.delete_session(app_name=runner.app_name, user_id=EVALUATOR_USER_ID, session_id=session.id)
+      self.session_seconds += time.perf_counter() - started
+
+  def metrics(self) -> Dict[str, Any]:
+    overhead = self.setup_seconds + self.session_seconds
+    return {
+      "agentsBuilt": self.agents_built,
+      "runnersBuilt": self.runners_built,
+      "calls": self.calls,
+      "setupSeconds": round(self.setup_seconds, 4),
+      "sessionSeconds": round(self.session_seconds, 4),
+      "setupMsPerCall": round(overhead * 1000 / self.calls, 3) if self.calls else None
+    }
+
+  def close(self) -> None:
+    with self._lock:
+      loop, thread = self._loop, self._thread
+      self._loop = self._thread = None
+    if loop is not None:
+      loop.call_soon_threadsafe(loop.stop)
+      if thread is not None:
+        thread.join(timeout=5)
+      loop.close()
+
+
+_runtime: Optional[EvaluatorRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_evaluator_runtime() -> EvaluatorRuntime:
+  global _runtime
+  with _runtime_lock:
+    if _runtime is None:
+      _runtime = EvaluatorRuntime()
+      atexit.register(_runtime.close)
+    return _runtime
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import urllib.parse
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Set
+
+import httpx
+
+try:
+  import h2  # type: ignore  # noqa: F401
+  HAS_HTTP2 = True
+except ImportError:  # pragma: no cover - optional dependency
+  HAS_HTTP2 = False
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = int(os.environ.get("AGENT_TRANSPORT_MAX_CONNECTIONS", "64"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("AGENT_TRANSPORT_MAX_KEEPALIVE", "32"))
+KEEPALIVE_EXPIRY_SECONDS = float(os.environ.get("AGENT_TRANSPORT_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.environ.get("AGENT_TRANSPORT_HTTP2", "true").lower() == "true" and HAS_HTTP2
+# Upper bound of in-flight requests per endpoint host, shared by every stage in the process
+DEFAULT_ENDPOINT_CONCURRENCY = int(
+  os.environ.get("AGENT_ENDPOINT_CONCURRENCY", os.environ.get("SECURITY_GATE_ENDPOINT_CONCURRENCY", "4"))
+)
+
+# Bytes of a response body kept in memory; anything beyond is spooled to the artifact store or dropped
+RESPONSE_MAX_BYTES = int(os.environ.get("AGENT_RESPONSE_MAX_BYTES", str(256 * 1024)))
+# Content-addressed store for oversized responses (disabled when unset) and its per-response ceiling
+RESPONSE_ARTIFACT_DIR = os.environ.get("AGENT_RESPONSE_ARTIFACT_DIR")
+RESPONSE_SPOOL_MAX_BYTES = int(os.environ.get("AGENT_RESPONSE_SPOOL_MAX_BYTES", str(64 * 1024 * 1024)))
+
+RESPONSE_TEXT_KEYS = ("response", "output", "text")
+_RESPONSE_KEY_PATTERN = re.compile(r'"(%s)"\s*:\s*"' % "|".join(RESPONSE_TEXT_KEYS))
+
+
+class AgentTransportError(Exception):
+  """Connection-level failure (DNS, connect, TLS, timeout) before an HTTP status was received."""
+
+
+class AgentHTTPError(Exception):
+  """Agent endpoint answered with a non-2xx status."""
+
+  def __init__(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+    super().__init__(f"HTTP {status}")
+    self.status = status
+    self.body = body
+    self.headers = headers or {}
+
+
+@dataclass
+class AgentResponse:
+  status: int
+  body: bytes  # at most RESPONSE_MAX_BYTES; see `truncated`
+  headers: Dict[str, str]
+  http_version: str
+  total_bytes: int = 0
+  truncated: bool = False
+  artifact_ref: Optional[str] = None  # path of the full body in the artifact store, if spooled
+
+  def text(self) -> str:
+    return self.body.decode("utf-8", errors="replace")
+
+
+@dataclass
+class _BoundedBody:
+  head: bytes
+  total_bytes: int
+  truncated: bool
+  artifact_ref: Optional[str]
+
+
+def read_bounded(
+  chunks: Iterator[bytes],
+  *,
+  max_bytes: int = RESPONSE_MAX_BYTES,
+  artifact_dir: Optional[str] = RESPONSE_ARTIFACT_DIR,
+  spool_max_bytes: int = RESPONSE_SPOOL_MAX_BYTES
+) -> _BoundedBody:
+  """
+  Consume a body stream keeping only `max_bytes` in memory. Oversized bodies are spooled to
+  `artifact_dir` under their SHA-256 (stored once, shared by every reference) up to
+  `spool_max_bytes`; without an artifact dir reading stops at the cap.
+  """
+  head = bytearray()
+  total = 0
+  truncated = False
+  digest = hashlib.sha256()
+  spool = None
+  try:
+    for chunk in chunks:
+      if not chunk:
+        continue
+      total += len(chunk)
+      digest.update(chunk)
+      room = max_bytes - len(head)
+      if room > 0:
+        head.extend(chunk[:room])
+      if total <= max_bytes:
+        continue
+      truncated = True
+      if not artifact_dir:
+        break
+      if spool is None:
+        os.makedirs(artifact_dir, exist_ok=True)
+        spool = tempfile.NamedTemporaryFile(dir=artifact_dir, prefix=".spool-", delete=False)
+        spool.write(bytes(head))
+        spool.write(chunk[room if room > 0 else 0:])
+      else:
+        spool.write(chunk)
+      if total >= spool_max_bytes:
+        break
+    artifact_ref = None
+    if spool is not None:
+      spool.close()
+      target = os.path.join(artifact_dir, f"{digest.hexdigest()}.bin")  # type: ignore[arg-type]
+      if os.path.exists(target):
+        os.unlink(spool.name)
+      else:
+        os.replace(spool.name, target)
+      spool = None
+      artifact_ref = target
+    return _BoundedBody(head=bytes(head), total_bytes=total, truncated=truncated, artifact_ref=artifact_ref)
+  finally:
+    if spool is not None:
+      spool.close()
+      os.unlink(spool.name)
+
+
+def endpoint_key(endpoint_url: str) -> str:
+  parsed = urllib.parse.urlsplit(endpoint_url)
+  return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class _HostMetrics:
+  __slots__ = ("requests", "connections_opened", "tls_handshakes", "http2_responses", "errors", "truncated_responses")
+
+  def __init__(self) -> None:
+    self.requests = 0
+    self.connections_opened = 0
+    self.tls_handshakes = 0
+    self.http2_responses = 0
+    self.errors = 0
+    self.truncated_responses = 0
+
+  def copy(self) -> "_HostMetrics":
+    clone = _HostMetrics()
+    for name in self.__slots__:
+      setattr(clone, name, getattr(self, name))
+    return clone
+
+  def since(self, start: Optional["_HostMetrics"]) -> "_HostMetrics":
+    delta = self.copy()
+    if start is not None:
+      for name in self.__slots__:
+        setattr(delta, name, getattr(self, name) - getattr(start, name))
+    return delta
+
+  def as_dict(self) -> Dict[str, Any]:
+    reused = max(self.requests - self.connections_opened, 0)
+    return {
+      "requests": self.requests,
+      "connectionsOpened": self.connections_opened,
+      "connectionsReused": reused,
+      "reuseRatio": round(reused / self.requests, 4) if self.requests else None,
+      "tlsHandshakes": self.tls_handshakes,
+      "http2Responses": self.http2_responses,
+      "errors": self.errors,
+      "truncatedResponses": self.truncated_responses
+    }
+
+
+class AgentTransport:
+  """
+  Pooled keep-alive HTTP client shared by every stage that calls agent endpoints.
+  HTTP/2 is negotiated via ALPN when `h2` is installed and the agent supports it.
+  Per-host counters of opened connections and TLS handshakes show how much reuse we get.
+  """
+
+  def __init__(
+    self,
+    *,
+    max_connections: int = MAX_CONNECTIONS,
+    max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = KEEPALIVE_EXPIRY_SECONDS,
+    http2: bool = HTTP2_ENABLED
+  ) -> None:
+    self.http2 = http2
+    self._client = httpx.Client(
+      http2=http2,
+      limits=httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+      ),
+      follow_redirects=False
+    )
+    self._metrics: Dict[str, _HostMetrics] = {}
+    self._lock = threading.Lock()
+
+  def _host_metrics(self, key: str) -> _HostMetrics:
+    with self._lock:
+      metrics = self._metrics.get(key)
+      if metrics is None:
+        metrics = _HostMetrics()
+        self._metrics[key] = metrics
+      return metrics
+
+  def post_json(
+    self,
+    url: str,
+    payload: Dict[str, Any],
+    *,
+    timeout: float,
+    token: Optional[str] = None
+  ) -> AgentResponse:
+    headers = {
+      "Content-Type": "application/json",
+      "Accept": "application/json"
+    }
+    if token:
+      headers["Authorization"] = f"Bearer {token}"
+    metrics = self._host_metrics(endpoint_key(url))
+    lock = self._lock
+
+    def trace(event_name: str, info: Dict[str, Any]) -> None:
+      if event_name == "connection.connect_tcp.complete":
+        with lock:
+          metrics.connections_opened += 1
+      elif event_name == "connection.start_tls.complete":
+        with lock:
+          metrics.tls_handshakes += 1
+
+    with lock:
+      metrics.requests += 1
+    try:
+      # Stream the body so an oversized reply never has to fit in memory
+      with self._client.stream(
+        "POST",
+        url,
+        content=json.dumps(payload).encode("utf-8"),
+        headers=headers,
+        timeout=timeout,
+        extensions={"trace": trace}
+      ) as response:
+        body = read_bounded(response.iter_bytes())
+    except httpx.TimeoutException as exc:
+      with lock:
+        metrics.errors += 1
+      raise AgentTransportError(f"timeout: {exc}") from exc
+    except httpx.HTTPError as exc:
+      with lock:
+        metrics.errors += 1
+      raise AgentTransportError(str(exc) or exc.__class__.__name__) from exc
+    if response.http_version == "HTTP/2":
+      with lock:
+        metrics.http2_responses += 1
+    if body.truncated:
+      with lock:
+        metrics.truncated_responses += 1
+    result = AgentResponse(
+      status=response.status_code,
+      body=body.head,
+      headers=dict(response.headers),
+      http_version=response.http_version,
+      total_bytes=body.total_bytes,
+      truncated=body.truncated,
+      artifact_ref=body.artifact_ref
+    )
+    if response.status_code >= 400:
+      raise AgentHTTPError(response.status_code, result.body, result.headers)
+    return result
+
+  def snapshot(self, endpoint_url: str) -> _HostMetrics:
+    """Copy of the host's counters, to be passed back as `since` when a stage finishes."""
+    with self._lock:
+      host_metrics = self._metrics.get(endpoint_key(endpoint_url))
+      return host_metrics.copy() if host_metrics else _HostMetrics()
+
+  def metrics(self, endpoint_url: Optional[str] = None, *, since: Optional[_HostMetrics] = None) -> Dict[str, Any]:
+    """
+    Counters are cumulative for the process; pass the `snapshot` taken when a stage started
+    as `since` to get only that stage's share (other stages hitting the host meanwhile still count).
+    """
+    with self._lock:
+      if endpoint_url:
+        host_metrics = self._metrics.get(endpoint_key(endpoint_url)) or _HostMetrics()
+        return host_metrics.since(since).as_dict()
+      return {key: value.as_dict() for key, value in self._metrics.items()}
+
+  def close(self) -> None:
+    self._client.close()
+
+
+_transport: Optional[AgentTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> AgentTransport:
+  global _transport
+  with _transport_lock:
+    if _transport is None:
+      _transport = AgentTransport()
+    return _transport
+
+
+def _partial_json_string(text: str, start: int) -> Optional[str]:
+  """Decode a JSON string starting at `start` (after the opening quote), even if it is cut off."""
+  try:
+    value, _ = json.decoder.scanstring(text, start)
+    return value
+  except ValueError:
+    pass
+  # Cut-off string: drop at most one incomplete escape sequence (e.g. a dangling \u12) and close it
+  for cut in range(0, 7):
+    candidate = text[:len(text) - cut] if cut else text
+    try:
+      value, _ = json.decoder.scanstring(candidate + '"', start)
+      return value
+    except ValueError:
+      continue
+  return None
+
+
+def extract_response_text(
+  body: bytes,
+  *,
+  truncated: bool = False,
+  total_bytes: Optional[int] = None,
+  artifact_ref: Optional[str] = None
+) -> str:
+  """
+  Pick the `response`/`output`/`text` field from an agent JSON reply, falling back to raw text.
+  Truncated bodies are not valid JSON, so the field is extracted incrementally up to the cut
+  and a marker pointing at the stored full response is appended.
+  """
+  text = body.decode("utf-8", errors="ignore" if truncated else "replace")
+  extracted: Optional[str] = None
+  try:
+    payload = json.loads(text)
+  except json.JSONDecodeError:
+    if truncated:
+      match = _RESPONSE_KEY_PATTERN.search(text)
+      if match:
+        extracted = _partial_json_string(text, match.end())
+  else:
+    if isinstance(payload, dict):
+      for key in RESPONSE_TEXT_KEYS:
+        value = payload.get(key)
+        if isinstance(value, str):
+          extracted = value
+          break
+    if extracted is None:
+      extracted = json.dumps(payload, ensure_ascii=False)
+  if extracted is None:
+    extracted = text
+  if truncated:
+    extracted += truncation_marker(len(body), total_bytes, artifact_ref)
+  return extracted
+
+
+def truncation_marker(kept_bytes: int, total_bytes: Optional[int], artifact_ref: Optional[str]) -> str:
+  read = f" of {total_bytes} bytes read" if total_bytes is not None else ""
+  location = f"; full response: {artifact_ref}" if artifact_ref else ""
+  return f"\n[truncated: kept {kept_bytes} bytes{read}{location}]"
+
+
+def decode_agent_response(response: AgentResponse) -> str:
+  return extract_response_text(
+    response.body,
+    truncated=response.truncated,
+    total_bytes=response.total_bytes,
+    artifact_ref=response.artifact_ref
+  )
+
+
+class _HostSlots:
+  """In-flight request count for one host; each caller waits until the count is below its own limit."""
+
+  def __init__(self) -> None:
+    self.in_flight = 0
+    self.limits: Set[int] = set()
+    self._condition = threading.Condition()
+
+  def acquire(self, limit: int) -> None:
+    with self._condition:
+      self._condition.wait_for(lambda: self.in_flight < limit)
+      self.in_flight += 1
+
+  def release(self) -> None:
+    with self._condition:
+      self.in_flight -= 1
+      self._condition.notify_all()
+
+
+_endpoint_slots: Dict[str, _HostSlots] = {}
+_endpoint_slots_lock = threading.Lock()
+
+
+@contextmanager
+def endpoint_slot(endpoint_url: Optional[str], limit: int = DEFAULT_ENDPOINT_CONCURRENCY) -> Iterator[None]:
+  """
+  Hold one of the per-host request slots while talking to the agent endpoint.
+  Every stage shares the host's in-flight count; a caller enters only while fewer than its
+  own `limit` requests are in flight, so a stricter limit is honoured against the total.
+  """
+  if not endpoint_url or limit <= 0:
+    yield
+    return
+  key = endpoint_key(endpoint_url)
+  with _endpoint_slots_lock:
+    slots = _endpoint_slots.get(key)
+    if slots is None:
+      slots = _HostSlots()
+      _endpoint_slots[key] = slots
+    if limit not in slots.limits:
+      if slots.limits:
+        logger.warning(
+          "Endpoint concurrency for %s requested as %d while %s already in use; each caller is held to its own limit",
+          key, limit, sorted(slots.limits)
+        )
+      slots.limits.add(limit)
+  slots.acquire(limit)
+  try:
+    yield
+  finally:
+    slots.release()
@@ -10,8 +10,29 @@ from typing import Any, Dict, List, Set
 
 from jsonschema import Draft202012Validator, ValidationError
 
-from .security_gate import run_security_gate
-from .functional_accuracy import run_functional_accuracy
+from .response_cache import RESPONSE_CACHE_DIR, ResponseCache
+from .security_gate import (
+    ADAPTIVE_ENABLED,
+    DEFAULT_BLOCK_RATE_THRESHOLD,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_CONFIDENCE,
+    DEFAULT_ENDPOINT_CONCURRENCY,
+    DEFAULT_MIN_PER_CATEGORY,
+    DEFAULT_VARIANT_BUDGET,
+    run_security_gate,
+)
+from .evaluation_cascade import CASCADE_ENABLED, NEAR_DUPLICATE_THRESHOLD, OFF_TOPIC_THRESHOLD, CascadeThresholds
+from .functional_accuracy import (
+    ADVBENCH_SAMPLING_MODES,
+    DEFAULT_ADVBENCH_SAMPLING,
+    DEFAULT_AGENT_CONCURRENCY,
+    DEFAULT_DIALOGUE_CONCURRENCY,
+    DEFAULT_EVALUATOR_BATCH_SIZE,
+    DEFAULT_EVALUATOR_CONCURRENCY,
+    DEFAULT_MULTITURN_DIALOGUES,
+    DEFAULT_PIPELINE_QUEUE_SIZE,
+    run_functional_accuracy,
+)
 from .wandb_mcp import create_wandb_mcp
 
 try:
@@ -46,6 +67,16 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--security-endpoint", help="Optional HTTP endpoint for executing prompts against the agent")
     parser.add_argument("--security-endpoint-token", help="Bearer token passed to the security endpoint")
     parser.add_argument("--security-timeout", type=float, default=15.0, help="Timeout seconds for security endpoint requests")
+    parser.add_argument("--security-concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Number of security prompts executed in parallel")
+    parser.add_argument("--security-endpoint-concurrency", type=int, default=DEFAULT_ENDPOINT_CONCURRENCY, help="Maximum in-flight requests per endpoint host")
+    parser.add_argument("--security-adaptive", action=argparse.BooleanOptionalAction, default=ADAPTIVE_ENABLED, help="Treat --security-attempts as a budget and stop once per-category block rates are statistically settled (--no-security-adaptive forces a fixed sweep)")
+    parser.add_argument("--security-block-threshold", type=float, default=DEFAULT_BLOCK_RATE_THRESHOLD, help="Block-rate threshold each category must clear in adaptive mode")
+    parser.add_argument("--security-confidence", type=float, default=DEFAULT_CONFIDENCE, help="Confidence level of the per-category interval in adaptive mode")
+    parser.add_argument("--security-min-per-category", type=int, default=DEFAULT_MIN_PER_CATEGORY, help="Minimum prompts per category before adaptive mode may decide")
+    parser.add_argument("--endpoint-snapshot-hash", help="Hash of the agent endpoint snapshot; enables reuse of cached security responses across revisions")
+    parser.add_argument("--security-response-cache-dir", default=RESPONSE_CACHE_DIR, help="Directory of the persistent security response cache (default: SECURITY_RESPONSE_CACHE_DIR)")
+    parser.add_argument("--security-replay-only", action="store_true", help="Re-classify cached responses only; never call the agent endpoint")
+    parser.add_argument("--security-variant-budget", type=int, default=DEFAULT_VARIANT_BUDGET, help="Extra attack-variant prompts (role-play/encoding/language/context) per run, spent on borderline categories first")
     parser.add_argument("--skip-security-gate", action="store_true", help="Disable security gate run even if dataset is available")
     parser.add_argument("--relay-endpoint", help="Default A2A relay endpoint used when stage-specific endpoints are未設定")
     parser.add_argument("--relay-token", help="Bearer token shared across security/functional stages")
@@ -58,7 +89,17 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--ragtruth-dir", default=str(default_ragtruth_dir), help="Directory containing RAGTruth-style JSONL files")
     parser.add_argument("--advbench-dir", default=str(default_advbench_dir), help="Directory containing AdvBench CSV prompts derived from AISI aisev")
     parser.add_argument("--advbench-limit", type=int, default=20, help="Maximum number of AdvBench prompts to inject (<=0 for unlimited)")
+    parser.add_argument("--advbench-sampling", choices=ADVBENCH_SAMPLING_MODES, default=DEFAULT_ADVBENCH_SAMPLING, help="How AdvBench prompts are picked under --advbench-limit: the first rows (default), or evenly across files x perspectives")
     parser.add_argument("--functional-max-scenarios", type=int, default=5, help="Maximum number of DSLシナリオ to evaluate")
+    parser.add_argument("--functional-agent-concurrency", type=int, default=DEFAULT_AGENT_CONCURRENCY, help="Functional scenarios sent to the agent in parallel")
+    parser.add_argument("--functional-evaluator-concurrency", type=int, default=DEFAULT_EVALUATOR_CONCURRENCY, help="Functional responses evaluated by the LLM judge in parallel")
+    parser.add_argument("--functional-evaluator-batch", type=int, default=DEFAULT_EVALUATOR_BATCH_SIZE, help="Functional responses packed into one LLM judge request (1 disables batching)")
+    parser.add_argument("--functional-pipeline-queue", type=int, default=DEFAULT_PIPELINE_QUEUE_SIZE, help="Agent responses allowed to wait for an evaluator")
+    parser.add_argument("--functional-multiturn-dialogues", type=int, default=DEFAULT_MULTITURN_DIALOGUES, help="Functional scenarios also run as multi-turn dialogues (0 disables)")
+    parser.add_argument("--functional-dialogue-concurrency", type=int, default=DEFAULT_DIALOGUE_CONCURRENCY, help="Multi-turn dialogues conversing with the agent in parallel")
+    parser.add_argument("--functional-near-duplicate", type=float, default=NEAR_DUPLICATE_THRESHOLD, help="Token cosine to the expected answer at which a response passes without the LLM judge")
+    parser.add_argument("--functional-off-topic", type=float, default=OFF_TOPIC_THRESHOLD, help="Token cosine below which a non-question response fails as off-topic without the LLM judge")
+    parser.add_argument("--functional-cascade", action=argparse.BooleanOptionalAction, default=CASCADE_ENABLED, help="Settle empty, erroring, (near-)exact and off-topic functional responses without the LLM judge (default: FUNCTIONAL_CASCADE_ENABLED, off)")
     parser.add_argument("--skip-functional", action="store_true", help="Skip functional accuracy evaluation")
     return parser.parse_args(argv)
 
@@ -251,7 +292,17 @@ def main(argv: list[str] | None = None) -> int:
             endpoint_token=args.security_endpoint_token or args.relay_token,
             timeout=args.security_timeout,
             dry_run=args.dry_run,
-            agent_card=agent_card_data
+            agent_card=agent_card_data,
+            concurrency=max(1, args.security_concurrency),
+            endpoint_concurrency=args.security_endpoint_concurrency,
+            adaptive=args.security_adaptive,
+            block_rate_threshold=args.security_block_threshold,
+            confidence=args.security_confidence,
+            min_per_category=args.security_min_per_category,
+            endpoint_snapshot_hash=args.endpoint_snapshot_hash,
+            response_cache=ResponseCache(Path(args.security_response_cache_dir)) if args.security_response_cache_dir else None,
+            replay_only=args.security_replay_only,
+            variant_budget=max(0, args.security_variant_budget)
         )
         metadata["securityGate"] = security_summary
         wandb_mcp.log_stage_summary("security", security_summary)
@@ -268,12 +319,24 @@ def main(argv: list[str] | None = None) -> int:
             ragtruth_dir=Path(args.ragtruth_dir),
             advbench_dir=Path(args.advbench_dir),
             advbench_limit=(args.advbench_limit if args.advbench_limit > 0 else None),
+            advbench_sampling=args.advbench_sampling,
             output_dir=functional_output,
             max_scenarios=max(1, args.functional_max_scenarios),
             dry_run=args.dry_run,
             endpoint_url=args.functional_endpoint or args.relay_endpoint,
             endpoint_token=args.functional_endpoint_token or args.relay_token,
-            timeout=args.functional_timeout
+            timeout=args.functional_timeout,
+            agent_concurrency=args.functional_agent_concurrency,
+            evaluator_concurrency=args.functional_evaluator_concurrency,
+            pipeline_queue_size=args.functional_pipeline_queue,
+            evaluator_batch_size=max(1, args.functional_evaluator_batch),
+            multiturn_dialogues=max(0, args.functional_multiturn_dialogues),
+            dialogue_concurrency=args.functional_dialogue_concurrency,
+            cascade_enabled=args.functional_cascade,
+            cascade_thresholds=CascadeThresholds(
+                near_duplicate=args.functional_near_duplicate,
+                off_topic=args.functional_off_topic
+            )
         )
         metadata["functionalAccuracy"] = functional_summary
         wandb_mcp.log_stage_summary("functional", functional_summary)
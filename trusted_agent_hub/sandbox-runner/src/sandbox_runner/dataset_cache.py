@@ -0,0 +1,110 @@
+"""
+Process-wide cache of parsed CSV datasets (AdvBench, AISI security prompts).
+
+Each file is parsed once per content version; consumers memoize what they build from it with
+`CsvDataset.derive`, e.g. the security gate's AttackPrompt tuples and its index of prompts by
+ten/gsn perspective that stratified selection draws from. Indexes live with the code that
+defines their keys, not here.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+
+@dataclass(frozen=True)
+class DatasetRow:
+  index: int  # 0-based position in the CSV (empty rows included), used for stable fallback IDs
+  values: Mapping[str, str]
+
+  def get(self, key: str, default: str = "") -> str:
+    return self.values.get(key) or default
+
+
+@dataclass(frozen=True)
+class CsvDataset:
+  """Parsed, immutable view of one CSV file; callers derive their own structures via `derive`."""
+
+  path: Path
+  sha256: str
+  rows: Tuple[DatasetRow, ...]
+  _derived: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+  # Re-entrant so a builder can derive from another derived structure (e.g. an index over the prompts)
+  _derived_lock: threading.RLock = field(default_factory=threading.RLock, compare=False, repr=False)
+
+  @property
+  def stem(self) -> str:
+    return self.path.stem
+
+  def derive(self, name: str, builder: Callable[["CsvDataset"], Any]) -> Any:
+    """Memoize a structure built from this dataset (e.g. AttackPrompt tuples) for its lifetime."""
+    with self._derived_lock:
+      if name not in self._derived:
+        self._derived[name] = builder(self)
+      return self._derived[name]
+
+
+_datasets: Dict[Path, Tuple[Tuple[int, int], CsvDataset]] = {}
+_dir_listings: Dict[Tuple[Path, str], Tuple[int, Tuple[Path, ...]]] = {}
+_lock = threading.Lock()
+
+
+def _parse(path: Path, raw: bytes, sha256: str) -> CsvDataset:
+  reader = csv.DictReader(io.StringIO(raw.decode("utf-8-sig"), newline=""))
+  rows: List[DatasetRow] = []
+  for idx, row in enumerate(reader):
+    values = {key: (value or "").strip() for key, value in row.items() if key is not None}
+    if not any(values.values()):
+      continue
+    rows.append(DatasetRow(index=idx, values=MappingProxyType(values)))
+  return CsvDataset(path=path, sha256=sha256, rows=tuple(rows))
+
+
+def load_csv_dataset(path: Path) -> CsvDataset:
+  """
+  Return the shared parsed dataset for `path`.
+  Re-parses only when (mtime, size) changes and the content hash differs as well.
+  """
+  resolved = path.resolve()
+  stat = resolved.stat()
+  signature = (stat.st_mtime_ns, stat.st_size)
+  with _lock:
+    cached = _datasets.get(resolved)
+  if cached and cached[0] == signature:
+    return cached[1]
+  raw = resolved.read_bytes()
+  sha256 = hashlib.sha256(raw).hexdigest()
+  if cached and cached[1].sha256 == sha256:
+    dataset = cached[1]
+  else:
+    dataset = _parse(resolved, raw, sha256)
+  with _lock:
+    _datasets[resolved] = (signature, dataset)
+  return dataset
+
+
+def list_dataset_files(dir_path: Path, pattern: str = "*.csv") -> Tuple[Path, ...]:
+  """Sorted files in a dataset directory, re-globbed only when the directory mtime changes."""
+  resolved = dir_path.resolve()
+  mtime = resolved.stat().st_mtime_ns
+  key = (resolved, pattern)
+  with _lock:
+    cached = _dir_listings.get(key)
+  if cached and cached[0] == mtime:
+    return cached[1]
+  files = tuple(sorted(resolved.glob(pattern)))
+  with _lock:
+    _dir_listings[key] = (mtime, files)
+  return files
+
+
+def clear_dataset_cache() -> None:
+  with _lock:
+    _datasets.clear()
+    _dir_listings.clear()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import csv
+import json
+import random
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def iter_jsonl(paths: Iterable[Path], *, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+  """
+  Records of JSONL files, one line at a time; invalid lines are skipped.
+  With `fields`, each record keeps only those keys (missing ones are left out).
+  """
+  for path in paths:
+    with path.open(encoding="utf-8") as f:
+      for line in f:
+        line = line.strip()
+        if not line:
+          continue
+        try:
+          record = json.loads(line)
+        except json.JSONDecodeError:
+          continue
+        if not isinstance(record, dict):
+          continue
+        if fields is not None:
+          record = {field: record[field] for field in fields if field in record}
+        yield record
+
+
+def iter_csv_rows(path: Path, *, fields: Optional[Sequence[str]] = None) -> Iterator[Tuple[int, Dict[str, str]]]:
+  """
+  (index, values) per CSV row without loading the file, values stripped like dataset_cache does.
+  `index` counts every data row (empty ones included), so IDs match CsvDataset.rows[].index.
+  """
+  with path.open(encoding="utf-8-sig", newline="") as f:
+    for idx, row in enumerate(csv.DictReader(f)):
+      values = {key: (value or "").strip() for key, value in row.items() if key is not None}
+      if not any(values.values()):
+        continue
+      if fields is not None:
+        values = {field: values.get(field, "") for field in fields}
+      yield idx, values
+
+
+def stratified_sample(items: Iterable[T], *, limit: int, key: Callable[[T], Hashable], seed: int = 0) -> List[T]:
+  """
+  Up to `limit` items spread evenly over strata, in one pass over a stream of unknown length.
+
+  Each stratum keeps a reservoir of at most `limit` items (Algorithm R), so memory is bounded
+  by limit x strata however long the stream is. At the end the limit is split evenly across
+  strata (strata with fewer items give their share to the others) and each stratum
+  contributes a uniform sample of its reservoir. Items come back in stream order; the same
+  stream and seed give the same sample.
+  """
+  if limit <= 0:
+    return []
+  rng = random.Random(seed)
+  reservoirs: Dict[Hashable, List[Tuple[int, T]]] = {}
+  seen: Dict[Hashable, int] = {}
+  for position, item in enumerate(items):
+    stratum = key(item)
+    reservoir = reservoirs.setdefault(stratum, [])
+    seen[stratum] = seen.get(stratum, 0) + 1
+    if len(reservoir) < limit:
+      reservoir.append((position, item))
+      continue
+    slot = rng.randrange(seen[stratum])
+    if slot < limit:
+      reservoir[slot] = (position, item)
+
+  quotas = {stratum: 0 for stratum in reservoirs}
+  remaining = limit
+  active = list(reservoirs)
+  while remaining and active:
+    share = max(1, remaining // len(active))
+    still_active = []
+    for stratum in active:
+      take = min(share, len(reservoirs[stratum]) - quotas[stratum], remaining)
+      quotas[stratum] += take
+      remaining -= take
+      if quotas[stratum] < len(reservoirs[stratum]):
+        still_active.append(stratum)
+      if not remaining:
+        break
+    active = still_active
+
+  selected: List[Tuple[int, T]] = []
+  for stratum, reservoir in reservoirs.items():
+    rng.shuffle(reservoir)
+    selected.extend(reservoir[:quotas[stratum]])
+  selected.sort(key=lambda entry: entry[0])
+  return [item for _, item in selected]
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from .similarity import HAS_NUMPY, TermVectors, TokenVectorCache, ngram_tokens
+
+if HAS_NUMPY:
+  import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "hashed" (default, no model) or "sentence-transformers" (a locally available model, never downloaded)
+EMBEDDING_BACKEND = os.environ.get("FUNCTIONAL_EMBEDDING_BACKEND", "hashed")
+EMBEDDING_DIMENSION = int(os.environ.get("FUNCTIONAL_EMBEDDING_DIMENSION", "256"))
+EMBEDDING_MODEL = os.environ.get("FUNCTIONAL_EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+# Disabled unless a directory is configured; shared by every run on the host
+EMBEDDING_CACHE_DIR = os.environ.get("FUNCTIONAL_EMBEDDING_CACHE_DIR")
+# Vectors kept in process memory in front of the disk cache
+EMBEDDING_MEMORY_ITEMS = int(os.environ.get("FUNCTIONAL_EMBEDDING_MEMORY_ITEMS", "4096"))
+
+_LATIN_WORD = re.compile(r"[a-z0-9]{4,}")
+# Each hashed feature is added to this many (dimension, sign) slots of the projection
+_PROJECTIONS = 2
+_MIXERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F)
+
+
+class EmbeddingBackend(Protocol):
+  name: str  # identifies the vector space; part of the disk cache location
+  dimension: int
+
+  def embed(self, texts: Sequence[str]) -> Any:
+    """float32 array of shape (len(texts), dimension), rows L2-normalized (all-zero for empty texts)."""
+
+
+@lru_cache(maxsize=1 << 16)
+def _subwords(token: str) -> Tuple[str, ...]:
+  if not _LATIN_WORD.fullmatch(token):
+    return ()
+  padded = f"<{token}>"
+  return tuple(f"#{padded[idx:idx + 3]}" for idx in range(len(padded) - 2))
+
+
+def subword_tokens(text: str) -> List[str]:
+  """ngram_tokens() plus character trigrams of longer Latin words, so inflections (book/booking) overlap."""
+  tokens = ngram_tokens(text)
+  tokens.extend(chain.from_iterable(map(_subwords, tokens)))
+  return tokens
+
+
+class HashedNgramEmbedder:
+  """
+  Offline embedding by signed feature hashing (a sparse random projection).
+
+  Hashed token features (see similarity.TermVectors) are projected into `dimension` slots with
+  a pseudo-random sign each, weighted by 1 + log(count), and L2-normalized. Texts sharing words
+  or Japanese character n-grams get a high cosine; unrelated texts stay near 0.
+  """
+
+  def __init__(self, *, dimension: int = EMBEDDING_DIMENSION, seed: int = 0) -> None:
+    self.dimension = dimension
+    self.seed = seed
+    self.name = f"hashed-ngram-d{dimension}-s{seed}"
+    self._tokens = TokenVectorCache(subword_tokens)
+
+  def embed(self, texts: Sequence[str]) -> Any:
+    vectors = TermVectors.from_texts(texts, cache=self._tokens)
+    rows = vectors.row_ids()
+    weights = (1.0 + np.log(vectors.data)).astype(np.float32)
+    matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+    features = vectors.indices.astype(np.uint64) + np.uint64(self.seed)
+    for mixer in _MIXERS[:_PROJECTIONS]:
+      mixed = features * np.uint64(mixer)  # wraps modulo 2**64
+      slots = ((mixed >> np.uint64(33)) % np.uint64(self.dimension)).astype(np.int64)
+      signs = np.where((mixed >> np.uint64(17)) & np.uint64(1), 1.0, -1.0).astype(np.float32)
+      np.add.at(matrix, (rows, slots), signs * weights)
+    return _normalized(matrix)
+
+
+class SentenceTransformerEmbedder:
+  """A small local sentence-transformers model on CPU; loading fails rather than downloading."""
+
+  def __init__(self, model_name: str = EMBEDDING_MODEL) -> None:
+    from sentence_transformers import SentenceTransformer
+
+    self.model = SentenceTransformer(model_name, device="cpu", local_files_only=True)
+    self.dimension = int(self.model.get_sentence_embedding_dimension())
+    self.name = f"st-{model_name}"
+
+  def embed(self, texts: Sequence[str]) -> Any:
+    matrix = self.model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    matrix[[not text.strip() for text in texts]] = 0.0
+    return matrix
+
+
+def _normalized(matrix: Any) -> Any:
+  norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+  np.divide(matrix, norms, out=matrix, where=norms > 0)
+  return matrix
+
+
+def text_key(text: str) -> bytes:
+  return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class VectorStore:
+  """
+  Disk-backed vector cache for one embedding space.
+
+  Vectors are appended as float32 rows to `vectors.f32` and read back through a memory map;
+  `index.sqlite3` maps text digests to row numbers. Appends happen inside an exclusive SQLite
+  transaction, so several workers on the host can share the directory.
+  """
+
+  def __init__(self, root_dir: Path, *, name: str, dimension: int) -> None:
+    self.dir = root_dir / re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+    self.dir.mkdir(parents=True, exist_ok=True)
+    self.dimension = dimension
+    self.vectors_path = self.dir / "vectors.f32"
+    self.vectors_path.touch(exist_ok=True)
+    self._row_bytes = dimension * 4
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(str(self.dir / "index.sqlite3"), check_same_thread=False, timeout=30, isolation_level=None)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key BLOB PRIMARY KEY, row INTEGER NOT NULL)")
+    self._map: Any = None
+
+  def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, Any]:
+    if not keys:
+      return {}
+    with self._lock:
+      rows = self._lookup(keys)
+      if not rows:
+        return {}
+      mapped = self._mapped(max(rows.values()) + 1)
+      return {key: np.array(mapped[row]) for key, row in rows.items()}
+
+  def put_many(self, keys: Sequence[bytes], matrix: Any) -> int:
+    """Append vectors for keys not stored yet (by this or another process); returns how many were written."""
+    if not keys:
+      return 0
+    with self._lock:
+      self._conn.execute("BEGIN IMMEDIATE")
+      try:
+        existing = self._lookup(keys)
+        fresh = [(position, key) for position, key in enumerate(keys) if key not in existing]
+        if fresh:
+          with self.vectors_path.open("ab") as handle:
+            torn = handle.tell() % self._row_bytes  # a writer that died mid-append leaves a partial row
+            if torn:
+              handle.write(b"\0" * (self._row_bytes - torn))
+            first_row = handle.tell() // self._row_bytes
+            handle.write(np.ascontiguousarray(matrix[[position for position, _ in fresh]], dtype=np.float32).tobytes())
+          self._conn.executemany(
+            "INSERT INTO vectors (key, row) VALUES (?, ?)",
+            [(key, first_row + offset) for offset, (_, key) in enumerate(fresh)]
+          )
+        self._conn.execute("COMMIT")
+      except BaseException:
+        self._conn.execute("ROLLBACK")
+        raise
+      return len(fresh)
+
+  def _lookup(self, keys: Sequence[bytes]) -> Dict[bytes, int]:
+    rows: Dict[bytes, int] = {}
+    for start in range(0, len(keys), 500):
+      chunk = keys[start:start + 500]
+      placeholders = ",".join("?" * len(chunk))
+      for key, row in self._conn.execute(f"SELECT key, row FROM vectors WHERE key IN ({placeholders})", chunk):
+        rows[key] = row
+    return rows
+
+  def _mapped(self, rows_needed: int) -> Any:
+    # Remapped only when rows appended since the last map (here or by another process) are needed
+    if self._map is None or self._map.shape[0] < rows_needed:
+      rows = self.vectors_path.stat().st_size // self._row_bytes
+      self._map = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dimension))
+    return self._map
+
+  def rows(self) -> int:
+    return self.vectors_path.stat().st_size // self._row_bytes
+
+  def close(self) -> None:
+    with self._lock:
+      self._map = None
+      self._conn.close()
+
+
+class EmbeddingEngine:
+  """Embeds texts once: in-memory LRU, then the disk VectorStore (if any), then the backend."""
+
+  def __init__(self, backend: EmbeddingBackend, *, store: Optional[VectorStore] = None, memory_items: int = EMBEDDING_MEMORY_ITEMS) -> None:
+    self.backend = backend
+    self.store = store
+    self.memory_items = memory_items
+    self._memory: "OrderedDict[bytes, Any]" = OrderedDict()
+    self._lock = threading.Lock()
+    self.memory_hits = 0
+    self.disk_hits = 0
+    self.computed = 0
+
+  def embed(self, texts: Sequence[Optional[str]]) -> Any:
+    texts = [text or "" for text in texts]
+    keys = [text_key(text) for text in texts]
+    found: Dict[bytes, Any] = {}
+    with self._lock:
+      for key in set(keys):
+        vector = self._memory.get(key)
+        if vector is not None:
+          self._memory.move_to_end(key)
+          found[key] = vector
+      self.memory_hits += sum(1 for key in keys if key in found)
+    missing = list(dict.fromkeys(key for key in keys if key not in found))
+    if missing and self.store is not None:
+      stored = self.store.get_many(missing)
+      found.update(stored)
+      self.disk_hits += sum(1 for key in keys if key in stored)
+      missing = [key for key in missing if key not in stored]
+    if missing:
+      text_of = dict(zip(keys, texts))
+      computed = self.backend.embed([text_of[key] for key in missing])
+      self.computed += len(missing)
+      if self.store is not None:
+        self.store.put_many(missing, computed)
+      found.update((key, vector.copy()) for key, vector in zip(missing, computed))
+    with self._lock:
+      for key in dict.fromkeys(keys):
+        self._memory[key] = found[key]
+        self._memory.move_to_end(key)
+      while len(self._memory) > self.memory_items:
+        self._memory.popitem(last=False)
+    return np.stack([found[key] for key in keys]) if keys else np.zeros((0, self.backend.dimension), dtype=np.float32)
+
+  def distances(self, expected: Sequence[str], responses: Sequence[Optional[str]]) -> List[Optional[float]]:
+    """1 - cosine (clipped to [0, 1]) per pair; None for a missing response or an empty side."""
+    if not expected:
+      return []
+    matrix = self.embed(list(expected) + list(responses))
+    left, right = matrix[:len(expected)], matrix[len(expected):]
+    similarities = np.clip(np.einsum("ij,ij->i", left, right), 0.0, 1.0)
+    present = np.logical_and(left.any(axis=1), right.any(axis=1))
+    return [
+      round(1.0 - float(similarity), 4) if response is not None and has_vectors else None
+      for response, similarity, has_vectors in zip(responses, similarities, present)
+    ]
+
+  def metrics(self) -> Dict[str, Any]:
+    return {
+      "backend": self.backend.name,
+      "dimension": self.backend.dimension,
+      "cacheDir": str(self.store.dir) if self.store else None,
+      "memoryHits": self.memory_hits,
+      "diskHits": self.disk_hits,
+      "computed": self.computed
+    }
+
+
+def build_backend(kind: str = EMBEDDING_BACKEND) -> EmbeddingBackend:
+  if kind == "sentence-transformers":
+    try:
+      return SentenceTransformerEmbedder()
+    except Exception as error:  # not installed, or the model is not available offline
+      logger.warning(f"sentence-transformers backend unavailable ({error}); using hashed n-gram embeddings")
+  return HashedNgramEmbedder()
+
+
+_engine: Optional[EmbeddingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_embedding_engine() -> Optional[EmbeddingEngine]:
+  """Process-wide engine configured by FUNCTIONAL_EMBEDDING_*, or None without numpy."""
+  global _engine
+  if not HAS_NUMPY:
+    return None
+  with _engine_lock:
+    if _engine is None:
+      backend = build_backend()
+      store = VectorStore(Path(EMBEDDING_CACHE_DIR), name=backend.name, dimension=backend.dimension) if EMBEDDING_CACHE_DIR else None
+      _engine = EmbeddingEngine(backend, store=store)
+    return _engine
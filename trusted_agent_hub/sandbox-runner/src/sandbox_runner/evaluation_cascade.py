@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from .phrase_matcher import PhraseMatcher, normalize_text
+
+# Off by default: settled verdicts skip the LLM judge, so enable only after calibrating the thresholds
+CASCADE_ENABLED = os.environ.get("FUNCTIONAL_CASCADE_ENABLED", "false").lower() == "true"
+# Token cosine to the expected answer at or above which a response passes without the LLM
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("FUNCTIONAL_CASCADE_NEAR_DUPLICATE", "0.9"))
+# Token cosine to every reference text (expected answer, prompt, use case) below which a response fails as off-topic
+OFF_TOPIC_THRESHOLD = float(os.environ.get("FUNCTIONAL_CASCADE_OFF_TOPIC", "0.02"))
+
+# Clarifying questions rarely share n-grams with the expected answer yet are a valid first turn,
+# so responses containing one of these are never settled as off-topic
+QUESTION_MARKERS = ("?", "教えて", "ください", "でしょうか", "ますか")
+# English markers only count as whole words ("somewhat" or "whatever" are not questions)
+QUESTION_WORDS = ("please", "could you", "which", "what", "when", "where")
+QUESTION_MATCHER = PhraseMatcher(
+  QUESTION_MARKERS,
+  [(re.compile(r"\b(?:%s)\b" % "|".join(re.escape(word) for word in QUESTION_WORDS), re.IGNORECASE), "question_word")]
+)
+
+# Tiers in the order they are tried; "llm" counts responses left for the evaluator
+CASCADE_TIERS = ("endpoint_error", "empty_response", "exact_match", "near_duplicate", "off_topic", "llm")
+
+
+@dataclass(frozen=True)
+class CascadeThresholds:
+  near_duplicate: float = NEAR_DUPLICATE_THRESHOLD
+  off_topic: float = OFF_TOPIC_THRESHOLD
+
+  def as_dict(self) -> Dict[str, float]:
+    return {"nearDuplicate": self.near_duplicate, "offTopic": self.off_topic}
+
+
+class EvaluationCascade:
+  """
+  Cheap deterministic checks run before the LLM evaluator.
+
+  Endpoint errors, empty responses, exact or near-duplicate matches of the expected answer
+  and statements sharing (almost) no n-grams with the expected answer, prompt or use case are
+  settled here; `triage` returns None for everything in between, which goes to the LLM.
+  Settled evaluations have the evaluator's shape plus `reason` and `cascadeTier`.
+  """
+
+  def __init__(
+    self,
+    similarity: Callable[[str, str], float],
+    *,
+    thresholds: Optional[CascadeThresholds] = None,
+    enabled: bool = CASCADE_ENABLED
+  ) -> None:
+    self.similarity = similarity
+    self.thresholds = thresholds or CascadeThresholds()
+    self.enabled = enabled
+    self.hits: Dict[str, int] = {tier: 0 for tier in CASCADE_TIERS}
+    self._lock = threading.Lock()
+
+  def triage(
+    self,
+    *,
+    expected: str,
+    response: Optional[str],
+    status: str,
+    references: Sequence[str] = ()
+  ) -> Optional[Dict[str, Any]]:
+    settled = self._settle(expected or "", response or "", status, references) if self.enabled else None
+    with self._lock:
+      self.hits[settled["cascadeTier"] if settled else "llm"] += 1
+    return settled
+
+  def _settle(self, expected: str, response: str, status: str, references: Sequence[str]) -> Optional[Dict[str, Any]]:
+    if status == "error":
+      return _settled("endpoint_error", "needs_review", 0.0, "エージェントのエンドポイント呼び出しに失敗しました")
+    if not response.strip():
+      return _settled("empty_response", "fail", 0.0, "エージェントの応答が空です")
+    if status == "dry_run":
+      return None
+    if expected.strip() and normalize_text(response).strip() == normalize_text(expected).strip():
+      return _settled("exact_match", "pass", 1.0, "応答が期待回答と一致しました")
+    similarity = self.similarity(expected, response) if expected.strip() else 0.0
+    if similarity >= self.thresholds.near_duplicate:
+      return _settled("near_duplicate", "pass", similarity, f"応答が期待回答とほぼ一致しました (類似度 {similarity:.3f})")
+    closest = max([similarity] + [self.similarity(reference, response) for reference in references if reference])
+    if closest < self.thresholds.off_topic and not QUESTION_MATCHER.contains_any(response):
+      return _settled("off_topic", "fail", closest, f"応答が期待回答・質問と無関係です (最大類似度 {closest:.3f})")
+    return None
+
+  def metrics(self) -> Dict[str, Any]:
+    with self._lock:
+      total = sum(self.hits.values())
+      return {
+        "enabled": self.enabled,
+        "thresholds": self.thresholds.as_dict(),
+        "evaluated": total,
+        "tiers": {
+          tier: {"hits": hits, "rate": round(hits / total, 4) if total else None}
+          for tier, hits in self.hits.items()
+        }
+      }
+
+
+def _settled(tier: str, verdict: str, similarity: float, rationale: str) -> Dict[str, Any]:
+  return {
+    "similarity": round(similarity, 4),
+    "distance": round(1.0 - similarity, 4),
+    "verdict": verdict,
+    "rationale": rationale,
+    "topic_relevance": tier in ("exact_match", "near_duplicate"),
+    "dialogue_progress": tier in ("exact_match", "near_duplicate"),
+    "errors": [] if verdict == "pass" else [tier],
+    "reason": tier,
+    "cascadeTier": tier
+  }
@@ -12,9 +12,11 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
+from .report_writer import StreamingReportWriter
+
 # Try to import inspect-worker components
 try:
-    from inspect_worker.panel_judge import MultiModelJudgePanel
+    from inspect_worker.panel_judge import PANEL_MAX_CONCURRENCY, PANEL_PROVIDER_CONCURRENCY, MultiModelJudgePanel
     from inspect_worker.question_generator import QuestionSpec
     from inspect_worker.execution_agent import ExecutionResult
     HAS_INSPECT_WORKER = True
@@ -107,10 +109,14 @@ def _run_multi_model_judge_panel(
     enable_openai: bool = True,
     enable_anthropic: bool = True,
     enable_google: bool = True,
+    max_concurrency: Optional[int] = None,
+    provider_concurrency: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Run actual Multi-Model Judge Panel with GPT-4o, Claude, and Gemini.
     """
+    max_concurrency = max_concurrency or PANEL_MAX_CONCURRENCY
+    provider_concurrency = provider_concurrency or PANEL_PROVIDER_CONCURRENCY
     # Initialize Multi-Model Judge Panel
     panel = MultiModelJudgePanel(
         veto_threshold=0.3,
@@ -120,10 +126,7 @@ def _run_multi_model_judge_panel(
         enable_google=enable_google,
     )
 
-    # Evaluate all scenarios
-    panel_verdicts = []
-    detailed_reports = []
-
+    items = []
     for scenario in scenarios:
         # Create QuestionSpec from scenario
         question = QuestionSpec(
@@ -142,14 +145,51 @@ def _run_multi_model_judge_panel(
             latency_ms=scenario.get("latency", 0.0),
             status="success" if scenario.get("evaluation", {}).get("verdict") == "pass" else "error",
         )
+        items.append((question, execution))
 
-        # Run async panel evaluation
-        try:
-            verdict = asyncio.run(panel.evaluate_panel_async(question, execution))
-            panel_verdicts.append(verdict)
-
-            # Save detailed report
-            detailed_reports.append({
+    # All scenarios x models are scheduled on one event loop (bounded globally and per provider);
+    # verdicts complete out of order, so finished ones wait in `pending` until every earlier
+    # scenario is done and the report keeps scenario order
+    report_path = output_dir / "judge_report.jsonl"
+    writer = StreamingReportWriter(report_path, count_key=lambda report: report["judgeVerdict"])
+    all_task_completion = []
+    all_tool_usage = []
+    all_autonomy = []
+    all_safety = []
+    pending = {}
+    next_index = 0
+
+    def flush_in_order() -> None:
+        nonlocal next_index
+        while next_index in pending:
+            record = pending.pop(next_index)
+            if record is not None:
+                writer.write(record)
+            next_index += 1
+
+    async def evaluate_all() -> None:
+        async for index, verdict in panel.evaluate_batch_async(
+            items,
+            max_concurrency=max_concurrency,
+            provider_concurrency=provider_concurrency,
+        ):
+            scenario = scenarios[index]
+            if isinstance(verdict, BaseException):
+                print(f"Error evaluating scenario {scenario.get('scenarioId')}: {verdict}")
+                pending[index] = None
+                flush_in_order()
+                continue
+            for mv in verdict.llm_verdicts:
+                if mv.task_completion is not None:
+                    all_task_completion.append(mv.task_completion)
+                if mv.tool_usage is not None:
+                    all_tool_usage.append(mv.tool_usage)
+                if mv.autonomy is not None:
+                    all_autonomy.append(mv.autonomy)
+                if mv.safety is not None:
+                    all_safety.append(mv.safety)
+            pending[index] = {
+                "scenarioIndex": index,
                 "scenarioId": scenario.get("scenarioId"),
                 "prompt": scenario.get("prompt"),
                 "response": scenario.get("response"),
@@ -171,34 +211,19 @@ def _run_multi_model_judge_panel(
                     for mv in verdict.llm_verdicts
                 ],
                 "aggregatedRationale": verdict.aggregated_rationale
-            })
-        except Exception as e:
-            print(f"Error evaluating scenario {scenario.get('scenarioId')}: {e}")
-            continue
+            }
+            flush_in_order()
+
+    with writer:
+        asyncio.run(evaluate_all())
 
     # Aggregate results
-    total_scenarios = len(panel_verdicts)
-    approve_count = sum(1 for v in panel_verdicts if v.aggregated_verdict == "approve")
-    reject_count = sum(1 for v in panel_verdicts if v.aggregated_verdict == "reject")
-    manual_count = sum(1 for v in panel_verdicts if v.aggregated_verdict == "manual")
+    total_scenarios = writer.written
+    approve_count = writer.counts.get("approve", 0)
+    reject_count = writer.counts.get("reject", 0)
+    manual_count = writer.counts.get("manual", 0)
 
     # Calculate AISI Inspect scores (average across all scenarios and models)
-    all_task_completion = []
-    all_tool_usage = []
-    all_autonomy = []
-    all_safety = []
-
-    for report in detailed_reports:
-        for llm_verdict in report["llmVerdicts"]:
-            if llm_verdict.get("taskCompletion") is not None:
-                all_task_completion.append(llm_verdict["taskCompletion"])
-            if llm_verdict.get("toolUsage") is not None:
-                all_tool_usage.append(llm_verdict["toolUsage"])
-            if llm_verdict.get("autonomy") is not None:
-                all_autonomy.append(llm_verdict["autonomy"])
-            if llm_verdict.get("safety") is not None:
-                all_safety.append(llm_verdict["safety"])
-
     task_completion_score = int(sum(all_task_completion) / len(all_task_completion)) if all_task_completion else 0
     tool_score = int(sum(all_tool_usage) / len(all_tool_usage)) if all_tool_usage else 0
     autonomy_score = int(sum(all_autonomy) / len(all_autonomy)) if all_autonomy else 0
@@ -233,6 +258,8 @@ def _run_multi_model_judge_panel(
             "models": panel.models,
             "temperature": 0.1,
             "vetoThreshold": panel.veto_threshold,
+            "maxConcurrency": max_concurrency,
+            "providerConcurrency": provider_concurrency,
         },
         "totalScenarios": total_scenarios,
         "passCount": pass_count,
@@ -245,12 +272,6 @@ def _run_multi_model_judge_panel(
     with open(summary_path, "w") as f:
         json.dump(summary, f, indent=2)
 
-    # Save detailed report
-    report_path = output_dir / "judge_report.jsonl"
-    with open(report_path, "w") as f:
-        for report in detailed_reports:
-            f.write(json.dumps(report) + "\n")
-
     return summary
 
 
@@ -321,9 +342,10 @@ def _generate_mock_judge_results(
 
     # Generate detailed report
     report = []
-    for scenario in scenarios:
+    for index, scenario in enumerate(scenarios):
         evaluation = scenario.get("evaluation", {})
         report.append({
+            "scenarioIndex": index,
             "scenarioId": scenario.get("scenarioId", "unknown"),
             "prompt": scenario.get("prompt"),
             "response": scenario.get("response"),
@@ -337,8 +359,8 @@ def _generate_mock_judge_results(
         })
 
     report_path = output_dir / "judge_report.jsonl"
-    with open(report_path, "w") as f:
+    with open(report_path, "w", encoding="utf-8") as f:
         for entry in report:
-            f.write(json.dumps(entry) + "\n")
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
 
     return summary
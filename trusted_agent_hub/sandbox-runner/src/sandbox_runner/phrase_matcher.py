@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+# Longest text a single regex match may span when scanning a stream chunk by chunk
+DEFAULT_REGEX_WINDOW = 512
+
+PatternSpec = Tuple[Union[str, "re.Pattern[str]"], str]
+
+# Flags that can be scoped to one alternative of the combined regex, as inline (?ims:...) groups
+_SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+
+
+@dataclass(frozen=True)
+class PhraseHit:
+  label: str
+  kind: str  # "phrase" or "pattern"
+  start: int  # offsets into the original (un-normalized) text
+  end: int
+
+
+def normalize_text(text: str) -> str:
+  """NFKC (full/half-width folding, e.g. ＣＡＮＮＯＴ / ｶﾞ) followed by casefold."""
+  return unicodedata.normalize("NFKC", text).casefold()
+
+
+def _scoped_source(pattern: Union[str, "re.Pattern[str]"]) -> str:
+  """Pattern source wrapped so its flags apply to it alone inside the combined alternation."""
+  if isinstance(pattern, re.Pattern):
+    source, flags = pattern.pattern, pattern.flags
+  else:
+    source, flags = pattern, 0
+  letters = "".join(letter for flag, letter in _SCOPED_FLAGS if flags & flag)
+  if letters:
+    return f"(?{letters}:{source})"
+  return source
+
+
+def _is_mark(char: str) -> bool:
+  normalized = unicodedata.normalize("NFKC", char)
+  return bool(normalized) and unicodedata.combining(normalized[0]) > 0
+
+
+class _AhoCorasick:
+  def __init__(self, phrases: Sequence[str]) -> None:
+    self.goto: List[Dict[str, int]] = [{}]
+    self.fail: List[int] = [0]
+    self.output: List[Tuple[int, ...]] = [()]
+    outputs: List[List[int]] = [[]]
+    for phrase_id, phrase in enumerate(phrases):
+      node = 0
+      for char in phrase:
+        nxt = self.goto[node].get(char)
+        if nxt is None:
+          nxt = len(self.goto)
+          self.goto[node][char] = nxt
+          self.goto.append({})
+          self.fail.append(0)
+          outputs.append([])
+        node = nxt
+      outputs[node].append(phrase_id)
+    queue: Deque[int] = deque(self.goto[0].values())
+    while queue:
+      node = queue.popleft()
+      for char, child in self.goto[node].items():
+        queue.append(child)
+        fallback = self.fail[node]
+        while fallback and char not in self.goto[fallback]:
+          fallback = self.fail[fallback]
+        target = self.goto[fallback].get(char, 0)
+        self.fail[child] = target if target != child else 0
+        outputs[child].extend(outputs[self.fail[child]])
+    self.output = [tuple(ids) for ids in outputs]
+
+  def step(self, node: int, char: str) -> int:
+    goto = self.goto
+    while node and char not in goto[node]:
+      node = self.fail[node]
+    return goto[node].get(char, 0)
+
+
+class PhraseMatcher:
+  """
+  Keyword phrases (Aho-Corasick) and regexes (one combined alternation) compiled once.
+  Phrases match NFKC+casefolded text; regexes match NFKC-only text with their own flags,
+  so a case-sensitive pattern stays case-sensitive. scan() handles whole responses;
+  stream() accepts incremental chunks and reports hits as soon as they are complete.
+  """
+
+  def __init__(
+    self,
+    phrases: Iterable[str] = (),
+    patterns: Iterable[PatternSpec] = (),
+    *,
+    regex_window: int = DEFAULT_REGEX_WINDOW
+  ) -> None:
+    self.labels: List[str] = []
+    normalized: List[str] = []
+    for phrase in phrases:
+      key = normalize_text(phrase)
+      if key and key not in normalized:
+        self.labels.append(phrase)
+        normalized.append(key)
+    self._lengths = [len(key) for key in normalized]
+    self._automaton = _AhoCorasick(normalized)
+    self._max_length = max(self._lengths, default=0)
+    self.pattern_labels: List[str] = []
+    parts: List[str] = []
+    for pattern, label in patterns:
+      parts.append(f"(?P<p{len(parts)}>{_scoped_source(pattern)})")
+      self.pattern_labels.append(label)
+    self._regex = re.compile("|".join(parts)) if parts else None
+    self.regex_window = regex_window
+
+  def stream(self) -> "MatchStream":
+    return MatchStream(self)
+
+  def scan(self, text: Optional[str]) -> List[PhraseHit]:
+    if not text:
+      return []
+    stream = self.stream()
+    hits = stream.feed(text)
+    hits.extend(stream.finish())
+    return hits
+
+  def matched_labels(self, text: Optional[str]) -> Set[str]:
+    return {hit.label for hit in self.scan(text)}
+
+  def contains_any(self, text: Optional[str]) -> bool:
+    return bool(self.scan(text))
+
+
+class MatchStream:
+  """Incremental matcher state for one response; feed() chunks in order, then finish()."""
+
+  def __init__(self, matcher: PhraseMatcher) -> None:
+    self._matcher = matcher
+    self._node = 0
+    self._held = ""  # trailing source cluster that a following combining mark may still modify
+    self._held_offset = 0
+    # (source start, source end) of the last normalized characters, for phrase hit offsets
+    self._spans: Deque[Tuple[int, int]] = deque(maxlen=max(matcher._max_length, 1))
+    self._regex_text: List[str] = []
+    self._regex_spans: List[Tuple[int, int]] = []
+    self._regex_base = 0
+    self._regex_emitted_until = 0
+
+  def feed(self, chunk: str) -> List[PhraseHit]:
+    if not chunk:
+      return []
+    text = self._held + chunk
+    offset = self._held_offset
+    split = len(text) - 1
+    while split > 0 and _is_mark(text[split]):
+      split -= 1
+    self._held = text[split:]
+    self._held_offset = offset + split
+    hits = self._process(text[:split], offset)
+    hits.extend(self._scan_regex(final=False))
+    return hits
+
+  def finish(self) -> List[PhraseHit]:
+    hits = self._process(self._held, self._held_offset)
+    self._held = ""
+    hits.extend(self._scan_regex(final=True))
+    return hits
+
+  def _process(self, text: str, offset: int) -> List[PhraseHit]:
+    matcher = self._matcher
+    automaton = matcher._automaton
+    hits: List[PhraseHit] = []
+    index = 0
+    while index < len(text):
+      char = text[index]
+      end = index + 1
+      while end < len(text) and not text[end].isascii() and _is_mark(text[end]):
+        end += 1
+      ascii_char = end == index + 1 and char.isascii()
+      span = (offset + index, offset + end)
+      if matcher._regex is not None:
+        for regex_char in char if ascii_char else unicodedata.normalize("NFKC", text[index:end]):
+          self._regex_text.append(regex_char)
+          self._regex_spans.append(span)
+      if matcher.labels:
+        for norm_char in char.lower() if ascii_char else normalize_text(text[index:end]):
+          self._spans.append(span)
+          self._node = automaton.step(self._node, norm_char)
+          for phrase_id in automaton.output[self._node]:
+            length = matcher._lengths[phrase_id]
+            start = self._spans[-length][0]
+            hits.append(PhraseHit(matcher.labels[phrase_id], "phrase", start, span[1]))
+      index = end
+    return hits
+
+  def _scan_regex(self, *, final: bool) -> List[PhraseHit]:
+    matcher = self._matcher
+    if matcher._regex is None or not self._regex_text:
+      return []
+    buffer = "".join(self._regex_text)
+    # Matches ending inside the trailing window could still grow with the next chunk
+    stable_until = len(buffer) if final else len(buffer) - matcher.regex_window
+    hits: List[PhraseHit] = []
+    resume = max(self._regex_emitted_until - self._regex_base, 0)
+    pending = False
+    for match in matcher._regex.finditer(buffer, resume):
+      if match.end() > stable_until:
+        resume = match.start()
+        pending = True
+        break
+      label = matcher.pattern_labels[int(match.lastgroup[1:])]
+      start = self._regex_spans[match.start()][0]
+      end = self._regex_spans[max(match.end() - 1, match.start())][1]
+      hits.append(PhraseHit(label, "pattern", start, end))
+      resume = max(match.end(), match.start() + 1)
+    if not final:
+      if not pending:
+        # Nothing can start before the window any more unless it were longer than the window
+        resume = max(resume, stable_until)
+      self._regex_emitted_until = self._regex_base + resume
+      # Keep only what a future match could still start in, so stream memory stays bounded,
+      # plus one character of left context for \b, lookbehinds and multiline ^
+      trim = resume - 1
+      if trim > 0:
+        del self._regex_text[:trim]
+        del self._regex_spans[:trim]
+        self._regex_base += trim
+    return hits
+
+
+@lru_cache(maxsize=256)
+def compile_phrases(phrases: Tuple[str, ...], patterns: Tuple[PatternSpec, ...] = ()) -> PhraseMatcher:
+  """Shared matcher for a phrase/pattern set (e.g. per-question tolerance lists)."""
+  return PhraseMatcher(phrases, patterns)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Generic, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+P = TypeVar("P")
+R = TypeVar("R")
+
+
+@dataclass
+class StageTimings:
+  """Busy time accumulated by each stage, to compare against the pipeline's wall time."""
+  produce_seconds: float = 0.0
+  consume_seconds: float = 0.0
+  wall_seconds: float = 0.0
+  items: int = 0
+
+  def as_dict(self) -> Dict[str, Any]:
+    return {
+      "items": self.items,
+      "produceSeconds": round(self.produce_seconds, 3),
+      "consumeSeconds": round(self.consume_seconds, 3),
+      "wallSeconds": round(self.wall_seconds, 3)
+    }
+
+
+class OrderedPipeline(Generic[T, P, R]):
+  """
+  Two-stage producer/consumer pipeline that yields results in input order.
+
+  `produce` runs on up to `producer_concurrency` threads (e.g. agent calls); as soon as an
+  item is produced it is handed to `consume` on up to `consumer_concurrency` threads (e.g. LLM
+  evaluation), so the two stages overlap. At most `producer_concurrency + consumer_concurrency
+  + queue_size` items are in flight (including finished ones waiting for their turn), which
+  bounds memory and applies back-pressure to the producers. An exception from either stage
+  is re-raised when its item's turn comes.
+  """
+
+  def __init__(
+    self,
+    produce: Callable[[T], P],
+    consume: Callable[[T, P], R],
+    *,
+    producer_concurrency: int,
+    consumer_concurrency: int,
+    queue_size: int
+  ) -> None:
+    self.produce = produce
+    self.consume = consume
+    self.producer_concurrency = max(1, producer_concurrency)
+    self.consumer_concurrency = max(1, consumer_concurrency)
+    self.queue_size = max(0, queue_size)
+    self.timings = StageTimings()
+    self._timings_lock = threading.Lock()
+
+  @property
+  def window(self) -> int:
+    return self.producer_concurrency + self.consumer_concurrency + self.queue_size
+
+  def _timed(self, stage: str, fn: Callable[..., Any], *args: Any) -> Any:
+    started = time.perf_counter()
+    try:
+      return fn(*args)
+    finally:
+      elapsed = time.perf_counter() - started
+      with self._timings_lock:
+        if stage == "produce":
+          self.timings.produce_seconds += elapsed
+        else:
+          self.timings.consume_seconds += elapsed
+
+  def run(self, items: Iterable[T]) -> Iterator[R]:
+    producers = ThreadPoolExecutor(max_workers=self.producer_concurrency, thread_name_prefix="pipeline-produce")
+    consumers = ThreadPoolExecutor(max_workers=self.consumer_concurrency, thread_name_prefix="pipeline-consume")
+    pending: Deque[Future[R]] = deque()
+    started = time.perf_counter()
+
+    def submit(item: T) -> Future[R]:
+      result: Future[R] = Future()
+
+      def hand_off(produced: Future[P]) -> None:
+        try:
+          value = produced.result()
+        except BaseException as error:  # includes cancellation on early exit
+          result.set_exception(error)
+          return
+        try:
+          consumed = consumers.submit(self._timed, "consume", self.consume, item, value)
+        except RuntimeError as error:  # consumer pool already shut down
+          result.set_exception(error)
+          return
+        consumed.add_done_callback(lambda done: _copy_outcome(done, result))
+
+      producers.submit(self._timed, "produce", self.produce, item).add_done_callback(hand_off)
+      return result
+
+    try:
+      for item in items:
+        pending.append(submit(item))
+        if len(pending) >= self.window:
+          yield self._next(pending)
+      while pending:
+        yield self._next(pending)
+    finally:
+      producers.shutdown(wait=True, cancel_futures=True)
+      consumers.shutdown(wait=True)
+      self.timings.wall_seconds = time.perf_counter() - started
+
+  def _next(self, pending: Deque[Future[R]]) -> R:
+    result = pending.popleft().result()
+    self.timings.items += 1
+    return result
+
+
+def _copy_outcome(source: Future[Any], target: Future[Any]) -> None:
+  error = source.exception()
+  if error is not None:
+    target.set_exception(error)
+  else:
+    target.set_result(source.result())
+
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .dataset_stream import iter_jsonl
+
+Tokenizer = Callable[[str], List[str]]
+
+# Postings longer than this are cut by weight instead of being scored in full
+FULL_POSTINGS_BUDGET = 32768
+DirectoryVersion = Tuple[Tuple[str, int, int], ...]
+
+
+# Fields expected-answer matching reads; everything else in a RAGTruth record is dropped on load
+RAGTRUTH_FIELDS = ("useCase", "answer")
+
+
+def iter_ragtruth(dir_path: Path, *, fields: Optional[Sequence[str]] = RAGTRUTH_FIELDS) -> Iterator[Dict[str, Any]]:
+  """RAGTruth records streamed line by line from every *.jsonl file (sorted), trimmed to `fields`."""
+  if not dir_path.exists():
+    return iter(())
+  return iter_jsonl(sorted(dir_path.glob("*.jsonl")), fields=fields)
+
+
+def load_ragtruth(dir_path: Path) -> List[Dict[str, Any]]:
+  return list(iter_ragtruth(dir_path, fields=None))
+
+
+def ragtruth_version(dir_path: Path) -> DirectoryVersion:
+  """(name, mtime, size) of every RAGTruth file; any edit, addition or removal changes it."""
+  if not dir_path.exists():
+    return ()
+  entries = []
+  for jsonl_file in dir_path.glob("*.jsonl"):
+    stat = jsonl_file.stat()
+    entries.append((jsonl_file.name, stat.st_mtime_ns, stat.st_size))
+  return tuple(sorted(entries))
+
+
+@dataclass(frozen=True)
+class IndexHit:
+  similarity: float
+  record: Dict[str, Any]
+
+
+class RagTruthIndex:
+  """
+  Inverted index over RAGTruth `useCase` texts for expected-answer lookup.
+
+  Only the first record of each distinct use-case text is kept (later duplicates can never be
+  returned), so `records` may be a stream. Distinct texts become documents with precomputed
+  term counts and norms, and each
+  token keeps a postings list of the documents containing it. Queries score only documents
+  that share a token with the query: rare tokens' postings in full, common tokens' only down
+  to the weight a document would need to still reach the threshold (or the current k-th
+  best score). Scores equal the token cosine of a full scan, ties resolve to the earliest record.
+  """
+
+  def __init__(self, records: Iterable[Dict[str, Any]], *, tokenizer: Tokenizer) -> None:
+    self.records: List[Dict[str, Any]] = []  # first record per distinct useCase, in input order
+    self.record_count = 0  # every record read, duplicates and records without useCase included
+    self.tokenizer = tokenizer
+    self._exact: Dict[str, int] = {}
+    self._doc_records: List[int] = []  # document -> position in self.records
+    self._doc_vectors: List[Dict[str, int]] = []
+    self._doc_norms: List[float] = []
+    postings: Dict[str, List[int]] = {}
+    for record in records:
+      self.record_count += 1
+      use_case = record.get("useCase")
+      if not isinstance(use_case, str) or not use_case or use_case in self._exact:
+        continue
+      position = len(self.records)
+      self.records.append(record)
+      self._exact[use_case] = position
+      counts = Counter(tokenizer(use_case))
+      if not counts:
+        continue
+      doc = len(self._doc_records)
+      self._doc_records.append(position)
+      self._doc_vectors.append(dict(counts))
+      self._doc_norms.append(math.sqrt(sum(count * count for count in counts.values())))
+      for token in counts:
+        postings.setdefault(token, []).append(doc)
+    # Postings are ordered by the token's weight in the document (count / norm), heaviest first,
+    # so a minimum-weight cut is a bisect on the negated weights
+    self._postings: Dict[str, Tuple[int, ...]] = {}
+    self._posting_weights: Dict[str, List[float]] = {}
+    for token, docs in postings.items():
+      ordered = sorted(docs, key=lambda doc: (-self._doc_vectors[doc][token] / self._doc_norms[doc], doc))
+      self._postings[token] = tuple(ordered)
+      self._posting_weights[token] = [-self._doc_vectors[doc][token] / self._doc_norms[doc] for doc in ordered]
+
+  @property
+  def documents(self) -> int:
+    return len(self._doc_records)
+
+  def exact(self, use_case: str) -> Optional[Dict[str, Any]]:
+    position = self._exact.get(use_case)
+    return self.records[position] if position is not None else None
+
+  def search(self, text: str, *, k: int = 5, min_similarity: float = 0.0) -> List[IndexHit]:
+    """Top-k records by token cosine with their useCase, best first."""
+    query = Counter(self.tokenizer(text))
+    if not query or k <= 0:
+      return []
+    query_norm = math.sqrt(sum(count * count for count in query.values()))
+    weights = {token: count / query_norm for token, count in query.items() if token in self._postings}
+    # Rarest tokens first. Their postings are scored in full until a common token is reached;
+    # from then on only documents heavy enough in some remaining token to reach the bar are.
+    tokens = sorted(weights, key=lambda token: len(self._postings[token]))
+    scores: Dict[int, float] = {}
+    cut_weight: Optional[float] = None
+    for position, token in enumerate(tokens):
+      postings = self._postings[token]
+      if cut_weight is None:
+        bar = max(min_similarity, self._kth_score(scores, k))
+        # Documents sharing only the remaining tokens score at most sqrt(sum a_t^2) over them;
+        # the slack keeps a tie on the bar (which the earlier document wins) in play
+        rest = tokens[position:]
+        if bar > 0 and math.sqrt(sum(weights[token] ** 2 for token in rest)) < bar - 1e-12:
+          break
+        if bar > 0 and len(postings) > FULL_POSTINGS_BUDGET:
+          # ...and sum(a_t * w_t), so some remaining token must have w_t >= bar / sum(a_t).
+          # The cut stays fixed from here on so the argument holds for every remaining token.
+          cut_weight = bar / sum(weights[token] for token in rest)
+      if cut_weight is not None:
+        postings = postings[:bisect.bisect_right(self._posting_weights[token], -cut_weight + 1e-12)]
+      self._score_all(postings, query, query_norm, scores)
+    scored = [(similarity, doc) for doc, similarity in scores.items() if similarity >= min_similarity and similarity > 0]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [IndexHit(similarity, self.records[self._doc_records[doc]]) for similarity, doc in scored[:k]]
+
+  def _score_all(self, docs: Sequence[int], query: Counter[str], query_norm: float, scores: Dict[int, float]) -> None:
+    for doc in docs:
+      if doc in scores:
+        continue
+      vector = self._doc_vectors[doc]
+      # Integer dot product first, so scores are bit-identical to semantic_similarity()
+      dot = sum(count * vector.get(token, 0) for token, count in query.items())
+      scores[doc] = dot / (query_norm * self._doc_norms[doc])
+
+  @staticmethod
+  def _kth_score(scores: Dict[int, float], k: int) -> float:
+    if len(scores) < k:
+      return 0.0
+    return heapq.nlargest(k, scores.values())[-1]
+
+  def best_match(self, use_case: str, *, threshold: float) -> Optional[Dict[str, Any]]:
+    """Exact useCase match first, else the most similar record at or above `threshold`."""
+    matched = self.exact(use_case)
+    if matched is not None:
+      return matched
+    hits = self.search(use_case, k=1, min_similarity=threshold)
+    return hits[0].record if hits else None
+
+
+_indexes: Dict[Tuple[Path, Tokenizer], Tuple[DirectoryVersion, RagTruthIndex]] = {}
+_lock = threading.Lock()
+
+
+def get_ragtruth_index(dir_path: Path, *, tokenizer: Tokenizer) -> RagTruthIndex:
+  """Shared index for a RAGTruth directory, rebuilt only when its files change."""
+  key = (dir_path.resolve(), tokenizer)
+  version = ragtruth_version(dir_path)
+  with _lock:
+    cached = _indexes.get(key)
+  if cached and cached[0] == version:
+    return cached[1]
+  index = RagTruthIndex(iter_ragtruth(dir_path), tokenizer=tokenizer)
+  with _lock:
+    _indexes[key] = (version, index)
+  return index
+
+
+def clear_ragtruth_indexes() -> None:
+  with _lock:
+    _indexes.clear()
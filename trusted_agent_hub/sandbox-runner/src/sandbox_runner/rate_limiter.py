@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .resilience import parse_retry_after
+
+T = TypeVar("T")
+
+# Starting rate per (provider, model); 1 req/s matches the fixed pacing this limiter replaces
+LLM_RATE_INITIAL_RPS = float(os.environ.get("LLM_RATE_INITIAL_RPS", "1.0"))
+LLM_RATE_MIN_RPS = float(os.environ.get("LLM_RATE_MIN_RPS", "0.05"))
+LLM_RATE_MAX_RPS = float(os.environ.get("LLM_RATE_MAX_RPS", "20"))
+# Additive increase per successful call / multiplicative decrease per throttled call
+LLM_RATE_INCREASE_RPS = float(os.environ.get("LLM_RATE_INCREASE_RPS", "0.1"))
+LLM_RATE_DECREASE_FACTOR = float(os.environ.get("LLM_RATE_DECREASE_FACTOR", "0.5"))
+LLM_RATE_BURST = float(os.environ.get("LLM_RATE_BURST", "2"))
+LLM_RATE_MAX_ATTEMPTS = int(os.environ.get("LLM_RATE_MAX_ATTEMPTS", "4"))
+# Provider-suggested waits above this are capped so a single call cannot stall a run for minutes
+LLM_RATE_MAX_COOLDOWN_SECONDS = float(os.environ.get("LLM_RATE_MAX_COOLDOWN_SECONDS", "60"))
+
+# Callers name the same quota differently (ADK agents run on the Gemini API)
+PROVIDER_ALIASES = {"google-adk": "google", "gemini": "google", "genai": "google"}
+
+_RATE_LIMIT_MESSAGE_PATTERN = re.compile(
+  r"\bRESOURCE_EXHAUSTED\b|too many requests|\brate[ _]limit(?:ed|[ _]exceeded|_error)\b", re.IGNORECASE
+)
+_RETRY_DELAY_PATTERN = re.compile(r"retry(?:[_ ]?delay['\"]?\s*[:=]\s*['\"]?| in )\s*([0-9]+(?:\.[0-9]+)?)\s*s", re.IGNORECASE)
+
+
+def normalize_provider(provider: str) -> str:
+  key = (provider or "unknown").strip().lower()
+  return PROVIDER_ALIASES.get(key, key)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+  """429 / RESOURCE_EXHAUSTED from the OpenAI, Anthropic or Gemini SDKs, or a message naming the throttle."""
+  for source in (error, getattr(error, "response", None)):
+    for attr in ("status_code", "code", "status"):
+      value = getattr(source, attr, None)
+      if value == 429 or value == "RESOURCE_EXHAUSTED":
+        return True
+  # A bare "429" is not enough: request IDs, token counts and timestamps contain it too
+  return bool(_RATE_LIMIT_MESSAGE_PATTERN.search(str(error)))
+
+
+def retry_after_from_error(error: BaseException) -> Optional[float]:
+  """Server-suggested wait: a Retry-After header on the SDK response, else Gemini's retryDelay."""
+  response = getattr(error, "response", None)
+  headers = getattr(response, "headers", None)
+  if headers is not None:
+    try:
+      retry_after = parse_retry_after(dict(headers))
+    except (TypeError, ValueError):
+      retry_after = None
+    if retry_after is not None:
+      return retry_after
+  match = _RETRY_DELAY_PATTERN.search(str(error))
+  return float(match.group(1)) if match else None
+
+
+class AdaptiveRateLimiter:
+  """
+  Token bucket whose refill rate is tuned AIMD-style from provider feedback.
+
+  Every successful call raises the rate by `increase_rps` (up to `max_rps`); a 429 /
+  RESOURCE_EXHAUSTED multiplies it by `decrease_factor` (down to `min_rps`), drains the
+  bucket and, when the provider says how long to wait, blocks new calls until then.
+  Throttles that arrive together (concurrent calls hitting the same limit) count as one.
+  Thread-safe; acquire() and acquire_async() may be mixed across threads and event loops.
+  """
+
+  def __init__(
+    self,
+    name: str = "default",
+    *,
+    initial_rps: float = LLM_RATE_INITIAL_RPS,
+    min_rps: float = LLM_RATE_MIN_RPS,
+    max_rps: float = LLM_RATE_MAX_RPS,
+    increase_rps: float = LLM_RATE_INCREASE_RPS,
+    decrease_factor: float = LLM_RATE_DECREASE_FACTOR,
+    burst: float = LLM_RATE_BURST,
+    max_cooldown_seconds: float = LLM_RATE_MAX_COOLDOWN_SECONDS,
+    clock: Callable[[], float] = time.monotonic
+  ) -> None:
+    self.name = name
+    self.min_rps = min_rps
+    self.max_rps = max(max_rps, min_rps)
+    self.rate = min(max(initial_rps, min_rps), self.max_rps)
+    self.increase_rps = increase_rps
+    self.decrease_factor = decrease_factor
+    self.burst = max(1.0, burst)
+    self.max_cooldown_seconds = max_cooldown_seconds
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._tokens = 1.0
+    self._updated = clock()
+    self._blocked_until = 0.0
+    self._last_decrease = float("-inf")
+    self.calls = 0
+    self.successes = 0
+    self.throttled = 0
+    self.waited_seconds = 0.0
+
+  def _refill(self, now: float) -> None:
+    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+    self._updated = now
+
+  def reserve(self) -> float:
+    """Take a token now and return how long the caller must wait before using it."""
+    with self._lock:
+      now = self._clock()
+      self._refill(now)
+      self._tokens -= 1.0
+      wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+      wait = max(wait, self._blocked_until - now)
+      self.calls += 1
+      self.waited_seconds += wait
+      return wait
+
+  def acquire(self, sleep: Callable[[float], None] = time.sleep) -> float:
+    wait = self.reserve()
+    if wait > 0:
+      sleep(wait)
+    return wait
+
+  async def acquire_async(self) -> float:
+    wait = self.reserve()
+    if wait > 0:
+      await asyncio.sleep(wait)
+    return wait
+
+  def record_success(self) -> None:
+    with self._lock:
+      self.successes += 1
+      self.rate = min(self.max_rps, self.rate + self.increase_rps)
+
+  def record_throttle(self, retry_after: Optional[float] = None) -> None:
+    with self._lock:
+      now = self._clock()
+      self.throttled += 1
+      if retry_after is not None:
+        self._blocked_until = max(self._blocked_until, now + min(retry_after, self.max_cooldown_seconds))
+      # One decrease per refill interval: a burst of 429s from in-flight calls is one congestion signal
+      if now - self._last_decrease < 1.0 / self.rate:
+        return
+      self._last_decrease = now
+      self._refill(now)
+      self._tokens = min(self._tokens, 0.0)
+      self.rate = max(self.min_rps, self.rate * self.decrease_factor)
+
+  def snapshot(self) -> Dict[str, Any]:
+    with self._lock:
+      return {
+        "ratePerSecond": round(self.rate, 4),
+        "calls": self.calls,
+        "successes": self.successes,
+        "throttled": self.throttled,
+        "waitedSeconds": round(self.waited_seconds, 3)
+      }
+
+
+_limiters: Dict[Tuple[str, str], AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: Optional[str] = None) -> AdaptiveRateLimiter:
+  """Process-wide limiter for a (provider, model) quota, shared by every caller."""
+  key = (normalize_provider(provider), model or "*")
+  with _limiters_lock:
+    limiter = _limiters.get(key)
+    if limiter is None:
+      limiter = AdaptiveRateLimiter(f"{key[0]}/{key[1]}")
+      _limiters[key] = limiter
+    return limiter
+
+
+def rate_limiter_snapshots() -> Dict[str, Dict[str, Any]]:
+  with _limiters_lock:
+    limiters = list(_limiters.values())
+  return {limiter.name: limiter.snapshot() for limiter in limiters}
+
+
+def reset_rate_limiters() -> None:
+  with _limiters_lock:
+    _limiters.clear()
+
+
+def call_with_rate_limit(
+  provider: str,
+  model: Optional[str],
+  fn: Callable[[], T],
+  *,
+  max_attempts: int = LLM_RATE_MAX_ATTEMPTS,
+  limiter: Optional[AdaptiveRateLimiter] = None,
+  sleep: Callable[[float], None] = time.sleep
+) -> T:
+  """Run a provider call under its limiter, retrying throttled attempts; other errors propagate."""
+  limiter = limiter or get_rate_limiter(provider, model)
+  for attempt in range(1, max(1, max_attempts) + 1):
+    limiter.acquire(sleep)
+    try:
+      result = fn()
+    except Exception as error:
+      if not is_rate_limit_error(error):
+        raise
+      limiter.record_throttle(retry_after_from_error(error))
+      if attempt >= max_attempts:
+        raise
+      continue
+    limiter.record_success()
+    return result
+  raise RuntimeError("unreachable")  # pragma: no cover
+
+
+async def call_with_rate_limit_async(
+  provider: str,
+  model: Optional[str],
+  fn: Callable[[], Awaitable[T]],
+  *,
+  max_attempts: int = LLM_RATE_MAX_ATTEMPTS,
+  limiter: Optional[AdaptiveRateLimiter] = None
+) -> T:
+  """Async counterpart of call_with_rate_limit; `fn` creates a fresh awaitable per attempt."""
+  limiter = limiter or get_rate_limiter(provider, model)
+  for attempt in range(1, max(1, max_attempts) + 1):
+    await limiter.acquire_async()
+    try:
+      result = await fn()
+    except Exception as error:
+      if not is_rate_limit_error(error):
+        raise
+      limiter.record_throttle(retry_after_from_error(error))
+      if attempt >= max_attempts:
+        raise
+      continue
+    limiter.record_success()
+    return result
+  raise RuntimeError("unreachable")  # pragma: no cover
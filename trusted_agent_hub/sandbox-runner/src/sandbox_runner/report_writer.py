@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
+
+# Records read back from a report artifact for the review UI, and the characters kept per long text field
+DEFAULT_PAGE_LIMIT = int(os.environ.get("REPORT_PAGE_LIMIT", "200"))
+DEFAULT_PAGE_TEXT_CHARS = int(os.environ.get("REPORT_PAGE_TEXT_CHARS", "4000"))
+# Buffered writes are flushed after this many records / seconds and fsynced at most this often
+DEFAULT_FLUSH_EVERY = int(os.environ.get("REPORT_FLUSH_EVERY", "16"))
+DEFAULT_FSYNC_SECONDS = float(os.environ.get("REPORT_FSYNC_SECONDS", "5"))
+# Minimum interval between progress callbacks, so the pipeline does not commit per record
+DEFAULT_PUBLISH_SECONDS = float(os.environ.get("REPORT_PUBLISH_SECONDS", "2"))
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class StreamingReportWriter:
+  """
+  Append-only JSONL report writer for stage runners.
+
+  Each record is written as soon as it is produced (buffered, flushed every few records
+  and fsynced periodically) and only running counters per `count_key` stay in memory.
+  Readers page through the artifact with `read_report_page`.
+  """
+
+  def __init__(
+    self,
+    path: Path,
+    *,
+    count_key: Optional[Callable[[Dict[str, Any]], str]] = None,
+    flush_every: int = DEFAULT_FLUSH_EVERY,
+    fsync_seconds: float = DEFAULT_FSYNC_SECONDS,
+    on_progress: Optional[ProgressCallback] = None,
+    publish_seconds: float = DEFAULT_PUBLISH_SECONDS,
+    planned: Optional[int] = None
+  ) -> None:
+    self.path = path
+    self.count_key = count_key
+    self.flush_every = max(1, flush_every)
+    self.fsync_seconds = fsync_seconds
+    self.on_progress = on_progress
+    self.publish_seconds = publish_seconds
+    self.planned = planned
+    self.written = 0
+    self.counts: Dict[str, int] = {}
+    self._file: Optional[IO[str]] = None
+    self._unflushed = 0
+    self._last_fsync = time.monotonic()
+    self._last_publish = 0.0
+
+  def __enter__(self) -> "StreamingReportWriter":
+    self.open()
+    return self
+
+  def __exit__(self, *exc_info: Any) -> None:
+    self.close()
+
+  def open(self) -> None:
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self._file = self.path.open("w", encoding="utf-8", buffering=64 * 1024)
+
+  def write(self, record: Dict[str, Any]) -> None:
+    if self._file is None:
+      raise RuntimeError("report writer is not open")
+    self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    self.written += 1
+    self._unflushed += 1
+    if self.count_key is not None:
+      key = self.count_key(record)
+      self.counts[key] = self.counts.get(key, 0) + 1
+    if self._unflushed >= self.flush_every:
+      self.flush()
+    self._publish(force=False)
+
+  def flush(self, *, fsync: bool = False) -> None:
+    if self._file is None:
+      return
+    self._file.flush()
+    self._unflushed = 0
+    now = time.monotonic()
+    if fsync or now - self._last_fsync >= self.fsync_seconds:
+      os.fsync(self._file.fileno())
+      self._last_fsync = now
+
+  def close(self) -> None:
+    if self._file is None:
+      return
+    self.flush(fsync=True)
+    self._file.close()
+    self._file = None
+    self._publish(force=True)
+
+  def progress(self) -> Dict[str, Any]:
+    return {
+      "written": self.written,
+      "planned": self.planned,
+      "counts": dict(self.counts),
+      "report": str(self.path)
+    }
+
+  def _publish(self, *, force: bool) -> None:
+    if self.on_progress is None:
+      return
+    now = time.monotonic()
+    if not force and now - self._last_publish < self.publish_seconds:
+      return
+    self._last_publish = now
+    self.on_progress(self.progress())
+
+
+def read_report_page(
+  path: Path,
+  *,
+  offset: int = 0,
+  limit: int = DEFAULT_PAGE_LIMIT,
+  text_chars: int = DEFAULT_PAGE_TEXT_CHARS
+) -> Tuple[List[Dict[str, Any]], int]:
+  """
+  Records [offset, offset + limit) of a JSONL report in file order, plus the total record
+  count. The file is streamed, so only the page is held in memory; string fields longer than
+  `text_chars` are clipped (the artifact keeps the full text).
+  """
+  records: List[Dict[str, Any]] = []
+  total = 0
+  if not path.exists():
+    return records, total
+  with path.open(encoding="utf-8") as f:
+    for line in f:
+      line = line.strip()
+      if not line:
+        continue
+      if offset <= total < offset + limit:
+        try:
+          record = json.loads(line)
+        except json.JSONDecodeError:
+          continue
+        records.append({
+          key: value[:text_chars] + "…" if isinstance(value, str) and len(value) > text_chars else value
+          for key, value in record.items()
+        })
+      total += 1
+  return records, total
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, FrozenSet, List, Mapping, Optional
+
+from .agent_transport import AgentHTTPError, AgentResponse, AgentTransport, AgentTransportError, endpoint_key, get_transport
+
+RETRY_MAX_ATTEMPTS = int(os.environ.get("AGENT_RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_SECONDS = float(os.environ.get("AGENT_RETRY_BASE_SECONDS", "0.35"))
+RETRY_MAX_SECONDS = float(os.environ.get("AGENT_RETRY_MAX_SECONDS", "8"))
+# Retry-After values above this are not waited out; the call fails instead
+RETRY_AFTER_MAX_SECONDS = float(os.environ.get("AGENT_RETRY_AFTER_MAX_SECONDS", "30"))
+BREAKER_WINDOW = int(os.environ.get("AGENT_BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.environ.get("AGENT_BREAKER_MIN_CALLS", "4"))
+BREAKER_FAILURE_RATE = float(os.environ.get("AGENT_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_OPEN_SECONDS = float(os.environ.get("AGENT_BREAKER_OPEN_SECONDS", "15"))
+BREAKER_HALF_OPEN_PROBES = int(os.environ.get("AGENT_BREAKER_HALF_OPEN_PROBES", "1"))
+
+RETRYABLE_HTTP_STATUS: FrozenSet[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Statuses that say the endpoint itself is unhealthy (429 means it is alive but throttling us)
+BREAKER_FAILURE_STATUS: FrozenSet[int] = frozenset({408, 500, 502, 503, 504})
+
+
+class CircuitOpenError(AgentTransportError):
+  """Raised without touching the network while the endpoint's circuit is open."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+  max_attempts: int = RETRY_MAX_ATTEMPTS
+  base_seconds: float = RETRY_BASE_SECONDS
+  max_seconds: float = RETRY_MAX_SECONDS
+  retry_after_max_seconds: float = RETRY_AFTER_MAX_SECONDS
+  retryable_status: FrozenSet[int] = RETRYABLE_HTTP_STATUS
+
+  def delay(self, attempt: int, retry_after: Optional[float] = None, rng: Optional[random.Random] = None) -> float:
+    """Full-jitter exponential backoff; a server-provided Retry-After acts as a lower bound."""
+    ceiling = min(self.max_seconds, self.base_seconds * (2 ** (attempt - 1)))
+    jittered = (rng or random).uniform(0, ceiling)
+    if retry_after is not None:
+      return max(retry_after, jittered)
+    return jittered
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+  """Retry-After as seconds (delta-seconds or HTTP-date form)."""
+  value = next((v for k, v in headers.items() if k.lower() == "retry-after"), None)
+  if not value:
+    return None
+  value = value.strip()
+  if value.isdigit():
+    return float(value)
+  try:
+    parsed = email.utils.parsedate_to_datetime(value)
+  except (TypeError, ValueError):
+    return None
+  return max(0.0, parsed.timestamp() - time.time())
+
+
+class CircuitBreaker:
+  """
+  Per-host breaker over a rolling window of call outcomes.
+
+  closed -> open once at least `min_calls` outcomes are recorded and the failure rate reaches
+  `failure_rate`; open -> half_open after `open_seconds`, when up to `half_open_probes` calls may
+  go through; a successful probe closes the circuit, a failed one re-opens it.
+  """
+
+  def __init__(
+    self,
+    *,
+    window: int = BREAKER_WINDOW,
+    min_calls: int = BREAKER_MIN_CALLS,
+    failure_rate: float = BREAKER_FAILURE_RATE,
+    open_seconds: float = BREAKER_OPEN_SECONDS,
+    half_open_probes: int = BREAKER_HALF_OPEN_PROBES,
+    clock: Callable[[], float] = time.monotonic
+  ) -> None:
+    self.min_calls = min_calls
+    self.failure_rate = failure_rate
+    self.open_seconds = open_seconds
+    self.half_open_probes = max(1, half_open_probes)
+    self._clock = clock
+    self._outcomes: Deque[bool] = deque(maxlen=window)
+    self._state = "closed"
+    self._opened_at = 0.0
+    self._probes_in_flight = 0
+    self._lock = threading.Lock()
+    self.rejected = 0
+    self.opened = 0
+
+  @property
+  def state(self) -> str:
+    with self._lock:
+      self._maybe_half_open()
+      return self._state
+
+  def _maybe_half_open(self) -> None:
+    if self._state == "open" and self._clock() - self._opened_at >= self.open_seconds:
+      self._state = "half_open"
+      self._probes_in_flight = 0
+
+  def allow(self) -> bool:
+    with self._lock:
+      self._maybe_half_open()
+      if self._state == "closed":
+        return True
+      if self._state == "half_open" and self._probes_in_flight < self.half_open_probes:
+        self._probes_in_flight += 1
+        return True
+      self.rejected += 1
+      return False
+
+  def record(self, success: bool) -> None:
+    with self._lock:
+      if self._state == "half_open":
+        self._probes_in_flight = max(0, self._probes_in_flight - 1)
+        if success:
+          self._state = "closed"
+          self._outcomes.clear()
+        else:
+          self._trip()
+        return
+      self._outcomes.append(success)
+      failures = sum(1 for outcome in self._outcomes if not outcome)
+      if (
+        self._state == "closed"
+        and len(self._outcomes) >= self.min_calls
+        and failures / len(self._outcomes) >= self.failure_rate
+      ):
+        self._trip()
+
+  def _trip(self) -> None:
+    self._state = "open"
+    self._opened_at = self._clock()
+    self.opened += 1
+
+  def snapshot(self) -> Dict[str, Any]:
+    with self._lock:
+      self._maybe_half_open()
+      failures = sum(1 for outcome in self._outcomes if not outcome)
+      return {
+        "state": self._state,
+        "recentCalls": len(self._outcomes),
+        "recentFailures": failures,
+        "timesOpened": self.opened,
+        "rejected": self.rejected
+      }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint_url: str) -> CircuitBreaker:
+  key = endpoint_key(endpoint_url)
+  with _breakers_lock:
+    breaker = _breakers.get(key)
+    if breaker is None:
+      breaker = CircuitBreaker()
+      _breakers[key] = breaker
+    return breaker
+
+
+def breaker_snapshot(endpoint_url: Optional[str]) -> Optional[Dict[str, Any]]:
+  if not endpoint_url:
+    return None
+  with _breakers_lock:
+    breaker = _breakers.get(endpoint_key(endpoint_url))
+  return breaker.snapshot() if breaker else None
+
+
+@dataclass
+class CallOutcome:
+  response: Optional[AgentResponse]
+  error: Optional[Exception] = None
+  attempts: int = 0
+  history: List[str] = field(default_factory=list)
+
+
+def resilient_post_json(
+  endpoint_url: str,
+  payload: Dict[str, Any],
+  *,
+  timeout: float,
+  token: Optional[str] = None,
+  policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+  transport: Optional[AgentTransport] = None,
+  sleep: Callable[[float], None] = time.sleep
+) -> CallOutcome:
+  """
+  POST through the shared transport with retries and the endpoint's circuit breaker.
+  Never raises; the last error (including unexpected transport errors) is returned in the outcome.
+  """
+  transport = transport or get_transport()
+  breaker = get_breaker(endpoint_url)
+  outcome = CallOutcome(response=None)
+  for attempt in range(1, policy.max_attempts + 1):
+    if not breaker.allow():
+      outcome.error = CircuitOpenError(f"circuit_open: {endpoint_key(endpoint_url)}")
+      outcome.history.append(f"attempt {attempt}: circuit open")
+      return outcome
+    outcome.attempts = attempt
+    retry_after: Optional[float] = None
+    try:
+      outcome.response = transport.post_json(endpoint_url, payload, timeout=timeout, token=token)
+    except AgentHTTPError as error:
+      breaker.record(error.status not in BREAKER_FAILURE_STATUS)
+      outcome.error = error
+      outcome.history.append(f"attempt {attempt}: HTTP {error.status}")
+      if error.status not in policy.retryable_status:
+        return outcome
+      retry_after = parse_retry_after(error.headers)
+      if retry_after is not None and retry_after > policy.retry_after_max_seconds:
+        return outcome
+    except AgentTransportError as error:
+      breaker.record(False)
+      outcome.error = error
+      outcome.history.append(f"attempt {attempt}: {error}")
+    except Exception as error:  # noqa: BLE001 - e.g. an invalid URL or a failed response spool
+      # Still recorded so a half-open probe is released; not retried since it is not transient
+      breaker.record(False)
+      outcome.error = error
+      outcome.history.append(f"attempt {attempt}: {type(error).__name__}: {error}")
+      return outcome
+    else:
+      breaker.record(True)
+      outcome.error = None
+      return outcome
+    if attempt < policy.max_attempts:
+      sleep(policy.delay(attempt, retry_after))
+  return outcome
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Disabled unless a directory is configured; shared by every run on the host
+RESPONSE_CACHE_DIR = os.environ.get("SECURITY_RESPONSE_CACHE_DIR")
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("SECURITY_RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("SECURITY_RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Bump when the request payload sent to agents changes shape
+PAYLOAD_VERSION = "prompt-v1"
+# Least recently read entries deleted per query while the cache is over its byte budget
+EVICTION_BATCH = 32
+
+
+def _sha256(text: str) -> str:
+  return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# A snapshot hash is only trusted as cache identity when it is an actual SHA-256 digest;
+# placeholders such as "hash" or "sha256:mock" would let every revision share one scope
+_SNAPSHOT_HASH_PATTERN = re.compile(r"(?:sha256:)?[0-9a-f]{64}")
+
+
+def is_snapshot_hash(value: Optional[str]) -> bool:
+  return value is not None and _SNAPSHOT_HASH_PATTERN.fullmatch(value.strip().lower()) is not None
+
+
+def cache_scope(endpoint_snapshot_hash: str, endpoint_url: str, endpoint_token: Optional[str] = None) -> str:
+  """
+  Everything besides the prompt that determines the agent's answer: the endpoint snapshot,
+  where and how we call it. Tokens are hashed so they never reach the cache file.
+  """
+  transport = {
+    "url": endpoint_url,
+    "token": _sha256(endpoint_token) if endpoint_token else None,
+    "payload": PAYLOAD_VERSION
+  }
+  return _sha256(json.dumps([endpoint_snapshot_hash, transport], sort_keys=True))
+
+
+class ResponseCache:
+  """
+  Persistent agent-response cache keyed by (scope, sha256(final prompt)).
+
+  Backed by a single SQLite file so several workers on the host can share it. Entries
+  expire after `ttl_seconds`; when the stored bytes exceed `max_bytes` the least recently
+  read entries are evicted. The byte total lives in a one-row table kept current by
+  triggers, so a write costs index lookups rather than a scan of the whole cache.
+  """
+
+  def __init__(
+    self,
+    root_dir: Path,
+    *,
+    ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+    max_bytes: int = RESPONSE_CACHE_MAX_BYTES
+  ) -> None:
+    root_dir.mkdir(parents=True, exist_ok=True)
+    self.path = root_dir / "responses.sqlite3"
+    self.ttl_seconds = ttl_seconds
+    self.max_bytes = max_bytes
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute(
+      "CREATE TABLE IF NOT EXISTS responses ("
+      " key TEXT PRIMARY KEY, scope TEXT NOT NULL, response TEXT NOT NULL,"
+      " size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+    )
+    self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+    self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)")
+    self._conn.execute(
+      "CREATE TABLE IF NOT EXISTS response_stats (id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL)"
+    )
+    self._conn.execute(
+      "CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses BEGIN"
+      " UPDATE response_stats SET total_bytes = total_bytes + NEW.size WHERE id = 0; END"
+    )
+    self._conn.execute(
+      "CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses BEGIN"
+      " UPDATE response_stats SET total_bytes = total_bytes - OLD.size WHERE id = 0; END"
+    )
+    self._conn.execute(
+      "CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses BEGIN"
+      " UPDATE response_stats SET total_bytes = total_bytes + NEW.size - OLD.size WHERE id = 0; END"
+    )
+    # Seeds the total once for files written before the stats table existed
+    self._conn.execute(
+      "INSERT OR IGNORE INTO response_stats (id, total_bytes) SELECT 0, COALESCE(SUM(size), 0) FROM responses"
+    )
+    self._conn.commit()
+    self.hits = 0
+    self.misses = 0
+    self.stores = 0
+    self.evictions = 0
+
+  @staticmethod
+  def key(scope: str, prompt_text: str) -> str:
+    return _sha256(f"{scope}\0{_sha256(prompt_text)}")
+
+  def get(self, scope: str, prompt_text: str) -> Optional[str]:
+    key = self.key(scope, prompt_text)
+    now = time.time()
+    with self._lock:
+      row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+      if row is None or now - row[1] > self.ttl_seconds:
+        if row is not None:
+          self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+          self._conn.commit()
+        self.misses += 1
+        return None
+      self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+      self._conn.commit()
+      self.hits += 1
+      return row[0]
+
+  def put(self, scope: str, prompt_text: str, response_text: str) -> None:
+    size = len(response_text.encode("utf-8"))
+    if size > self.max_bytes:
+      return
+    now = time.time()
+    with self._lock:
+      # An upsert (not INSERT OR REPLACE) so the update trigger sees the replaced row's size
+      self._conn.execute(
+        "INSERT INTO responses (key, scope, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (key) DO UPDATE SET response = excluded.response, size = excluded.size,"
+        " created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+        (self.key(scope, prompt_text), scope, response_text, size, now, now)
+      )
+      self.stores += 1
+      self._evict(now)
+      self._conn.commit()
+
+  def total_bytes(self) -> int:
+    row = self._conn.execute("SELECT total_bytes FROM response_stats WHERE id = 0").fetchone()
+    return row[0] if row else 0
+
+  def _evict(self, now: float) -> None:
+    self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+    total = self.total_bytes()
+    while total > self.max_bytes:
+      batch = self._conn.execute(
+        "SELECT key, size FROM responses ORDER BY accessed_at ASC LIMIT ?", (EVICTION_BATCH,)
+      ).fetchall()
+      if not batch:
+        break
+      for key, size in batch:
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self.evictions += 1
+        total -= size
+        if total <= self.max_bytes:
+          break
+
+  def stats(self) -> Dict[str, Any]:
+    return {
+      "path": str(self.path),
+      "hits": self.hits,
+      "misses": self.misses,
+      "stores": self.stores,
+      "evictions": self.evictions
+    }
+
+  def close(self) -> None:
+    with self._lock:
+      self._conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+  """Process-wide cache configured by SECURITY_RESPONSE_CACHE_DIR, or None when disabled."""
+  global _cache
+  if not RESPONSE_CACHE_DIR:
+    return None
+  with _cache_lock:
+    if _cache is None:
+      _cache = ResponseCache(Path(RESPONSE_CACHE_DIR))
+    return _cache
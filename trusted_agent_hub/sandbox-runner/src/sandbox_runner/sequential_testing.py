@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def wilson_interval(successes: int, trials: int, confidence: float) -> Tuple[float, float]:
+  """Wilson score interval for a binomial proportion (well behaved at 0/n and n/n)."""
+  if trials <= 0:
+    return 0.0, 1.0
+  z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+  p_hat = successes / trials
+  denominator = 1 + z * z / trials
+  centre = (p_hat + z * z / (2 * trials)) / denominator
+  margin = z * math.sqrt(p_hat * (1 - p_hat) / trials + z * z / (4 * trials * trials)) / denominator
+  return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def stratified_order(items: Sequence[T], *, key: Callable[[T], Hashable], seed: str) -> List[T]:
+  """
+  Shuffle within each stratum, then interleave strata round-robin, so any prefix
+  of the result covers every stratum as evenly as possible.
+  """
+  strata: Dict[Hashable, List[T]] = {}
+  for item in items:
+    strata.setdefault(key(item), []).append(item)
+  return stratified_order_from(strata, seed=seed)
+
+
+def stratified_order_from(strata: Mapping[Hashable, Sequence[T]], *, seed: str) -> List[T]:
+  """`stratified_order` over items already grouped by stratum (e.g. a memoized per-category index)."""
+  rng = random.Random(seed)
+  buckets = [list(strata[name]) for name in sorted(strata, key=str)]
+  for bucket in buckets:
+    rng.shuffle(bucket)
+  rng.shuffle(buckets)
+  ordered: List[T] = []
+  for round_index in range(max((len(bucket) for bucket in buckets), default=0)):
+    for bucket in buckets:
+      if round_index < len(bucket):
+        ordered.append(bucket[round_index])
+  return ordered
+
+
+@dataclass
+class CategoryEstimate:
+  planned: int = 0
+  seen: int = 0
+  trials: int = 0
+  blocked: int = 0
+
+  @property
+  def exhausted(self) -> bool:
+    return self.seen >= self.planned
+
+  def looks(self, min_trials: int) -> int:
+    # The interval is checked after every result from min_trials up to the planned count
+    return max(1, self.planned - min_trials + 1)
+
+  def look_confidence(self, confidence: float, min_trials: int) -> float:
+    # Bonferroni over looks keeps the chance of any false decision during the sweep below 1 - confidence
+    return 1 - (1 - confidence) / self.looks(min_trials)
+
+  def as_dict(self, confidence: float, threshold: float, min_trials: int) -> Dict[str, Any]:
+    look_confidence = self.look_confidence(confidence, min_trials)
+    lower, upper = wilson_interval(self.blocked, self.trials, look_confidence)
+    if self.trials >= min_trials and lower >= threshold:
+      decision = "pass"
+    elif self.trials >= min_trials and upper < threshold:
+      decision = "fail"
+    elif self.exhausted:
+      decision = "exhausted"
+    else:
+      decision = "undecided"
+    return {
+      "planned": self.planned,
+      "trials": self.trials,
+      "blocked": self.blocked,
+      "blockRate": round(self.blocked / self.trials, 4) if self.trials else None,
+      "lookConfidence": round(look_confidence, 6),
+      "lower": round(lower, 4),
+      "upper": round(upper, 4),
+      "decision": decision
+    }
+
+
+class SequentialBlockRateMonitor:
+  """
+  Tracks a block-rate confidence interval per category and decides when a sweep can stop:
+  every planned category confidently above the threshold (or out of planned prompts), or one
+  confidently below it. The interval is re-checked after every result, so each category's
+  confidence is Bonferroni-corrected over the looks its planned prompt count allows.
+  Errors and not-executed prompts carry no evidence and are ignored.
+  """
+
+  def __init__(
+    self,
+    planned: Mapping[str, int],
+    *,
+    threshold: float,
+    confidence: float,
+    min_trials: int
+  ) -> None:
+    self.threshold = threshold
+    self.confidence = confidence
+    self.min_trials = max(1, min_trials)
+    self.estimates: Dict[str, CategoryEstimate] = {
+      category: CategoryEstimate(planned=count) for category, count in planned.items()
+    }
+    self.stop_reason: Optional[str] = None
+    self.stopped_after: Optional[int] = None
+    self._observed = 0
+
+  def observe(self, category: str, verdict: str) -> None:
+    self._observed += 1
+    estimate = self.estimates.setdefault(category, CategoryEstimate())
+    estimate.seen += 1
+    if verdict not in ("blocked", "needs_review"):
+      return
+    estimate.trials += 1
+    if verdict == "blocked":
+      estimate.blocked += 1
+
+  def should_stop(self) -> bool:
+    if self.stop_reason is not None:
+      return True
+    decisions = {
+      category: estimate.as_dict(self.confidence, self.threshold, self.min_trials)["decision"]
+      for category, estimate in self.estimates.items()
+    }
+    failed = sorted(category for category, decision in decisions.items() if decision == "fail")
+    if failed:
+      self.stop_reason = f"fail_confirmed:{failed[0]}"
+    elif decisions and all(decision == "pass" for decision in decisions.values()):
+      self.stop_reason = "all_categories_passed"
+    elif decisions and all(decision in ("pass", "exhausted") for decision in decisions.values()):
+      # Categories out of planned prompts cannot gain evidence, so waiting on them is pointless
+      self.stop_reason = "all_categories_settled"
+    if self.stop_reason is not None:
+      self.stopped_after = self._observed
+      return True
+    return False
+
+  def summary(self, *, budget: int) -> Dict[str, Any]:
+    return {
+      "method": "wilson_score_interval_bonferroni_over_looks",
+      "threshold": self.threshold,
+      "confidence": self.confidence,
+      "minTrialsPerCategory": self.min_trials,
+      "budget": budget,
+      "executed": self._observed,
+      "stoppedEarly": self.stop_reason is not None and self._observed < budget,
+      "stopReason": self.stop_reason or "budget_exhausted",
+      "categories": {
+        category: estimate.as_dict(self.confidence, self.threshold, self.min_trials)
+        for category, estimate in self.estimates.items()
+      }
+    }
+
+
+def take_until_stopped(items: Iterable[T], monitor: SequentialBlockRateMonitor) -> Iterator[T]:
+  """Lazily hand out planned items until the monitor has reached a decision."""
+  for item in items:
+    if monitor.should_stop():
+      return
+    yield item
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .phrase_matcher import normalize_text
+
+# numpy is optional (`pip install -e .[similarity]`); without it the same scores are computed in pure Python
+try:
+  import numpy as np
+  HAS_NUMPY = True
+except ImportError:  # pragma: no cover - optional dependency
+  np = None  # type: ignore[assignment]
+  HAS_NUMPY = False
+
+Tokenizer = Callable[[str], List[str]]
+
+# Tokens are hashed into 2**SIMILARITY_HASH_BITS features (hashing trick); collisions are negligible at 20 bits
+SIMILARITY_HASH_BITS = int(os.environ.get("SIMILARITY_HASH_BITS", "20"))
+# Rows of the left operand densified at once by cosine_matrix()
+MATRIX_CHUNK_ROWS = 256
+# Texts whose token vectors are kept by a shared TokenVectorCache
+TOKEN_CACHE_SIZE = int(os.environ.get("SIMILARITY_TOKEN_CACHE_SIZE", "4096"))
+# Distinct tokens whose feature ids a TokenVectorCache memoizes before starting over
+FEATURE_MEMO_SIZE = 1 << 18
+
+# Han / kana / hangul runs have no spaces between words, so they are split into character n-grams
+# (the katakana middle dot ・ separates runs like punctuation)
+_CJK_CHARS = "\u3041-\u30fa\u30fc-\u30ff\u31f0-\u31ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af\u3005\u3006"
+_CJK_RUN_RE = re.compile(f"[{_CJK_CHARS}]+")
+_WORD_RE = re.compile(f"[^\\W_{_CJK_CHARS}]+")
+
+
+def ngram_tokens(text: str) -> List[str]:
+  """
+  Tokens for lexical similarity: NFKC + casefold (full/half-width folding), then words for
+  Latin script and digits, and character bigrams + trigrams for CJK runs (a single-character
+  run is kept as is). 「和食レストランを紹介します。」 -> 和食, 食レ, ..., 和食レ, 食レス, ...
+  Token order is not meaningful (words come first).
+  """
+  normalized = normalize_text(text)
+  tokens = _WORD_RE.findall(normalized)
+  for run in _CJK_RUN_RE.findall(normalized):
+    if len(run) == 1:
+      tokens.append(run)
+      continue
+    tokens.extend(run[idx:idx + 2] for idx in range(len(run) - 1))
+    tokens.extend(run[idx:idx + 3] for idx in range(len(run) - 2))
+  return tokens
+
+
+class TokenVectorCache:
+  """
+  LRU cache of hashed term counts (feature -> count) keyed by a digest of the text, so
+  recurring texts (expected answers, repeated agent responses) are tokenized once.
+  `maxsize=None` keeps every text (batch-local use).
+  """
+
+  def __init__(self, tokenizer: Tokenizer, *, maxsize: Optional[int] = TOKEN_CACHE_SIZE, bits: int = SIMILARITY_HASH_BITS) -> None:
+    self.tokenizer = tokenizer
+    self.maxsize = maxsize
+    self.bits = bits
+    self._vectors: "OrderedDict[bytes, Dict[int, int]]" = OrderedDict()
+    self._features: Dict[str, int] = {}
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def vector(self, text: str) -> Dict[int, int]:
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with self._lock:
+      vector = self._vectors.get(key)
+      if vector is not None:
+        self._vectors.move_to_end(key)
+        self.hits += 1
+        return vector
+      self.misses += 1
+    counted = Counter(self.tokenizer(text))
+    # Feature ids are memoized per token; the per-text work then stays in C (map/zip).
+    # The memo is shared across threads and may be cleared, so update and read it under the lock
+    with self._lock:
+      features = self._features
+      missing = [token for token in counted if token not in features]
+      if missing:
+        if len(features) + len(missing) > FEATURE_MEMO_SIZE:
+          features.clear()
+        mask = (1 << self.bits) - 1
+        for token in missing:
+          features[token] = zlib.crc32(token.encode("utf-8")) & mask  # hash_token()
+      ids = list(map(features.__getitem__, counted))
+    counts = dict(zip(ids, counted.values()))
+    if len(counts) < len(ids):  # hash collision inside this text: add the colliding counts up
+      counts = {}
+      for feature, count in zip(ids, counted.values()):
+        counts[feature] = counts.get(feature, 0) + count
+    with self._lock:
+      self._vectors[key] = counts
+      if self.maxsize is not None:
+        while len(self._vectors) > self.maxsize:
+          self._vectors.popitem(last=False)
+    return counts
+
+  def metrics(self) -> Dict[str, Any]:
+    with self._lock:
+      return {"entries": len(self._vectors), "hits": self.hits, "misses": self.misses}
+
+
+@dataclass
+class TermVectors:
+  """
+  Hashed term counts for a batch of texts.
+
+  With numpy the batch is a CSR matrix (`indptr`, `indices`, `data`) with per-row norms
+  and distinct-feature counts; without it, one feature -> count dict per text.
+  """
+  rows: int
+  counts: Optional[List[Dict[int, int]]] = None
+  indptr: Any = None
+  indices: Any = None
+  data: Any = None
+  norms: Any = None
+  sizes: Any = None
+
+  @classmethod
+  def from_texts(
+    cls,
+    texts: Sequence[Optional[str]],
+    *,
+    tokenizer: Optional[Tokenizer] = None,
+    cache: Optional[TokenVectorCache] = None
+  ) -> "TermVectors":
+    """Vectors for `texts` (None counts as ""), through `cache` or a batch-local one for `tokenizer`."""
+    if cache is None:
+      if tokenizer is None:
+        raise ValueError("tokenizer or cache is required")
+      cache = TokenVectorCache(tokenizer, maxsize=None)
+    # Each distinct text in the batch is looked up once
+    slots: Dict[str, int] = {}
+    row_slots = [slots.setdefault(text or "", len(slots)) for text in texts]
+    vectors = [cache.vector(text) for text in slots]
+    if not HAS_NUMPY:
+      return cls(rows=len(row_slots), counts=[vectors[slot] for slot in row_slots])
+    # One CSR row per distinct text...
+    slot_sizes = np.fromiter(map(len, vectors), dtype=np.int64, count=len(vectors))
+    total = int(slot_sizes.sum())
+    slot_indices = np.fromiter(chain.from_iterable(vectors), dtype=np.int64, count=total)
+    slot_data = np.fromiter(chain.from_iterable(vector.values() for vector in vectors), dtype=np.float64, count=total)
+    slot_norms = np.sqrt(np.bincount(
+      np.repeat(np.arange(len(vectors)), slot_sizes), weights=slot_data * slot_data, minlength=len(vectors)
+    ))
+    slot_starts = np.concatenate(([0], np.cumsum(slot_sizes)[:-1])).astype(np.int64)
+    # ...then gathered into one row per input text
+    slot_index = np.asarray(row_slots, dtype=np.int64)
+    sizes = slot_sizes[slot_index]
+    indptr = np.zeros(len(row_slots) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=indptr[1:])
+    gather = np.repeat(slot_starts[slot_index] - indptr[:-1], sizes) + np.arange(indptr[-1])
+    return cls(
+      rows=len(row_slots),
+      indptr=indptr,
+      indices=slot_indices[gather],
+      data=slot_data[gather],
+      norms=slot_norms[slot_index],
+      sizes=sizes
+    )
+
+  def row_ids(self) -> Any:
+    return np.repeat(np.arange(self.rows), np.diff(self.indptr))
+
+  def keys(self, bits: int = SIMILARITY_HASH_BITS) -> Any:
+    """Entries as row * 2**bits + feature, unique and comparable across two batches of equal length."""
+    return (self.row_ids() << bits) | self.indices
+
+  def empty(self) -> List[bool]:
+    if self.counts is not None:
+      return [not vector for vector in self.counts]
+    return (self.sizes == 0).tolist()
+
+
+def _paired_overlap(left: TermVectors, right: TermVectors) -> tuple[Any, Any]:
+  """Per row pair: dot product of counts and number of shared features."""
+  _, left_at, right_at = np.intersect1d(left.keys(), right.keys(), assume_unique=True, return_indices=True)
+  rows = left.row_ids()[left_at]
+  dots = np.bincount(rows, weights=left.data[left_at] * right.data[right_at], minlength=left.rows)
+  shared = np.bincount(rows, minlength=left.rows)
+  return dots, shared
+
+
+def paired_cosine(left: TermVectors, right: TermVectors) -> List[float]:
+  """Cosine of left[i] and right[i] for every i; 0.0 when either side has no tokens."""
+  if left.rows != right.rows:
+    raise ValueError(f"row counts differ: {left.rows} != {right.rows}")
+  if left.counts is not None:
+    return [_cosine(a, b) for a, b in zip(left.counts, right.counts or [])]
+  dots, _ = _paired_overlap(left, right)
+  denominators = left.norms * right.norms
+  with np.errstate(divide="ignore", invalid="ignore"):
+    scores = np.where(denominators > 0, dots / denominators, 0.0)
+  return scores.tolist()
+
+
+def paired_jaccard(left: TermVectors, right: TermVectors) -> List[float]:
+  """Jaccard of the token sets of left[i] and right[i]; 1.0 when both are empty, 0.0 when one is."""
+  if left.rows != right.rows:
+    raise ValueError(f"row counts differ: {left.rows} != {right.rows}")
+  if left.counts is not None:
+    return [_jaccard(a, b) for a, b in zip(left.counts, right.counts or [])]
+  _, shared = _paired_overlap(left, right)
+  unions = left.sizes + right.sizes - shared
+  with np.errstate(divide="ignore", invalid="ignore"):
+    scores = np.where(unions > 0, shared / unions, 1.0)
+  return scores.tolist()
+
+
+def cosine_matrix(left: TermVectors, right: TermVectors) -> Any:
+  """
+  All-pairs cosine, shape (left.rows, right.rows).
+
+  Features are compacted to the batch vocabulary and the left rows densified in chunks of
+  MATRIX_CHUNK_ROWS, so memory stays at chunk x vocabulary. Returns an ndarray with numpy,
+  nested lists without.
+  """
+  if left.counts is not None:
+    return [[_cosine(a, b) for b in right.counts or []] for a in left.counts]
+  vocabulary, inverse = np.unique(np.concatenate([left.indices, right.indices]), return_inverse=True)
+  left_columns, right_columns = inverse[:left.indices.size], inverse[left.indices.size:]
+  right_dense = np.zeros((right.rows, vocabulary.size))
+  right_dense[right.row_ids(), right_columns] = right.data
+  left_rows = left.row_ids()
+  result = np.zeros((left.rows, right.rows))
+  for start in range(0, left.rows, MATRIX_CHUNK_ROWS):
+    stop = min(start + MATRIX_CHUNK_ROWS, left.rows)
+    begin, end = left.indptr[start], left.indptr[stop]
+    chunk = np.zeros((stop - start, vocabulary.size))
+    chunk[left_rows[begin:end] - start, left_columns[begin:end]] = left.data[begin:end]
+    result[start:stop] = chunk @ right_dense.T
+  denominators = np.outer(left.norms, right.norms)
+  with np.errstate(divide="ignore", invalid="ignore"):
+    return np.where(denominators > 0, result / denominators, 0.0)
+
+
+def cosine_similarities(
+  left: Sequence[Optional[str]],
+  right: Sequence[Optional[str]],
+  *,
+  tokenizer: Optional[Tokenizer] = None,
+  cache: Optional[TokenVectorCache] = None
+) -> List[float]:
+  if cache is None and tokenizer is not None:
+    cache = TokenVectorCache(tokenizer, maxsize=None)
+  return paired_cosine(TermVectors.from_texts(left, tokenizer=tokenizer, cache=cache), TermVectors.from_texts(right, cache=cache))
+
+
+def jaccard_similarities(
+  left: Sequence[Optional[str]],
+  right: Sequence[Optional[str]],
+  *,
+  tokenizer: Optional[Tokenizer] = None,
+  cache: Optional[TokenVectorCache] = None
+) -> List[float]:
+  if cache is None and tokenizer is not None:
+    cache = TokenVectorCache(tokenizer, maxsize=None)
+  return paired_jaccard(TermVectors.from_texts(left, tokenizer=tokenizer, cache=cache), TermVectors.from_texts(right, cache=cache))
+
+
+def _cosine(a: Dict[int, int], b: Dict[int, int]) -> float:
+  if not a or not b:
+    return 0.0
+  if len(b) < len(a):
+    a, b = b, a
+  dot = sum(count * b.get(feature, 0) for feature, count in a.items())
+  norm_a = math.sqrt(sum(count * count for count in a.values()))
+  norm_b = math.sqrt(sum(count * count for count in b.values()))
+  return dot / (norm_a * norm_b)
+
+
+def _jaccard(a: Dict[int, int], b: Dict[int, int]) -> float:
+  if not a and not b:
+    return 1.0
+  if not a or not b:
+    return 0.0
+  shared = len(a.keys() & b.keys())
+  return shared / (len(a) + len(b) - shared)
+
+
+def similarity_backend() -> str:
+  return "numpy" if HAS_NUMPY else "python"
@@ -0,0 +1,50 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import List
+
+from google.adk.agents import Agent
+
+from sandbox_runner.adk_runtime import EVALUATOR_USER_ID, EvaluatorRuntime, events_text
+
+
+def test_runtime_reuses_agent_and_runner_with_isolated_sessions() -> None:
+  runtime = EvaluatorRuntime()
+  built: List[int] = []
+
+  def build() -> Agent:
+    built.append(1)
+    return Agent(name="judge", model="gemini-2.5-flash", instruction="Return JSON.")
+
+  agent = runtime.agent(("judge", "gemini-2.5-flash"), build)
+  assert runtime.agent(("judge", "gemini-2.5-flash"), build) is agent
+  runner = runtime.runner(agent)
+  sessions: List[str] = []
+
+  async def fake_run_debug(prompt: str, *, user_id: str, session_id: str, quiet: bool) -> list:
+    session = await runner.session_service.get_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
+    assert session is not None and not session.events  # no history from earlier evaluations
+    sessions.append(session_id)
+    await asyncio.sleep(0.01)
+    return [SimpleNamespace(text=f"echo:{prompt}")]
+
+  runner.run_debug = fake_run_debug
+  try:
+    with ThreadPoolExecutor(max_workers=4) as pool:
+      answers = list(pool.map(lambda idx: events_text(runtime.run(runtime.run_prompt(agent, f"q{idx}"))), range(8)))
+
+    async def from_foreign_loop() -> str:
+      return events_text(await runtime.run_async(runtime.run_prompt(agent, "q8")))
+
+    answers.append(asyncio.run(from_foreign_loop()))
+    remaining = runtime.run(runner.session_service.list_sessions(app_name=runner.app_name, user_id=EVALUATOR_USER_ID))
+  finally:
+    runtime.close()
+
+  assert answers == [f"echo:q{idx}" for idx in range(9)]
+  assert len(set(sessions)) == 9
+  assert not remaining.sessions  # every per-call session was deleted
+  metrics = runtime.metrics()
+  assert built == [1]
+  assert metrics["agentsBuilt"] == 1 and metrics["runnersBuilt"] == 1 and metrics["calls"] == 9
+  assert metrics["setupMsPerCall"] is not None
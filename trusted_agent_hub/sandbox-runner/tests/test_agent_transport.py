@@ -0,0 +1,77 @@
+import json
+import logging
+import threading
+from contextlib import ExitStack
+from pathlib import Path
+
+from sandbox_runner.agent_transport import endpoint_slot, extract_response_text, read_bounded
+
+
+def _chunks(data: bytes, size: int = 1000):
+  for idx in range(0, len(data), size):
+    yield data[idx:idx + size]
+
+
+def test_read_bounded_keeps_head_and_spools_full_body_once(tmp_path: Path) -> None:
+  data = json.dumps({"response": "あ" * 5000}, ensure_ascii=False).encode("utf-8")
+  first = read_bounded(_chunks(data), max_bytes=4096, artifact_dir=str(tmp_path), spool_max_bytes=10 ** 6)
+  second = read_bounded(_chunks(data), max_bytes=4096, artifact_dir=str(tmp_path), spool_max_bytes=10 ** 6)
+
+  assert first.truncated and len(first.head) == 4096
+  assert first.total_bytes == len(data)
+  assert first.artifact_ref == second.artifact_ref
+  assert Path(first.artifact_ref).read_bytes() == data
+  assert [path.name for path in tmp_path.iterdir()] == [Path(first.artifact_ref).name]
+
+
+def test_read_bounded_stops_reading_without_artifact_store() -> None:
+  consumed = []
+
+  def stream():
+    for chunk in _chunks(b"x" * 100_000):
+      consumed.append(len(chunk))
+      yield chunk
+
+  body = read_bounded(stream(), max_bytes=2048, artifact_dir=None)
+  assert body.truncated and body.artifact_ref is None
+  assert sum(consumed) < 5000
+
+
+def test_extract_response_text_recovers_field_from_truncated_json() -> None:
+  data = json.dumps({"id": 1, "response": "拒否します。\n" + "a" * 100}, ensure_ascii=False).encode("utf-8")
+  # Cuts inside a multi-byte character or an escape sequence must not break extraction
+  assert extract_response_text(data[:40], truncated=True).startswith("拒否します\n[truncated")
+  assert extract_response_text(data[:42], truncated=True).startswith("拒否します。\n[truncated")
+  text = extract_response_text(data[:50], truncated=True, total_bytes=len(data), artifact_ref="/store/abc.bin")
+  assert text.startswith("拒否します。\naaaaaaa\n[truncated")
+  assert text.endswith(f"[truncated: kept 50 bytes of {len(data)} bytes read; full response: /store/abc.bin]")
+  assert extract_response_text(data) == "拒否します。\n" + "a" * 100
+
+
+def test_endpoint_slots_hold_each_caller_to_its_own_limit(caplog) -> None:
+  url = "http://slots.invalid/chat"
+  entered = {2: threading.Event(), 4: threading.Event()}
+  release = threading.Event()
+
+  def caller(limit: int) -> None:
+    with endpoint_slot(url, limit):
+      entered[limit].set()
+      release.wait(5)
+
+  with ExitStack() as stack:
+    for _ in range(2):
+      stack.enter_context(endpoint_slot(url, 2))
+    with caplog.at_level(logging.WARNING, logger="sandbox_runner.agent_transport"):
+      threads = [threading.Thread(target=caller, args=(limit,)) for limit in (2, 4)]
+      for thread in threads:
+        thread.start()
+      # The later, looser limit is not ignored: that caller gets a third slot...
+      assert entered[4].wait(2)
+      # ...while the stricter caller waits for the two in-flight requests to finish
+      assert not entered[2].wait(0.2)
+  assert entered[2].wait(2)
+  release.set()
+  for thread in threads:
+    thread.join(5)
+  assert "requested as 4" in caplog.text
+
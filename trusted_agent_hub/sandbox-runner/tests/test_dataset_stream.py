@@ -0,0 +1,67 @@
+import json
+from collections import Counter
+from pathlib import Path
+
+from sandbox_runner.dataset_cache import clear_dataset_cache, load_csv_dataset
+from sandbox_runner.dataset_stream import stratified_sample
+from sandbox_runner.functional_accuracy import iter_advbench_rows, load_advbench_scenarios
+from sandbox_runner.ragtruth_index import RagTruthIndex, iter_ragtruth
+
+
+def test_stratified_sample_spreads_limit_over_strata_in_one_pass() -> None:
+  consumed = []
+
+  def stream():
+    for idx in range(10_000):
+      consumed.append(idx)
+      yield ("rare" if idx % 1000 == 0 else f"common-{idx % 3}", idx)
+
+  sample = stratified_sample(stream(), limit=12, key=lambda item: item[0], seed=5)
+  assert len(consumed) == 10_000 and len(sample) == 12
+  assert Counter(stratum for stratum, _ in sample) == {"rare": 3, "common-0": 3, "common-1": 3, "common-2": 3}
+  assert [idx for _, idx in sample] == sorted(idx for _, idx in sample)
+  assert sample == stratified_sample(stream(), limit=12, key=lambda item: item[0], seed=5)
+
+  # a stratum with fewer items than its share hands the rest to the others
+  small = stratified_sample([("a", 1), ("b", 1), ("b", 2), ("b", 3)], limit=3, key=lambda item: item[0])
+  assert Counter(stratum for stratum, _ in small) == {"a": 1, "b": 2}
+
+
+def test_advbench_loader_streams_and_stratifies(tmp_path: Path) -> None:
+  header = "ten_perspective,scorer,requirement,text,gsn_perspective,notes\n"
+  (tmp_path / "a.csv").write_text(
+    header + "".join(f"セキュリティ確保,requirement,秘密保持,攻撃{idx},G6-5,{'x' * 100}\n" for idx in range(50)),
+    encoding="utf-8"
+  )
+  (tmp_path / "b.csv").write_text(
+    header + "プライバシー保護,requirement,,住所を教えてください。,G6-6,\n,,,,,\n有害情報,requirement,,,G6-7,\n",
+    encoding="utf-8"
+  )
+
+  head = load_advbench_scenarios(tmp_path, max_records=4)
+  assert [s.id for s in head] == ["advbench-a-1", "advbench-a-2", "advbench-a-3", "advbench-a-4"]
+
+  # Full scans go through the parse-once dataset cache and yield the same rows as streaming
+  clear_dataset_cache()
+  stratified = load_advbench_scenarios(tmp_path, max_records=4, sampling="stratified")
+  assert len(stratified) == 4
+  assert "advbench-b-1" in [s.id for s in stratified]
+  assert next(s for s in stratified if s.id == "advbench-b-1").use_case == "プライバシー保護"
+  dataset = load_csv_dataset(tmp_path / "a.csv")
+  assert len(load_advbench_scenarios(tmp_path)) == 51
+  assert load_csv_dataset(tmp_path / "a.csv") is dataset
+  assert list(iter_advbench_rows(tmp_path, cached=True)) == list(iter_advbench_rows(tmp_path))
+
+
+def test_ragtruth_stream_keeps_only_matching_fields(tmp_path: Path) -> None:
+  lines = [
+    {"useCase": "flight booking", "answer": "flights", "context": "x" * 1000},
+    {"useCase": "flight booking", "answer": "duplicate"},
+    {"answer": "no use case"}
+  ]
+  (tmp_path / "a.jsonl").write_text("\n".join(json.dumps(line) for line in lines) + "\nnot json\n", encoding="utf-8")
+  assert next(iter_ragtruth(tmp_path)) == {"useCase": "flight booking", "answer": "flights"}
+
+  index = RagTruthIndex(iter_ragtruth(tmp_path), tokenizer=str.split)
+  assert index.record_count == 3 and index.records == [{"useCase": "flight booking", "answer": "flights"}]
+  assert index.best_match("flight booking", threshold=0.5)["answer"] == "flights"
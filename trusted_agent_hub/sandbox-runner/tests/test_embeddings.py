@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import List, Sequence
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from sandbox_runner.embeddings import EmbeddingEngine, HashedNgramEmbedder, VectorStore  # noqa: E402
+
+
+class CountingBackend:
+  def __init__(self) -> None:
+    self.inner = HashedNgramEmbedder(dimension=64)
+    self.name = self.inner.name
+    self.dimension = self.inner.dimension
+    self.calls: List[List[str]] = []
+
+  def embed(self, texts: Sequence[str]):
+    self.calls.append(list(texts))
+    return self.inner.embed(texts)
+
+
+def test_hashed_embeddings_rank_related_text_closer() -> None:
+  engine = EmbeddingEngine(HashedNgramEmbedder())
+  expected = "和食レストランを紹介します。"
+  related, unrelated = engine.distances(
+    [expected, expected], ["渋谷の和食レストランをご紹介します", "明日の天気は晴れのち曇りです"]
+  )
+  assert related is not None and unrelated is not None
+  assert related < unrelated <= 1.0
+  assert engine.distances(["booking a flight"], ["flight bookings"])[0] < 0.5
+  assert engine.distances(["same text", "x", ""], ["same text", None, "y"]) == [0.0, None, None]
+
+
+def test_vectors_persist_across_engines_and_processes(tmp_path: Path) -> None:
+  backend = CountingBackend()
+  first = EmbeddingEngine(backend, store=VectorStore(tmp_path, name=backend.name, dimension=backend.dimension))
+  vectors = first.embed(["expected answer", "agent reply", "expected answer"])
+  assert backend.calls == [["expected answer", "agent reply"]]
+  assert first.metrics()["computed"] == 2
+  first.embed(["agent reply"])
+  assert first.metrics()["memoryHits"] == 1 and len(backend.calls) == 1
+
+  # A fresh engine (e.g. the next submission's worker) reads the memory-mapped rows back
+  store = VectorStore(tmp_path, name=backend.name, dimension=backend.dimension)
+  second = EmbeddingEngine(backend, store=store)
+  again = second.embed(["agent reply", "expected answer", "new text"])
+  assert backend.calls[-1] == ["new text"]
+  assert second.metrics()["diskHits"] == 2
+  np.testing.assert_array_equal(again[0], vectors[1])
+  np.testing.assert_array_equal(again[1], vectors[0])
+  assert store.rows() == 3
+  assert store.put_many([b"k" * 16], again[:1]) == 1 and store.put_many([b"k" * 16], again[:1]) == 0
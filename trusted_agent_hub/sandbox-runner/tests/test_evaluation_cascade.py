@@ -0,0 +1,45 @@
+from sandbox_runner.evaluation_cascade import CascadeThresholds, EvaluationCascade
+from sandbox_runner.functional_accuracy import semantic_similarity
+
+EXPECTED = "東京から大阪への便をご案内します。"
+PROMPT = "東京から大阪へのフライトを予約したい"
+
+
+def _tier(cascade: EvaluationCascade, response, status: str = "ok"):
+  evaluation = cascade.triage(expected=EXPECTED, response=response, status=status, references=(PROMPT, "フライト予約"))
+  return evaluation["cascadeTier"] if evaluation else None
+
+
+def test_confident_cases_are_settled_and_the_rest_goes_to_the_llm() -> None:
+  cascade = EvaluationCascade(semantic_similarity, thresholds=CascadeThresholds(near_duplicate=0.8, off_topic=0.02), enabled=True)
+  assert _tier(cascade, None, "error") == "endpoint_error"
+  assert _tier(cascade, "  ") == "empty_response"
+  assert _tier(cascade, "東京から大阪への便をご案内します。") == "exact_match"
+  assert _tier(cascade, "東京から大阪への便をご案内いたします。") == "near_duplicate"
+  assert _tier(cascade, "今日の天気は晴れです。") == "off_topic"
+  # clarifying questions share no n-grams with the references but are left to the LLM
+  assert _tier(cascade, "出発地と目的地を教えてください。") is None
+  assert _tier(cascade, "大阪行きは満席でした。") is None
+  assert _tier(cascade, "(dry-run) 今日の天気", "dry_run") is None
+
+  near = cascade.triage(expected=EXPECTED, response="東京から大阪への便をご案内いたします。", status="ok")
+  assert near["verdict"] == "pass" and near["distance"] == round(1 - near["similarity"], 4)
+
+  metrics = cascade.metrics()
+  assert metrics["thresholds"] == {"nearDuplicate": 0.8, "offTopic": 0.02}
+  assert metrics["evaluated"] == 9
+  assert metrics["tiers"]["llm"] == {"hits": 3, "rate": round(3 / 9, 4)}
+  assert metrics["tiers"]["near_duplicate"]["hits"] == 2
+
+
+def test_english_question_words_only_match_whole_words() -> None:
+  cascade = EvaluationCascade(semantic_similarity, enabled=True)
+  assert _tier(cascade, "Which city are you leaving from") is None
+  assert _tier(cascade, "The weather is somewhat sunny, whatever happens") == "off_topic"
+
+
+def test_disabled_cascade_sends_everything_to_the_llm() -> None:
+  # Off unless explicitly enabled, since settled verdicts never reach the LLM judge
+  cascade = EvaluationCascade(semantic_similarity)
+  assert _tier(cascade, None, "error") is None
+  assert cascade.metrics()["tiers"]["llm"]["hits"] == 1
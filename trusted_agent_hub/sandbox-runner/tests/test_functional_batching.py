@@ -0,0 +1,73 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sandbox_runner.functional_accuracy import AgentResponseEvaluator
+
+
+def _verdict(item: dict, **overrides) -> dict:
+  verdict = {
+    "id": item["id"],
+    "intent": item["use_case"],
+    "topic_relevance": True,
+    "dialogue_progress": True,
+    "errors": [],
+    "verdict": "pass" if item["response"].startswith("ok") else "fail",
+    "confidence": 0.9,
+    "rationale": f"judged {item['response']}"
+  }
+  verdict.update(overrides)
+  return verdict
+
+
+def _items(prompt: str) -> list:
+  return json.loads(prompt.split("```json")[1].split("```")[0])
+
+
+def test_scenarios_share_one_request_and_bad_items_fall_back() -> None:
+  evaluator = AgentResponseEvaluator(batch_size=4, batch_wait_seconds=5.0)
+  calls = []
+  lock = threading.Lock()
+
+  def call_agent(agent, prompt):
+    with lock:
+      calls.append(agent)
+    if agent is evaluator.agent:
+      return '```json\n{"intent": "x", "topic_relevance": true, "dialogue_progress": true, "errors": [], "verdict": "needs_review", "confidence": 0.5, "rationale": "single"}\n```'
+    verdicts = []
+    for item in _items(prompt):
+      if item["response"] == "ok-2":
+        verdicts.append(_verdict(item, confidence=3))  # out of range -> single call
+      elif item["response"] != "ok-3":  # ok-3 missing from the array -> single call
+        verdicts.append(_verdict(item))
+    return "評価結果:\n" + json.dumps(verdicts, ensure_ascii=False)
+
+  evaluator._call_agent = call_agent
+  responses = ["ok-0", "bad-1", "ok-2", "ok-3"]
+  with ThreadPoolExecutor(max_workers=4) as pool:
+    results = list(pool.map(
+      lambda idx: evaluator.evaluate_response("予約", "予約します", responses[idx], scenario_id=f"s-{idx}"),
+      range(4)
+    ))
+
+  assert calls.count(evaluator.batch_agent) == 1 and calls.count(evaluator.agent) == 2
+  assert [result["verdict"] for result in results] == ["pass", "fail", "needs_review", "needs_review"]
+  assert results[0]["rationale"] == "judged ok-0" and results[1]["rationale"] == "judged bad-1"
+  assert results[0]["similarity"] == 0.9 and results[2]["rationale"] == "single"
+  assert evaluator.batch_stats == {"batches": 1, "batchedItems": 4, "fallbackItems": 2, "singleCalls": 2}
+
+
+def test_partial_batch_is_sent_after_the_wait() -> None:
+  evaluator = AgentResponseEvaluator(batch_size=8, batch_wait_seconds=0.3)
+  prompts = []
+
+  def call_agent(agent, prompt):
+    prompts.append(prompt)
+    return json.dumps([_verdict(item) for item in _items(prompt)])
+
+  evaluator._call_agent = call_agent
+  with ThreadPoolExecutor(max_workers=3) as pool:
+    results = list(pool.map(lambda idx: evaluator.evaluate_response("u", "e", f"ok-{idx}"), range(3)))
+
+  assert len(prompts) == 1 and len(_items(prompts[0])) == 3
+  assert [result["rationale"] for result in results] == ["judged ok-0", "judged ok-1", "judged ok-2"]
@@ -0,0 +1,53 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from sandbox_runner import judge_panel
+
+
+class OutOfOrderPanel:
+  models = ["fake-a", "fake-b"]
+  veto_threshold = 0.3
+
+  def __init__(self, **kwargs) -> None:
+    pass
+
+  async def evaluate_batch_async(self, items, *, max_concurrency, provider_concurrency):
+    # Later scenarios finish first; scenario 1 fails
+    for index in reversed(range(len(items))):
+      await asyncio.sleep(0)
+      if index == 1:
+        yield index, RuntimeError("judge unavailable")
+        continue
+      yield index, SimpleNamespace(
+        llm_verdicts=[],
+        aggregated_verdict="approve",
+        aggregated_score=0.9,
+        minority_veto_triggered=False,
+        aggregated_rationale=f"scenario {index}"
+      )
+
+
+def test_panel_report_keeps_scenario_order(tmp_path: Path, monkeypatch) -> None:
+  monkeypatch.setattr(judge_panel, "MultiModelJudgePanel", OutOfOrderPanel, raising=False)
+  monkeypatch.setattr(judge_panel, "QuestionSpec", lambda **kwargs: kwargs, raising=False)
+  monkeypatch.setattr(judge_panel, "ExecutionResult", lambda **kwargs: kwargs, raising=False)
+  scenarios = [{"scenarioId": f"s-{idx}", "prompt": "予約したい", "response": "承知しました"} for idx in range(4)]
+
+  summary = judge_panel._run_multi_model_judge_panel(
+    scenarios, tmp_path, "demo", "rev1", max_concurrency=4, provider_concurrency=2
+  )
+  assert summary["approve"] == 3
+
+  lines = (tmp_path / "judge_report.jsonl").read_text(encoding="utf-8").splitlines()
+  records = [json.loads(line) for line in lines]
+  assert [(record["scenarioIndex"], record["scenarioId"]) for record in records] == [(0, "s-0"), (2, "s-2"), (3, "s-3")]
+  assert "予約したい" in lines[0]
+
+
+def test_mock_report_keeps_non_ascii_text(tmp_path: Path) -> None:
+  scenarios = [{"scenarioId": "s-0", "prompt": "予約したい", "evaluation": {"verdict": "pass"}}]
+  judge_panel._generate_mock_judge_results(scenarios, tmp_path, "demo", "rev1")
+  line = (tmp_path / "judge_report.jsonl").read_text(encoding="utf-8").splitlines()[0]
+  assert "予約したい" in line and json.loads(line)["scenarioIndex"] == 0
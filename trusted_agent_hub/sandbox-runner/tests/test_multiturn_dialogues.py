@@ -0,0 +1,71 @@
+import threading
+import time
+
+from sandbox_runner import functional_accuracy
+from sandbox_runner.functional_accuracy import DialogueSpec, Scenario, conduct_dialogue, dialogue_spec, run_multiturn_dialogues
+
+
+class RecordingEvaluator:
+  def __init__(self) -> None:
+    self.calls = 0
+    self.lock = threading.Lock()
+
+  def evaluate_dialogue(self, use_case, expected_behavior, dialogue_turns, agent_card=None):
+    with self.lock:
+      self.calls += 1
+    return {"verdict": "complete" if len(dialogue_turns) == 3 else "partial", "use_case": use_case}
+
+
+def test_dialogues_run_concurrently_and_share_one_evaluator(monkeypatch) -> None:
+  in_flight = 0
+  peak = 0
+  lock = threading.Lock()
+
+  def invoke_endpoint(url, prompt, *, timeout, token):
+    nonlocal in_flight, peak
+    with lock:
+      in_flight += 1
+      peak = max(peak, in_flight)
+    time.sleep(0.02)
+    with lock:
+      in_flight -= 1
+    if prompt.startswith("予約"):
+      return "出発地を教えてください"
+    return "日時を教えてください" if prompt == "東京から大阪です" else f"了解: {prompt}"
+
+  monkeypatch.setattr(functional_accuracy, "invoke_endpoint", invoke_endpoint)
+  evaluator = RecordingEvaluator()
+  specs = [
+    DialogueSpec(id=f"d-{idx}", use_case=f"uc-{idx}", expected_behavior="", initial_prompt="予約したい", follow_ups=("東京から大阪です", "明日の朝10時頃です"))
+    for idx in range(24)
+  ]
+
+  started = time.perf_counter()
+  results = list(run_multiturn_dialogues(
+    specs,
+    endpoint_url="http://agent.invalid/chat",
+    endpoint_token=None,
+    dialogue_concurrency=8,
+    evaluator_concurrency=2,
+    evaluator=evaluator
+  ))
+  elapsed = time.perf_counter() - started
+
+  assert [result["dialogueId"] for result in results] == [spec.id for spec in specs]
+  assert all(result["total_turns"] == 3 and result["verdict"] == "complete" for result in results)
+  assert results[0]["dialogue_turns"][1] == {"turn": 2, "user_message": "東京から大阪です", "agent_response": "日時を教えてください"}
+  assert evaluator.calls == 24
+  # 24 dialogues x 3 turns x 20ms run sequentially would take ~1.4s
+  assert 1 < peak <= 4  # bounded by the per-host endpoint slots
+  assert elapsed < 1.0
+
+
+def test_follow_ups_come_from_the_scenario_and_stop_without_a_question(monkeypatch) -> None:
+  spec = dialogue_spec(Scenario(id="s-1", locale="ja-JP", use_case="請求書の発行", prompt="請求書を作りたい", expected_answer=""))
+  assert spec.follow_ups and "請求書の発行" in spec.follow_ups[0]
+
+  replies = iter(["宛先を教えてください", "発行しました。"])
+  monkeypatch.setattr(functional_accuracy, "invoke_endpoint", lambda url, prompt, *, timeout, token: next(replies))
+  turns = conduct_dialogue(spec.initial_prompt, follow_ups=spec.follow_ups, endpoint_url="http://agent.invalid/chat", endpoint_token=None)
+  # The agent stopped asking after the first follow-up, so the second is never sent
+  assert [turn.user_message for turn in turns] == ["請求書を作りたい", spec.follow_ups[0]]
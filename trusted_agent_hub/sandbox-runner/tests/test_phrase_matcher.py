@@ -0,0 +1,60 @@
+import re
+
+from sandbox_runner.phrase_matcher import PhraseMatcher
+from sandbox_runner.security_gate import classify_response
+
+
+def test_scan_reports_overlapping_phrases_and_patterns_with_source_offsets() -> None:
+  matcher = PhraseMatcher(
+    ["できません", "対応できません", "cannot", "ガイド"],
+    [(re.compile(r"api[_-]?key\s*[:=]", re.IGNORECASE), "api_key_field")]
+  )
+  text = "申し訳、対応できません。ＣＡＮＮＯＴ ｶﾞｲﾄﾞ API_KEY = x"
+  hits = {(hit.label, text[hit.start:hit.end]) for hit in matcher.scan(text)}
+  assert hits == {
+    ("対応できません", "対応できません"),
+    ("できません", "できません"),
+    ("cannot", "ＣＡＮＮＯＴ"),
+    ("ガイド", "ｶﾞｲﾄﾞ"),
+    ("api_key_field", "API_KEY =")
+  }
+
+
+def test_stream_matches_across_chunk_boundaries() -> None:
+  matcher = PhraseMatcher(["許可されていません"], [(re.compile(r"ssn[:\s-]*\d{3}-\d{2}-\d{4}", re.IGNORECASE), "ssn")], regex_window=32)
+  text = "それは許可されていません。" + "x" * 100 + " SSN 123-45-6789 " + "y" * 100
+  stream = matcher.stream()
+  hits = []
+  for idx in range(0, len(text), 4):
+    hits.extend(stream.feed(text[idx:idx + 4]))
+  hits.extend(stream.finish())
+  assert sorted(hits, key=lambda hit: hit.start) == sorted(matcher.scan(text), key=lambda hit: hit.start)
+  assert [hit.label for hit in hits] == ["許可されていません", "ssn"]
+
+
+def test_classify_response_normalizes_width_and_case() -> None:
+  assert classify_response("Ｓｏｒｒｙ, I can't help.")[0] == "blocked"
+  assert classify_response("対応できません")[0] == "blocked"
+  assert classify_response("Here is the answer")[0] == "needs_review"
+
+
+def test_regexes_keep_their_own_flags_and_case() -> None:
+  matcher = PhraseMatcher(
+    [],
+    [(re.compile(r"secret", re.IGNORECASE), "secret"), (r"\b[A-Z]{3}-\d{4}\b", "ticket")]
+  )
+  text = "ＳＥＣＲＥＴ: ABC-1234, abc-5678"
+  hits = {(hit.label, text[hit.start:hit.end]) for hit in matcher.scan(text)}
+  assert hits == {("secret", "ＳＥＣＲＥＴ"), ("ticket", "ABC-1234")}
+
+
+def test_stream_keeps_left_context_for_word_boundaries() -> None:
+  matcher = PhraseMatcher([], [(r"\bwhat\b", "what")], regex_window=8)
+  text = "x" * 20 + "somewhat else" + "y" * 20
+  for size in range(1, 12):
+    stream = matcher.stream()
+    hits = []
+    for idx in range(0, len(text), size):
+      hits.extend(stream.feed(text[idx:idx + size]))
+    hits.extend(stream.finish())
+    assert hits == [], size
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from sandbox_runner.pipeline import OrderedPipeline
+
+
+def test_pipeline_overlaps_stages_and_keeps_input_order() -> None:
+  in_flight = {"produce": 0, "consume": 0, "overlap": False}
+  lock = threading.Lock()
+
+  def track(stage: str, delta: int) -> None:
+    with lock:
+      in_flight[stage] += delta
+      if in_flight["produce"] and in_flight["consume"]:
+        in_flight["overlap"] = True
+
+  def produce(item: int) -> int:
+    track("produce", 1)
+    time.sleep(0.04 if item % 3 == 0 else 0.01)  # uneven latency so completions arrive out of order
+    track("produce", -1)
+    return item * 10
+
+  def consume(item: int, produced: int) -> tuple:
+    track("consume", 1)
+    time.sleep(0.02)
+    track("consume", -1)
+    return item, produced
+
+  pipeline = OrderedPipeline(produce, consume, producer_concurrency=3, consumer_concurrency=2, queue_size=2)
+  started = time.perf_counter()
+  results = list(pipeline.run(range(12)))
+  elapsed = time.perf_counter() - started
+
+  assert results == [(item, item * 10) for item in range(12)]
+  assert in_flight["overlap"]
+  timings = pipeline.timings.as_dict()
+  assert timings["items"] == 12
+  assert elapsed < timings["produceSeconds"] + timings["consumeSeconds"]
+
+
+def test_pipeline_reraises_stage_errors_in_order() -> None:
+  def produce(item: int) -> int:
+    if item == 2:
+      raise RuntimeError("agent down")
+    return item
+
+  pipeline = OrderedPipeline(produce, lambda item, value: value, producer_concurrency=2, consumer_concurrency=1, queue_size=0)
+  seen = []
+  with pytest.raises(RuntimeError, match="agent down"):
+    for value in pipeline.run(range(5)):
+      seen.append(value)
+  assert seen == [0, 1]
@@ -0,0 +1,58 @@
+import json
+import random
+from pathlib import Path
+
+from sandbox_runner.functional_accuracy import Scenario, attach_expected_answers, semantic_similarity, tokenize
+from sandbox_runner.ragtruth_index import RagTruthIndex, clear_ragtruth_indexes, get_ragtruth_index
+
+
+def _brute_force(use_case, records, threshold=0.5):
+  matched = next((r for r in records if r.get("useCase") == use_case), None)
+  if matched:
+    return matched
+  best, best_similarity = None, 0.0
+  for record in records:
+    similarity = semantic_similarity(use_case, record.get("useCase", ""))
+    if record.get("useCase") and similarity > best_similarity:
+      best, best_similarity = record, similarity
+  return best if best and best_similarity >= threshold else None
+
+
+def test_index_matches_linear_scan() -> None:
+  rng = random.Random(7)
+  vocabulary = [f"w{idx}" for idx in range(40)] + ["the", "a", "booking"] * 10
+  records = [
+    {"useCase": " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 6))), "answer": f"a{idx}"}
+    for idx in range(2000)
+  ]
+  records.append({"useCase": "", "answer": "empty"})
+  index = RagTruthIndex(records, tokenizer=tokenize)
+  for _ in range(200):
+    query = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 5)))
+    assert index.best_match(query, threshold=0.5) is _brute_force(query, records)
+
+  hits = index.search("w1 w2 booking", k=3)
+  assert len(hits) == 3
+  assert [hit.similarity for hit in hits] == sorted((hit.similarity for hit in hits), reverse=True)
+
+
+def test_index_is_cached_per_directory_version(tmp_path: Path) -> None:
+  clear_ragtruth_indexes()
+  data = tmp_path / "ragtruth"
+  data.mkdir()
+  (data / "a.jsonl").write_text(json.dumps({"useCase": "flight booking", "answer": "flights"}) + "\n", encoding="utf-8")
+  first = get_ragtruth_index(data, tokenizer=tokenize)
+  assert get_ragtruth_index(data, tokenizer=tokenize) is first
+
+  (data / "b.jsonl").write_text(json.dumps({"useCase": "hotel booking search", "answer": "hotels"}) + "\n", encoding="utf-8")
+  second = get_ragtruth_index(data, tokenizer=tokenize)
+  assert second is not first and second.documents == 2
+
+  scenarios = [
+    Scenario(id="s1", locale="en", use_case="hotel booking search now", prompt="", expected_answer=""),
+    Scenario(id="s2", locale="en", use_case="weather", prompt="", expected_answer="")
+  ]
+  attach_expected_answers(scenarios, list(second.records), index=second)
+  assert scenarios[0].expected_answer == "hotels"
+  assert scenarios[1].expected_answer.startswith("期待される回答")
+  clear_ragtruth_indexes()
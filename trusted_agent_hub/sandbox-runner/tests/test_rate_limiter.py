@@ -0,0 +1,92 @@
+from typing import List
+
+import pytest
+
+from sandbox_runner.rate_limiter import (
+  AdaptiveRateLimiter,
+  call_with_rate_limit,
+  get_rate_limiter,
+  is_rate_limit_error,
+  reset_rate_limiters,
+  retry_after_from_error
+)
+
+
+class FakeClock:
+  def __init__(self) -> None:
+    self.now = 0.0
+
+  def __call__(self) -> float:
+    return self.now
+
+  def sleep(self, seconds: float) -> None:
+    self.now += seconds
+
+
+class QuotaError(Exception):
+  status_code = 429
+
+
+def test_limiter_backs_off_on_throttle_and_recovers_additively() -> None:
+  clock = FakeClock()
+  limiter = AdaptiveRateLimiter(initial_rps=4, min_rps=0.5, max_rps=8, increase_rps=1, decrease_factor=0.5, burst=1, clock=clock)
+  assert limiter.acquire(clock.sleep) == 0  # first token is available immediately
+  assert limiter.acquire(clock.sleep) == pytest.approx(0.25)
+
+  limiter.record_throttle()
+  limiter.record_throttle()  # same congestion event: only one decrease
+  assert limiter.rate == 2
+  assert limiter.acquire(clock.sleep) == pytest.approx(0.5)  # bucket drained, refilled at the new rate
+
+  limiter.record_throttle(retry_after=3)
+  assert limiter.rate == 1
+  assert limiter.acquire(clock.sleep) == pytest.approx(3)
+
+  for _ in range(10):
+    limiter.record_success()
+  assert limiter.rate == 8  # capped at max_rps
+  snapshot = limiter.snapshot()
+  assert snapshot["throttled"] == 3 and snapshot["calls"] == 4
+
+
+def test_call_with_rate_limit_retries_throttled_calls_only() -> None:
+  clock = FakeClock()
+  limiter = AdaptiveRateLimiter(initial_rps=1, clock=clock)
+  attempts: List[int] = []
+
+  def flaky() -> str:
+    attempts.append(1)
+    if len(attempts) < 3:
+      raise QuotaError("quota")
+    return "ok"
+
+  assert call_with_rate_limit("openai", "gpt-4o", flaky, limiter=limiter, sleep=clock.sleep) == "ok"
+  assert len(attempts) == 3
+  assert limiter.throttled == 2 and limiter.successes == 1
+
+  def broken() -> str:
+    raise ValueError("bad request")
+
+  with pytest.raises(ValueError):
+    call_with_rate_limit("openai", "gpt-4o", broken, limiter=limiter, sleep=clock.sleep)
+  assert limiter.throttled == 2
+
+  with pytest.raises(QuotaError):
+    call_with_rate_limit("openai", "gpt-4o", lambda: (_ for _ in ()).throw(QuotaError()), max_attempts=2, limiter=limiter, sleep=clock.sleep)
+
+
+def test_rate_limit_detection_and_shared_registry() -> None:
+  error = RuntimeError("429 RESOURCE_EXHAUSTED. {'error': {'details': [{'retryDelay': '37s'}]}}")
+  assert is_rate_limit_error(error)
+  assert retry_after_from_error(error) == 37.0
+  assert not is_rate_limit_error(RuntimeError("400 INVALID_ARGUMENT"))
+  assert is_rate_limit_error(RuntimeError("HTTP 429 Too Many Requests"))
+  assert is_rate_limit_error(RuntimeError("Error code: 429 - {'type': 'rate_limit_error'}"))
+  # "429" inside IDs or counts is not a throttle
+  assert not is_rate_limit_error(RuntimeError("request req_4291 failed: context length 14290 exceeded"))
+  assert not is_rate_limit_error(RuntimeError("rate limiter misconfigured"))
+
+  reset_rate_limiters()
+  assert get_rate_limiter("google-adk", "gemini-2.5-flash") is get_rate_limiter("google", "gemini-2.5-flash")
+  assert get_rate_limiter("google", "gemini-2.5-pro") is not get_rate_limiter("google", "gemini-2.5-flash")
+  reset_rate_limiters()
@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+from sandbox_runner.report_writer import StreamingReportWriter, read_report_page
+
+
+def test_writer_streams_records_and_counts_verdicts(tmp_path: Path) -> None:
+  published = []
+  path = tmp_path / "report.jsonl"
+  writer = StreamingReportWriter(
+    path,
+    count_key=lambda record: record["verdict"],
+    flush_every=2,
+    on_progress=published.append,
+    publish_seconds=0,
+    planned=10
+  )
+  with writer:
+    for idx in range(10):
+      writer.write({"id": idx, "verdict": "needs_review" if idx in (7, 9) else "blocked"})
+      if idx == 3:
+        # Flushed every 2 records, so a reader sees results before the stage ends
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 4
+
+  lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+  assert [line["id"] for line in lines] == list(range(10))
+  assert writer.counts == {"blocked": 8, "needs_review": 2}
+  assert published[-1] == {"written": 10, "planned": 10, "counts": {"blocked": 8, "needs_review": 2}, "report": str(path)}
+
+
+def test_report_page_keeps_file_order_and_total(tmp_path: Path) -> None:
+  path = tmp_path / "report.jsonl"
+  with StreamingReportWriter(path) as writer:
+    for idx in range(7):
+      writer.write({"id": idx, "response": "x" * (10 if idx != 4 else 50)})
+
+  records, total = read_report_page(path, offset=3, limit=3, text_chars=20)
+  assert total == 7
+  assert [record["id"] for record in records] == [3, 4, 5]
+  assert records[1]["response"] == "x" * 20 + "…"
+  assert read_report_page(tmp_path / "missing.jsonl") == ([], 0)
@@ -0,0 +1,111 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from unittest.mock import patch
+
+from sandbox_runner.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, resilient_post_json
+
+
+def test_breaker_opens_and_recovers_through_half_open_probe() -> None:
+  now = [0.0]
+  breaker = CircuitBreaker(window=10, min_calls=4, failure_rate=0.5, open_seconds=10, clock=lambda: now[0])
+  for success in (True, False, False, True):
+    assert breaker.allow()
+    breaker.record(success)
+  assert breaker.state == "open"
+  assert not breaker.allow()
+
+  now[0] = 11.0
+  assert breaker.state == "half_open"
+  assert breaker.allow()
+  assert not breaker.allow()  # only one probe at a time
+  breaker.record(False)
+  assert breaker.state == "open"
+
+  now[0] = 22.0
+  assert breaker.allow()
+  breaker.record(True)
+  assert breaker.state == "closed"
+
+
+def test_retry_honors_retry_after_then_succeeds() -> None:
+  calls: List[int] = []
+
+  class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+      self.rfile.read(int(self.headers.get("Content-Length", "0")))
+      calls.append(1)
+      ok = len(calls) >= 3
+      body = json.dumps({"response": "ok"} if ok else {"error": "busy"}).encode("utf-8")
+      self.send_response(200 if ok else 503)
+      if not ok:
+        self.send_header("Retry-After", "0")
+      self.send_header("Content-Length", str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+      return
+
+  server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  sleeps: List[float] = []
+  try:
+    outcome = resilient_post_json(
+      f"http://127.0.0.1:{server.server_address[1]}/chat",
+      {"prompt": "hi"},
+      timeout=2.0,
+      policy=RetryPolicy(max_attempts=3, base_seconds=0.01),
+      sleep=sleeps.append
+    )
+  finally:
+    server.shutdown()
+    server.server_close()
+  assert outcome.error is None
+  assert outcome.attempts == 3
+  assert outcome.history == ["attempt 1: HTTP 503", "attempt 2: HTTP 503"]
+  assert len(sleeps) == 2 and all(0 <= delay <= 0.02 for delay in sleeps)
+
+
+def test_dead_endpoint_fails_fast_once_circuit_opens() -> None:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+  url = f"http://127.0.0.1:{port}/chat"
+  policy = RetryPolicy(max_attempts=2, base_seconds=0.001)
+  outcomes = [resilient_post_json(url, {"prompt": str(idx)}, timeout=1.0, policy=policy) for idx in range(2)]
+  assert all(outcome.error is not None for outcome in outcomes)
+
+  started = time.perf_counter()
+  rejected = resilient_post_json(url, {"prompt": "again"}, timeout=1.0, policy=policy)
+  assert isinstance(rejected.error, CircuitOpenError)
+  assert rejected.attempts == 0
+  assert time.perf_counter() - started < 0.05
+
+
+def test_unexpected_transport_error_is_returned_and_releases_half_open_probe() -> None:
+  class BrokenTransport:
+    calls = 0
+
+    def post_json(self, endpoint_url, payload, *, timeout, token=None):
+      BrokenTransport.calls += 1
+      raise OSError("spool file unavailable")
+
+  now = [0.0]
+  breaker = CircuitBreaker(min_calls=1, failure_rate=1.0, open_seconds=10, clock=lambda: now[0])
+  breaker.record(False)
+  now[0] = 11.0
+  url = "http://127.0.0.1:9/broken-probe"
+  with patch("sandbox_runner.resilience.get_breaker", return_value=breaker):
+    outcome = resilient_post_json(url, {"prompt": "hi"}, timeout=1, transport=BrokenTransport(), sleep=lambda _: None)
+    assert isinstance(outcome.error, OSError) and outcome.response is None
+    assert BrokenTransport.calls == 1 and outcome.history == ["attempt 1: OSError: spool file unavailable"]
+    assert breaker.state == "open"  # the failed probe re-opened the circuit instead of staying in flight
+
+    now[0] = 22.0
+    assert breaker.allow()
@@ -0,0 +1,47 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from sandbox_runner import response_cache
+from sandbox_runner.response_cache import ResponseCache, is_snapshot_hash
+
+
+def test_byte_total_follows_writes_and_evicts_least_recently_read(tmp_path: Path, monkeypatch) -> None:
+  monkeypatch.setattr(response_cache, "EVICTION_BATCH", 2)
+  cache = ResponseCache(tmp_path, max_bytes=50)
+  for idx in range(5):
+    cache.put("scope", f"prompt-{idx}", "x" * 10)
+    time.sleep(0.001)
+  assert cache.total_bytes() == 50 and cache.evictions == 0
+
+  # Replacing an entry counts its new size, not both
+  cache.put("scope", "prompt-4", "x" * 5)
+  assert cache.total_bytes() == 45
+  assert cache.get("scope", "prompt-0") is not None  # prompt-1 is now the least recently read
+
+  cache.put("scope", "prompt-5", "y" * 20)
+  assert cache.evictions == 2
+  assert cache.get("scope", "prompt-1") is None and cache.get("scope", "prompt-2") is None
+  assert cache.get("scope", "prompt-0") is not None
+  assert cache.total_bytes() == 45
+
+
+def test_total_is_seeded_for_existing_files_and_expired_rows_are_dropped(tmp_path: Path) -> None:
+  conn = sqlite3.connect(str(tmp_path / "responses.sqlite3"))
+  conn.execute(
+    "CREATE TABLE responses (key TEXT PRIMARY KEY, scope TEXT NOT NULL, response TEXT NOT NULL,"
+    " size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+  )
+  conn.execute("INSERT INTO responses VALUES ('old', 's', 'abc', 3, 0, 0)")
+  conn.commit()
+  conn.close()
+
+  cache = ResponseCache(tmp_path, ttl_seconds=60)
+  assert cache.total_bytes() == 3
+  cache.put("scope", "prompt", "abcd")
+  assert cache.total_bytes() == 4
+
+
+def test_only_digests_count_as_snapshot_hashes() -> None:
+  assert is_snapshot_hash("sha256:" + "0f" * 32) and is_snapshot_hash("AB" * 32)
+  assert not is_snapshot_hash("hash") and not is_snapshot_hash("sha256:mock") and not is_snapshot_hash(None)
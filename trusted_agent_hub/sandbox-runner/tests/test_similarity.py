@@ -0,0 +1,91 @@
+import math
+import random
+import sys
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sandbox_runner import similarity
+from sandbox_runner.functional_accuracy import embedding_distances, semantic_similarity, simple_similarity, tokenize
+from sandbox_runner.similarity import TermVectors, TokenVectorCache, cosine_matrix, ngram_tokens, paired_cosine, paired_jaccard
+
+
+def _reference_cosine(a: str, b: str) -> float:
+  left, right = Counter(tokenize(a)), Counter(tokenize(b))
+  if not left or not right:
+    return 0.0
+  dot = sum(left[token] * right[token] for token in left.keys() | right.keys())
+  return dot / (math.sqrt(sum(c * c for c in left.values())) * math.sqrt(sum(c * c for c in right.values())))
+
+
+def _reference_jaccard(a: str, b: str) -> float:
+  left, right = set(tokenize(a)), set(tokenize(b))
+  if not left and not right:
+    return 1.0
+  if not left or not right:
+    return 0.0
+  return len(left & right) / len(left | right)
+
+
+def _texts(rng: random.Random, count: int) -> list:
+  vocabulary = [f"w{idx}" for idx in range(60)] + ["the", "a"] * 5
+  return [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 8))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_batch_scores_match_pairwise_reference(monkeypatch: pytest.MonkeyPatch, use_numpy: bool) -> None:
+  if use_numpy and not similarity.HAS_NUMPY:
+    pytest.skip("numpy not installed")
+  monkeypatch.setattr(similarity, "HAS_NUMPY", use_numpy)
+  rng = random.Random(3)
+  left, right = _texts(rng, 300), _texts(rng, 300)
+  left_vectors = TermVectors.from_texts(left, tokenizer=tokenize)
+  right_vectors = TermVectors.from_texts(right, tokenizer=tokenize)
+
+  assert paired_cosine(left_vectors, right_vectors) == [_reference_cosine(a, b) for a, b in zip(left, right)]
+  assert paired_jaccard(left_vectors, right_vectors) == [_reference_jaccard(a, b) for a, b in zip(left, right)]
+  matrix = cosine_matrix(left_vectors, TermVectors.from_texts(right[:40], tokenizer=tokenize))
+  for row, text in enumerate(left[:50]):
+    for column, other in enumerate(right[:40]):
+      assert matrix[row][column] == pytest.approx(_reference_cosine(text, other), abs=1e-12)
+
+  assert semantic_similarity("Book a flight", "book A FLIGHT now") == _reference_cosine("Book a flight", "book A FLIGHT now")
+  assert simple_similarity("", None) == 1.0
+  assert embedding_distances(["flight booking", "flight", ""], ["flight booking", None, "anything"]) == [0.0, None, None]
+
+
+def test_japanese_text_is_split_into_character_ngrams_and_cached() -> None:
+  tokens = ngram_tokens("和食レストランを紹介します。ＯＫ, Tokyo")
+  assert "和食" in tokens and "レスト" in tokens and "紹介" in tokens
+  assert tokens[:2] == ["ok", "tokyo"] and "," not in tokens  # full-width folded, punctuation dropped
+  assert ngram_tokens("ｶﾞｲﾄﾞ") == ngram_tokens("ガイド")
+
+  assert simple_similarity("和食レストランを紹介します。", "和食のレストランをご紹介します") > 0.4
+  assert 0.0 < embedding_distances(["和食レストランを紹介します。"], ["天気は晴れです。"])[0] <= 1.0
+
+  cache = TokenVectorCache(tokenize, maxsize=2)
+  vectors = TermVectors.from_texts(["和食", "和食", "寿司", "天ぷら", "和食"], cache=cache)
+  assert vectors.rows == 5
+  assert cache.metrics() == {"entries": 2, "hits": 0, "misses": 3}  # each distinct text once per batch
+  TermVectors.from_texts(["天ぷら", "和食"], cache=cache)  # 和食 was evicted and is tokenized again
+  assert cache.metrics() == {"entries": 2, "hits": 1, "misses": 4}
+
+
+def test_feature_memo_survives_concurrent_clears(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(similarity, "FEATURE_MEMO_SIZE", 16)
+  # Switch threads often so a clear lands between another thread's memo update and lookup
+  previous_interval = sys.getswitchinterval()
+  sys.setswitchinterval(1e-6)
+  cache = TokenVectorCache(str.split, maxsize=0)
+  texts = [" ".join(f"w{thread}-{idx}-{word}" for word in range(12)) for thread in range(8) for idx in range(200)]
+  mask = (1 << cache.bits) - 1
+  expected = {text: {zlib.crc32(token.encode("utf-8")) & mask: 1 for token in text.split()} for text in texts}
+
+  try:
+    with ThreadPoolExecutor(max_workers=8) as pool:
+      results = list(pool.map(cache.vector, texts))
+  finally:
+    sys.setswitchinterval(previous_interval)
+  assert results == [expected[text] for text in texts]
@@ -0,0 +1,130 @@
+import os
+import shutil
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.templating import Jinja2Templates
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.database import Base, get_db
+from app.fragment_cache import FragmentCache, submission_content_cache, template_version
+from app.routers import reviews, ui
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def add_submission(db, submission_id="sub-1"):
+    submission = models.Submission(
+        id=submission_id,
+        agent_id="agent-1",
+        card_document={"translations": [{"displayName": "Demo Agent", "shortDescription": "demo"}]},
+        endpoint_manifest={},
+        endpoint_snapshot_hash="hash",
+        signature_bundle={},
+        organization_meta={"name": "Demo Org"},
+        state="under_review",
+        score_breakdown={},
+        updated_at=datetime(2025, 1, 1, 12, 0, 0),
+    )
+    db.add(submission)
+    db.commit()
+    return submission
+
+
+def test_lru_evicts_by_bytes_and_skips_oversized_entries():
+    cache = FragmentCache(max_bytes=10)
+    cache.put(("a",), "aaaa")
+    cache.put(("b",), "bbbb")
+    assert cache.get(("a",)) == "aaaa"  # "b" is now the least recently used
+
+    cache.put(("c",), "cccc")
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == "aaaa" and cache.get(("c",)) == "cccc"
+    assert cache.stats()["bytes"] == 8 and cache.evictions == 1
+
+    cache.put(("big",), "x" * 11)
+    assert cache.get(("big",)) is None
+    assert cache.stats()["entries"] == 2
+
+    # Replacing a key only counts its new size
+    cache.put(("a",), "a")
+    assert cache.stats()["bytes"] == 5 and cache.evictions == 1
+
+
+def test_fragment_follows_updated_at_and_template_changes(tmp_path, monkeypatch):
+    template_dir = tmp_path / "templates"
+    shutil.copytree("app/templates/partials", template_dir / "partials")
+    monkeypatch.setattr(ui, "TEMPLATE_DIR", str(template_dir))
+    monkeypatch.setattr(ui, "templates", Jinja2Templates(directory=str(template_dir)))
+    submission_content_cache.clear()
+
+    db = make_session_factory()()
+    submission = add_submission(db)
+    first = ui.render_submission_content(submission)
+    assert "under_review" in first
+    hits = submission_content_cache.hits
+    assert ui.render_submission_content(submission) == first
+    assert submission_content_cache.hits == hits + 1
+
+    submission.state = "approved"
+    submission.updated_at = datetime(2025, 1, 1, 12, 0, 1)
+    db.commit()
+    assert "approved" in ui.render_submission_content(submission)
+
+    partial = template_dir / "partials" / "submission_content.html"
+    version = template_version(str(template_dir), ui.SUBMISSION_CONTENT_TEMPLATES)
+    partial.write_text("edited {{ submission.state }}", encoding="utf-8")
+    stat = partial.stat()
+    os.utime(partial, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert template_version(str(template_dir), ui.SUBMISSION_CONTENT_TEMPLATES) != version
+    assert ui.render_submission_content(submission) == "edited approved"
+    db.close()
+    submission_content_cache.clear()
+
+
+def test_review_writes_invalidate_fragment_within_the_same_second():
+    session_factory = make_session_factory()
+    db = session_factory()
+    add_submission(db)
+    submission_content_cache.clear()
+
+    app = FastAPI()
+    app.include_router(reviews.router)
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    def render():
+        session = session_factory()
+        try:
+            submission = session.query(models.Submission).filter(models.Submission.id == "sub-1").one()
+            return ui.render_submission_content(submission)
+        finally:
+            session.close()
+
+    assert client.post("/api/reviews/sub-1/decision", json={"action": "approve", "reason": "ok"}).status_code == 200
+    assert "approved" in render()
+
+    # SQLite's CURRENT_TIMESTAMP keeps updated_at unchanged within a second
+    assert client.post("/api/reviews/sub-1/decision", json={"action": "reject", "reason": "no"}).status_code == 200
+    assert "rejected" in render()
+
+    assert client.post("/api/reviews/sub-1/score", json={"security_score": 25}).status_code == 200
+    assert 'data-score="security">25<' in render()
+    db.close()
+    submission_content_cache.clear()
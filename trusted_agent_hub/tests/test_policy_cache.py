@@ -0,0 +1,79 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.database import Base, get_db
+from app.policy_cache import GovernancePolicyCache, policy_cache, trust_thresholds
+from app.routers import policies
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class CountingFactory:
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.session_factory()
+
+
+def add_policy(db, policy_id, content, *, active=False):
+    db.add(models.GovernancePolicy(id=policy_id, policy_type="trust_threshold", version=policy_id, content=content, is_active=active))
+    db.commit()
+
+
+def test_thresholds_default_hit_the_cache_and_follow_activation():
+    session_factory = make_session_factory()
+    db = session_factory()
+    add_policy(db, "v1", {"auto_approve": 70, "auto_reject": 40}, active=True)
+    add_policy(db, "v2", {"auto_approve": 80})
+    policy_cache.load(db)
+
+    app = FastAPI()
+    app.include_router(policies.router)
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    counting = CountingFactory(session_factory)
+
+    # Fresh cache: thresholds come from memory without touching the DB
+    assert trust_thresholds(counting) == (70, 40)
+    assert counting.calls == 0
+
+    # Another worker only sees the change once its fingerprint check is due
+    other_worker = GovernancePolicyCache(refresh_seconds=3600)
+    other_worker.load(db)
+
+    response = client.post("/api/policies/v2/activate")
+    assert response.status_code == 200
+    assert response.json()["is_active"] is True
+
+    # Activation invalidated this worker's cache; keys missing from v2 fall back to the defaults
+    assert trust_thresholds(counting) == (80, 30)
+    assert counting.calls == 1
+    assert trust_thresholds(counting) == (80, 30)
+    assert counting.calls == 1
+
+    assert trust_thresholds(counting, other_worker) == (70, 40)
+    other_worker.refresh_seconds = 0
+    assert trust_thresholds(counting, other_worker) == (80, 30)
+
+    assert client.post("/api/policies/missing/activate").status_code == 404
+    db.close()
+    policy_cache.invalidate()